@@ -0,0 +1,252 @@
+"""Recherche adaptative à grand voisinage (ALNS) avec budget de temps.
+
+Part de la solution de construction (``heuristic.construct_routes``) puis
+alterne destruction (aléatoire, pire coût, Shaw) et réparation (gloutonne,
+regret-k). Les poids des opérateurs s'adaptent à leurs succès et
+l'acceptation suit un recuit simulé. Retourne la meilleure solution trouvée
+dans le budget.
+"""
+
+import math
+import random
+import time
+
+from .heuristic import cheapest_insertion, construct_routes, route_insertion
+from .routing import RoutingProblem, unserved_penalty as default_penalty
+
+DEFAULT_TIME_LIMIT = 5.0
+
+# Scores de récompense des opérateurs (Ropke & Pisinger)
+SCORE_GLOBAL_BEST = 33
+SCORE_IMPROVED = 9
+SCORE_ACCEPTED = 13
+REACTION = 0.1
+SEGMENT = 50
+
+
+class ALNS:
+    """Moteur ALNS sur un ``RoutingProblem``."""
+
+    def __init__(self, problem, seed=None, min_remove=4, max_remove=40, unserved_penalty=None):
+        self.problem = problem
+        self.rand = random.Random(seed)
+        self.min_remove = min_remove
+        self.max_remove = max_remove
+        # Un patient non servi coûte plus que n'importe quel ensemble de routes
+        if unserved_penalty is None:
+            unserved_penalty = default_penalty(problem.dist.matrix)
+        self.unserved_penalty = unserved_penalty
+
+        self.destroy_ops = [self.random_removal, self.worst_removal, self.shaw_removal]
+        self.repair_ops = [self.greedy_repair, self.regret2_repair, self.regret3_repair]
+        self.destroy_weights = [1.0] * len(self.destroy_ops)
+        self.repair_weights = [1.0] * len(self.repair_ops)
+
+    # ------------------------------------------------------------------ coût
+    def cost(self, routes, unserved):
+        return sum(self.problem.route_cost(r) for r in routes.values()) + \
+            self.unserved_penalty * len(unserved)
+
+    # ---------------------------------------------------------- destruction
+    def _served(self, routes):
+        return [i for route in routes.values() for i in route]
+
+    def _remove(self, routes, removed):
+        removed = set(removed)
+        for k, route in routes.items():
+            if any(i in removed for i in route):
+                routes[k] = [i for i in route if i not in removed]
+        return list(removed)
+
+    def random_removal(self, routes, q):
+        served = self._served(routes)
+        return self._remove(routes, self.rand.sample(served, min(q, len(served))))
+
+    def worst_removal(self, routes, q, p=3):
+        """Retire les patients dont le détour est le plus coûteux (avec bruit)."""
+        D = self.problem.D
+        gains = []
+        for route in routes.values():
+            prev = 0
+            for pos, i in enumerate(route):
+                nxt = route[pos + 1] if pos + 1 < len(route) else 0
+                gains.append((D[prev][i] + D[i][nxt] - D[prev][nxt], i))
+                prev = i
+        gains.sort(reverse=True)
+        removed = []
+        while gains and len(removed) < q:
+            idx = int(len(gains) * self.rand.random() ** p)
+            removed.append(gains.pop(idx)[1])
+        return self._remove(routes, removed)
+
+    def shaw_removal(self, routes, q, p=6):
+        """Retire des patients proches en distance, horaire et compétence d'un patient pivot."""
+        problem = self.problem
+        served = self._served(routes)
+        if not served:
+            return []
+        D, tw_start, skill = problem.D, problem.tw_start, problem.skill
+        pivot = self.rand.choice(served)
+        max_d = max(D[pivot]) or 1.0
+        horizon = max(problem.shift, default=1) or 1
+        related = sorted(
+            (D[pivot][i] / max_d + abs(tw_start[pivot] - tw_start[i]) / horizon
+             + (0.0 if skill[i] == skill[pivot] else 1.0), i)
+            for i in served if i != pivot
+        )
+        removed = [pivot]
+        while related and len(removed) < q:
+            idx = int(len(related) * self.rand.random() ** p)
+            removed.append(related.pop(idx)[1])
+        return self._remove(routes, removed)
+
+    # ---------------------------------------------------------- réparation
+    def greedy_repair(self, routes, pending):
+        return cheapest_insertion(self.problem, routes, pending)
+
+    def regret2_repair(self, routes, pending):
+        return self._regret_repair(routes, pending, 2)
+
+    def regret3_repair(self, routes, pending):
+        return self._regret_repair(routes, pending, 3)
+
+    def _regret_repair(self, routes, pending, k_regret):
+        """Insère d'abord le patient qui perdrait le plus à ne pas avoir sa meilleure route."""
+        problem = self.problem
+        # options[i][k] = (delta, pos) : meilleure insertion de i dans la route k
+        options = {}
+        for i in pending:
+            options[i] = {}
+            for k, route in routes.items():
+                best = route_insertion(problem, k, route, i)
+                if best is not None:
+                    options[i][k] = best
+
+        remaining = []
+        while options:
+            chosen, chosen_regret = None, None
+            for i, opts in options.items():
+                if not opts:
+                    continue
+                costs = sorted(delta for delta, _ in opts.values())
+                regret = sum(c - costs[0] for c in costs[1:k_regret])
+                # Moins de routes possibles => plus urgent
+                regret += (k_regret - min(len(costs), k_regret)) * self.unserved_penalty
+                key = (regret, -costs[0])
+                if chosen is None or key > chosen_regret:
+                    chosen, chosen_regret = i, key
+            if chosen is None:
+                remaining.extend(options)
+                break
+
+            opts = options.pop(chosen)
+            k, (_, pos) = min(opts.items(), key=lambda item: item[1][0])
+            routes[k].insert(pos, chosen)
+            # Seule la route k a changé : mise à jour des options correspondantes
+            for i, opts in options.items():
+                best = route_insertion(problem, k, routes[k], i)
+                if best is None:
+                    opts.pop(k, None)
+                else:
+                    opts[k] = best
+        return remaining
+
+    # ------------------------------------------------------------ boucle
+    def _select(self, weights):
+        return self.rand.choices(range(len(weights)), weights=weights)[0]
+
+    def run(self, time_limit=DEFAULT_TIME_LIMIT, max_iterations=None, initial=None, control=None):
+        """Retourne (meilleures routes, patients non servis) trouvées dans le budget.
+
+        ``time_limit=None`` désactive la limite de temps (``max_iterations`` requis).
+        ``control.cancel()`` (``SolveControl``) arrête la recherche à l'itération
+        suivante ; la meilleure solution trouvée est retournée.
+        """
+        if time_limit is None and max_iterations is None:
+            raise ValueError("ALNS: time_limit ou max_iterations est requis")
+        budget = float("inf") if time_limit is None else time_limit
+        start = time.perf_counter()
+        if initial is None:
+            routes, unserved = construct_routes(self.problem)
+        else:
+            routes, unserved = initial
+        current = ({k: r[:] for k, r in routes.items()}, list(unserved))
+        current_cost = self.cost(*current)
+        best, best_cost = ({k: r[:] for k, r in routes.items()}, list(unserved)), current_cost
+
+        n_served = len(self._served(routes)) + len(unserved)
+        if n_served == 0:
+            return best
+        max_remove = max(1, min(self.max_remove, int(0.4 * n_served)))
+        min_remove = min(self.min_remove, max_remove)
+
+        # Température initiale : une dégradation de 5 % de la distance (hors
+        # pénalités, qui rendraient toute perte de patient acceptable) avec probabilité 0.5
+        distance = current_cost - self.unserved_penalty * len(current[1])
+        t0 = max(0.05 * distance / math.log(2), 1e-6)
+        d_scores = [0.0] * len(self.destroy_ops)
+        r_scores = [0.0] * len(self.repair_ops)
+        d_uses = [0] * len(self.destroy_ops)
+        r_uses = [0] * len(self.repair_ops)
+
+        iteration = 0
+        while True:
+            elapsed = time.perf_counter() - start
+            if elapsed >= budget or (max_iterations is not None and iteration >= max_iterations):
+                break
+            if control is not None and control.cancelled:
+                break
+            if max_iterations is not None and time_limit is None:
+                progress = iteration / max_iterations
+            else:
+                progress = elapsed / budget
+            iteration += 1
+            temperature = t0 * (0.001 ** progress)
+
+            d_idx = self._select(self.destroy_weights)
+            r_idx = self._select(self.repair_weights)
+            routes = {k: r[:] for k, r in current[0].items()}
+            q = self.rand.randint(min_remove, max_remove)
+            removed = self.destroy_ops[d_idx](routes, q)
+            unserved = self.repair_ops[r_idx](routes, removed + current[1])
+            cost = self.cost(routes, unserved)
+
+            score = 0
+            if cost < best_cost - 1e-9:
+                best, best_cost = ({k: r[:] for k, r in routes.items()}, list(unserved)), cost
+                current, current_cost = (routes, unserved), cost
+                score = SCORE_GLOBAL_BEST
+            elif cost < current_cost - 1e-9:
+                current, current_cost = (routes, unserved), cost
+                score = SCORE_IMPROVED
+            elif self.rand.random() < math.exp(-(cost - current_cost) / temperature):
+                current, current_cost = (routes, unserved), cost
+                score = SCORE_ACCEPTED
+
+            d_scores[d_idx] += score
+            r_scores[r_idx] += score
+            d_uses[d_idx] += 1
+            r_uses[r_idx] += 1
+            if iteration % SEGMENT == 0:
+                self._update_weights(self.destroy_weights, d_scores, d_uses)
+                self._update_weights(self.repair_weights, r_scores, r_uses)
+
+        return best
+
+    @staticmethod
+    def _update_weights(weights, scores, uses):
+        for idx in range(len(weights)):
+            if uses[idx]:
+                weights[idx] = (1 - REACTION) * weights[idx] + REACTION * scores[idx] / uses[idx]
+                weights[idx] = max(weights[idx], 0.01)
+            scores[idx] = 0.0
+            uses[idx] = 0
+
+
+def solve_alns(instance, dist=None, time_limit=DEFAULT_TIME_LIMIT, seed=None, max_iterations=None,
+               control=None):
+    """Résout une VRPInstance par ALNS ; même format de résultat que ``solve_instance``."""
+    problem = RoutingProblem(instance, dist=dist)
+    routes, _ = ALNS(problem, seed=seed).run(time_limit=time_limit, max_iterations=max_iterations,
+                                             control=control)
+    return problem.to_result(routes)
@@ -0,0 +1,153 @@
+"""Cache de solutions adressé par contenu (mémoire LRU + disque).
+
+La clé est l'empreinte SHA-256 d'une forme canonique de l'instance
+(coordonnées, compétences, durées, fenêtres, attributs des agents) et des
+paramètres de résolution : deux instances identiques, quel que soit l'ordre
+de leurs patients/agents ou de leurs compétences, partagent la même entrée.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def canonical_key(instance, **params):
+    """Empreinte stable d'une VRPInstance et des paramètres du moteur."""
+    depot = instance.depot
+    payload = {
+        "depot": [depot.id, float(depot.lat), float(depot.lon)],
+        "patients": sorted(
+            [p.id, p.required_skill, float(p.lat), float(p.lon), p.duration, list(p.time_window)]
+            for p in instance.patients
+        ),
+        "agents": sorted(
+            [a.id, sorted(a.skills), a.max_patients, a.shift_duration]
+            for a in instance.agents
+        ),
+        "params": {k: params[k] for k in sorted(params)},
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class SolutionCache:
+    """LRU en mémoire, adossé (optionnellement) à un répertoire borné en taille.
+
+    Les entrées disque sont évincées de la moins récemment utilisée à la plus
+    récente dès que ``max_bytes`` est dépassé.
+    """
+
+    def __init__(self, max_entries=256, directory=None, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # ----------------------------------------------------------------- API
+    def get(self, key):
+        """Valeur en cache (copie) ou None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._memory[key])
+
+        value = self._load(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+        return copy.deepcopy(value)
+
+    def put(self, key, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, value)
+        self._store(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        """Compteurs de succès/échecs et taille courante."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._memory),
+            }
+
+    # ---------------------------------------------------------- internes
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        os.utime(path)  # marque l'entrée comme récemment utilisée
+        return value
+
+    def _store(self, key, value):
+        if not self.directory:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                path = os.path.join(self.directory, name)
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Cache mémoire partagé par le processus (utilisé par la GUI)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SolutionCache()
+    return _default_cache
@@ -0,0 +1,201 @@
+"""Décomposition géographique « cluster first, route second » des grands territoires.
+
+1. Les patients sont regroupés spatialement (k-means ou balayage angulaire
+   autour du dépôt) en grappes d'environ ``cluster_size`` patients.
+2. Les agents sont répartis entre les grappes selon la demande par
+   compétence qu'ils peuvent couvrir ; les patients sans agent compétent ou
+   en excès de capacité dans leur grappe sont déplacés vers la grappe voisine
+   la plus proche qui peut les prendre. Ceux qu'aucune grappe compatible ne
+   peut plus prendre restent hors des grappes (aucune n'est surchargée).
+3. Chaque grappe est une sous-instance résolue indépendamment (voir
+   ``solve_instance(cluster=...)``), puis ``repair_boundaries`` réinsère les
+   patients non servis (dont ceux laissés hors des grappes) et applique la recherche locale sur chaque paire de
+   grappes voisines, ce qui corrige les découpes arbitraires aux frontières.
+
+Toutes les étapes ne manipulent que des matrices de taille grappe (ou paire
+de grappes) : le coût total croît linéairement avec le nombre de patients.
+"""
+
+import math
+import random
+
+import numpy as np
+
+from .heuristic import cheapest_insertion
+from .local_search import LocalSearch
+from .routing import RoutingProblem
+from ..models.domain import VRPInstance
+
+METHODS = ("kmeans", "sweep")
+CLUSTER_SIZE = 150
+REPAIR_NEIGHBOURS = 2
+REPAIR_TIME_LIMIT = 0.5  # secondes de recherche locale par paire de grappes
+
+
+# ---------------------------------------------------------------- partition
+def _kmeans(points, k, rand, iterations=50):
+    """Lloyd avec initialisation k-means++ ; retourne les étiquettes."""
+    n = len(points)
+    centers = [points[rand.randrange(n)]]
+    d2 = ((points - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = d2.sum()
+        if total <= 0:
+            break
+        idx = int(np.searchsorted(np.cumsum(d2), rand.random() * total))
+        centers.append(points[min(idx, n - 1)])
+        d2 = np.minimum(d2, ((points - centers[-1]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    labels = np.zeros(n, dtype=np.intp)
+    for _ in range(iterations):
+        dist = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=-1)
+        new_labels = dist.argmin(axis=1)
+        counts = np.bincount(new_labels, minlength=len(centers))
+        for axis in range(2):
+            sums = np.bincount(new_labels, weights=points[:, axis], minlength=len(centers))
+            nonempty = counts > 0
+            centers[nonempty, axis] = sums[nonempty] / counts[nonempty]
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    return labels
+
+
+def _sweep(points, depot, k):
+    """Secteurs angulaires autour du dépôt, de tailles égales."""
+    angles = np.arctan2(points[:, 1] - depot[1], points[:, 0] - depot[0])
+    order = np.argsort(angles, kind="stable")
+    labels = np.empty(len(points), dtype=np.intp)
+    labels[order] = np.arange(len(points)) * k // len(points)
+    return labels
+
+
+def _allocate_agents(agents, demand, k):
+    """Répartit les agents entre grappes selon la demande par compétence non couverte."""
+    remaining = [dict(d) for d in demand]
+    allocation = [[] for _ in range(k)]
+    for agent in sorted(agents, key=lambda a: -a.max_patients):
+        def score(c):
+            return (sum(max(0, remaining[c].get(s, 0)) for s in agent.skills), -len(allocation[c]))
+
+        c = max(range(k), key=score)
+        allocation[c].append(agent)
+        capacity = agent.max_patients
+        for s in sorted(agent.skills, key=lambda s: -remaining[c].get(s, 0)):
+            take = min(capacity, max(0, remaining[c].get(s, 0)))
+            remaining[c][s] = remaining[c].get(s, 0) - take
+            capacity -= take
+    return allocation
+
+
+def cluster_instance(instance, method="kmeans", n_clusters=None, cluster_size=CLUSTER_SIZE, seed=None):
+    """Découpe l'instance en sous-instances géographiques équilibrées (même dépôt).
+
+    ``n_clusters`` vaut par défaut ``ceil(patients / cluster_size)``, plafonné
+    au nombre d'agents. Les grappes sans patient sont omises. Un patient
+    qu'aucune grappe compatible ne peut plus prendre (capacité atteinte) n'est
+    placé dans aucune grappe : ``repair_boundaries`` tente de l'insérer ensuite.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Méthode de partition inconnue: {method!r}. Choix: {', '.join(METHODS)}")
+    patients, agents = instance.patients, instance.agents
+    if not patients or not agents:
+        return [instance]
+    if n_clusters is None:
+        n_clusters = math.ceil(len(patients) / cluster_size)
+    k = max(1, min(n_clusters, len(agents), len(patients)))
+    if k == 1:
+        return [instance]
+
+    points = np.array([p.get_coords() for p in patients], dtype=float)
+    if method == "kmeans":
+        labels = _kmeans(points, k, random.Random(seed))
+    else:
+        labels = _sweep(points, instance.depot.get_coords(), k)
+    centers = np.array([points[labels == c].mean(axis=0) if (labels == c).any() else points.mean(axis=0)
+                        for c in range(k)])
+
+    demand = [{} for _ in range(k)]
+    for p, c in zip(patients, labels.tolist()):
+        demand[c][p.required_skill] = demand[c].get(p.required_skill, 0) + 1
+    allocation = _allocate_agents(agents, demand, k)
+
+    # Équilibrage : compétence couverte et capacité respectée dans chaque grappe
+    skills = [{s for a in group for s in a.skills} for group in allocation]
+    capacity = [sum(a.max_patients for a in group) for group in allocation]
+    members = [[] for _ in range(k)]
+    to_center = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=-1)
+    # Les patients proches de leur centre sont placés d'abord, les excentrés débordent
+    for idx in np.argsort(to_center[np.arange(len(patients)), labels], kind="stable").tolist():
+        p = patients[idx]
+        options = [c for c in np.argsort(to_center[idx], kind="stable").tolist() if p.required_skill in skills[c]]
+        home = next((c for c in options if len(members[c]) < capacity[c]), None)
+        if home is None:
+            continue  # aucun agent compétent, ou toutes les grappes compatibles sont pleines
+        members[home].append(p)
+
+    # Les agents d'une grappe restée vide rejoignent la grappe non vide la plus proche
+    filled = [c for c in range(k) if members[c]]
+    for c in range(k):
+        if not members[c] and allocation[c]:
+            nearest = min(filled, key=lambda f: ((centers[f] - centers[c]) ** 2).sum())
+            allocation[nearest].extend(allocation[c])
+    return [VRPInstance(instance.depot, allocation[c], members[c]) for c in filled]
+
+
+# --------------------------------------------------------------- réparation
+def _centers(parts):
+    return np.array([np.mean([p.get_coords() for p in part.patients], axis=0) for part in parts])
+
+
+def _neighbour_pairs(parts, neighbours):
+    centers = _centers(parts)
+    pairs = set()
+    for a in range(len(parts)):
+        order = np.argsort(((centers - centers[a]) ** 2).sum(axis=1), kind="stable").tolist()
+        for b in [c for c in order if c != a][:neighbours]:
+            pairs.add((min(a, b), max(a, b)))
+    return sorted(pairs)
+
+
+def repair_boundaries(instance, result, parts, provider=None, neighbours=REPAIR_NEIGHBOURS,
+                      time_limit=REPAIR_TIME_LIMIT):
+    """Réinsère les non-servis et améliore les routes de chaque paire de grappes voisines.
+
+    Chaque paire est traitée comme une petite instance (agents et patients
+    courants des deux grappes + non-servis) : insertion au moindre coût puis
+    ``LocalSearch`` (relocate, swap, 2-opt* entre routes des deux grappes).
+    Un patient laissé hors des grappes par ``cluster_instance`` est rattaché à
+    la grappe compatible de centre le plus proche.
+    """
+    patients = {p.id: p for p in instance.patients}
+    home = {p.id: c for c, part in enumerate(parts) for p in part.patients}
+    result = dict(result)
+    served = {pid for r in result.values() for pid in r["visited_patients"]}
+    unserved = [pid for pid in patients if pid not in served]
+
+    orphans = [pid for pid in unserved if pid not in home]
+    if orphans and parts:
+        centers = _centers(parts)
+        skills = [{s for a in part.agents for s in a.skills} for part in parts]
+        for pid in orphans:
+            p = patients[pid]
+            options = [c for c in range(len(parts)) if p.required_skill in skills[c]]
+            if options:
+                home[pid] = min(options, key=lambda c: ((centers[c] - p.get_coords()) ** 2).sum())
+
+    for a, b in _neighbour_pairs(parts, neighbours) if len(parts) > 1 else []:
+        agents = parts[a].agents + parts[b].agents
+        pending = [pid for pid in unserved if home.get(pid) in (a, b)]
+        ids = [pid for agent in agents for pid in result[agent.id]["visited_patients"]] + pending
+        sub = VRPInstance(instance.depot, agents, [patients[pid] for pid in ids])
+        problem = RoutingProblem(sub, provider=provider)
+        routes = problem.from_result(result)
+        index = problem.dist.index
+        left = cheapest_insertion(problem, routes, [index[pid] for pid in pending])
+        routes = LocalSearch(problem).run(routes, time_limit=time_limit)
+        result.update(problem.to_result(routes))
+        inserted = set(pending) - {problem.ids[i] for i in left}
+        unserved = [pid for pid in unserved if pid not in inserted]
+    return result
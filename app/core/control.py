@@ -0,0 +1,67 @@
+"""Pilotage d'une résolution Gurobi en cours : annulation et incumbents.
+
+Un ``SolveControl`` est partagé entre le thread qui résout et celui qui
+pilote (la GUI). ``cancel()`` peut être appelé depuis n'importe quel thread :
+il interrompt ``optimize`` (``Model.terminate``) et la résolution retourne la
+meilleure solution trouvée jusque-là. Chaque nouvel incumbent améliorant est
+transmis à ``on_incumbent(result, objective, gap)``.
+"""
+
+import threading
+
+EPS = 1e-9
+INFINITY = 1e100  # GRB.INFINITY
+
+
+class SolveControl:
+    """Annulation thread-safe et suivi des solutions améliorantes."""
+
+    def __init__(self, on_incumbent=None):
+        self.on_incumbent = on_incumbent
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._model = None
+        self.best_objective = None
+        self.status = None
+        self.gap = None
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Demande l'arrêt ; sans effet si la résolution est déjà terminée."""
+        self._cancelled.set()
+        with self._lock:
+            if self._model is not None:
+                self._model.terminate()
+
+    def attach(self, model):
+        with self._lock:
+            self._model = model
+
+    def detach(self, model):
+        with self._lock:
+            self._model = None
+        self.status = model.Status
+        if model.SolCount:
+            self.best_objective = model.ObjVal
+            self.gap = model.MIPGap if model.IsMIP else 0.0
+
+    def improves(self, objective):
+        with self._lock:
+            return self.best_objective is None or objective < self.best_objective - EPS
+
+    def report(self, result, objective, bound):
+        """Enregistre un incumbent et le transmet s'il améliore le précédent."""
+        with self._lock:
+            if self.best_objective is not None and objective >= self.best_objective - EPS:
+                return
+            self.best_objective = objective
+            if abs(bound) >= INFINITY:
+                self.gap = float("inf")  # pas encore de borne (premier incumbent)
+            else:
+                self.gap = abs(objective - bound) / abs(objective) if objective else 0.0
+            gap = self.gap
+        if self.on_incumbent is not None:
+            self.on_incumbent(result, objective, gap)
@@ -0,0 +1,66 @@
+"""Décomposition exacte d'une instance par compatibilité de compétences.
+
+Dans le graphe biparti agents–patients (arête si l'agent possède la
+compétence requise), deux composantes connexes ne partagent ni agent ni
+patient : elles forment des sous-problèmes indépendants, résolus séparément
+puis fusionnés. Les patients dont aucun agent n'a la compétence ne peuvent
+être servis et sont écartés.
+"""
+
+from ..models.domain import VRPInstance
+
+
+def skill_components(instance):
+    """Composantes connexes ``[(agent_ids, patient_ids)]`` du graphe agents–compétences–patients.
+
+    Les agents sont reliés par leurs compétences communes (union-find sur les
+    compétences) ; chaque patient rejoint la composante de sa compétence.
+    L'ordre des agents et des patients de l'instance est conservé.
+    """
+    parent = {}
+
+    def find(a):
+        while parent.setdefault(a, a) != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    for agent in instance.agents:
+        for skill in agent.skills:
+            parent[find(skill)] = find(agent.skills[0])
+
+    groups = {}
+    for agent in instance.agents:
+        root = find(agent.skills[0]) if agent.skills else ("agent", agent.id)
+        groups.setdefault(root, ([], []))[0].append(agent.id)
+    for patient in instance.patients:
+        if patient.required_skill in parent:
+            groups[find(patient.required_skill)][1].append(patient.id)
+    return list(groups.values())
+
+
+def split_instance(instance):
+    """Sous-instances indépendantes (même dépôt) ayant au moins un patient servable."""
+    agents = {a.id: a for a in instance.agents}
+    patients = {p.id: p for p in instance.patients}
+    return [
+        VRPInstance(instance.depot, [agents[a] for a in agent_ids], [patients[p] for p in patient_ids])
+        for agent_ids, patient_ids in skill_components(instance)
+        if patient_ids
+    ]
+
+
+def merge_results(instance, results):
+    """Fusionne les résultats des sous-instances ; les agents sans patient ont une route vide."""
+    depot = instance.depot.id
+    merged = {}
+    for result in results:
+        merged.update(result)
+    for agent in instance.agents:
+        merged.setdefault(agent.id, {
+            "route": [depot, depot],
+            "visited_patients": [],
+            "total_distance": 0.0,
+            "arrival_times": {},
+        })
+    return {agent.id: merged[agent.id] for agent in instance.agents}
@@ -0,0 +1,39 @@
+"""Environnement Gurobi réutilisable.
+
+Créer un ``Env`` coûte une vérification de licence et ouvre la journalisation
+console. Le processus garde ici un seul environnement silencieux, démarré au
+premier appel et partagé par tous ses modèles, quel que soit le thread qui
+les crée (la GUI lance chaque résolution dans un nouveau ``QThread``). Un
+modèle n'est jamais partagé entre threads ; les paramètres propres à une
+résolution (``Threads``...) se règlent sur le modèle, pas sur l'environnement.
+"""
+
+import os
+import threading
+
+from gurobipy import Env
+
+_lock = threading.Lock()
+_env = None
+_pid = None  # processus propriétaire : un processus fils (fork) recrée le sien
+
+
+def get_env():
+    """Environnement silencieux du processus (créé au premier appel)."""
+    global _env, _pid
+    with _lock:
+        if _env is None or _pid != os.getpid():
+            env = Env(empty=True)
+            env.setParam("OutputFlag", 0)
+            env.start()
+            _env, _pid = env, os.getpid()
+        return _env
+
+
+def dispose_env():
+    """Libère l'environnement du processus (et sa licence)."""
+    global _env, _pid
+    with _lock:
+        if _env is not None and _pid == os.getpid():
+            _env.dispose()
+        _env = _pid = None
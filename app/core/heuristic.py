@@ -0,0 +1,191 @@
+"""Moteur de construction sans licence : Clarke-Wright + insertion au moindre coût.
+
+1. Savings de Clarke-Wright, restreints aux k plus proches voisins de chaque
+   patient et aux fusions pour lesquelles au moins un agent possède toutes les
+   compétences de la route fusionnée (capacité et fenêtres horaires vérifiées).
+2. Affectation des routes obtenues aux agents disponibles.
+3. Insertion au moindre coût des patients restants dans les routes des agents.
+"""
+
+import numpy as np
+
+from .routing import RoutingProblem
+
+DEFAULT_NEIGHBOURS = 20
+
+
+def _iter_bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _candidate_pairs(problem, neighbours):
+    """Paires (i, j) de patients voisins triées par économie décroissante."""
+    M = np.asarray(problem.dist.matrix, dtype=float)
+    n = M.shape[0]
+    if n <= 2:
+        return []
+    k = min(neighbours, n - 2)
+    sub = M[1:, 1:].copy()
+    np.fill_diagonal(sub, np.inf)
+    nearest = np.argpartition(sub, k - 1, axis=1)[:, :k] + 1
+
+    rows = np.repeat(np.arange(1, n), k)
+    cols = nearest.ravel()
+    lo, hi = np.minimum(rows, cols), np.maximum(rows, cols)
+    keys = np.unique(lo * n + hi)
+    i, j = keys // n, keys % n
+    savings = M[0, i] + M[j, 0] - M[i, j]
+    keep = savings > 0
+    i, j, savings = i[keep], j[keep], savings[keep]
+    order = np.argsort(-savings, kind="stable")
+    return list(zip(i[order].tolist(), j[order].tolist()))
+
+
+def _pick_agent(problem, mask, route):
+    """Agent du masque le plus permissif (shift) pouvant réaliser la route, ou None."""
+    best, best_shift = None, -1
+    for k in _iter_bits(mask):
+        if problem.capacity[k] >= len(route) and problem.shift[k] > best_shift:
+            best, best_shift = k, problem.shift[k]
+    if best is None or problem.schedule(best, route) is None:
+        return None
+    return best
+
+
+def clarke_wright(problem, neighbours=DEFAULT_NEIGHBOURS):
+    """Routes de savings (listes d'indices) non encore affectées à des agents."""
+    route_of = {}
+    routes = {}
+    masks = {}
+    for i in problem.patient_indices:
+        mask = problem.agent_mask[i]
+        if mask and _pick_agent(problem, mask, [i]) is not None:
+            route_of[i] = i
+            routes[i] = [i]
+            masks[i] = mask
+
+    max_capacity = max(problem.capacity, default=0)
+    for i, j in _candidate_pairs(problem, neighbours):
+        for a, b in ((i, j), (j, i)):
+            ra, rb = route_of.get(a), route_of.get(b)
+            if ra is None or rb is None or ra == rb:
+                break
+            first, second = routes[ra], routes[rb]
+            if first[-1] != a or second[0] != b:
+                continue
+            mask = masks[ra] & masks[rb]
+            if not mask:
+                break
+            merged = first + second
+            if len(merged) > max_capacity or _pick_agent(problem, mask, merged) is None:
+                continue
+            routes[ra] = merged
+            masks[ra] = mask
+            for node in second:
+                route_of[node] = ra
+            del routes[rb], masks[rb]
+            break
+
+    return list(routes.values())
+
+
+def assign_routes(problem, routes):
+    """Affecte chaque route à un agent libre ; retourne (affectation, patients restants)."""
+    assigned = {k: [] for k in range(len(problem.agent_ids))}
+    free = set(assigned)
+    leftover = []
+    # Les agents les moins polyvalents sont utilisés en premier
+    flexibility = [len(c) for c in problem.compatible]
+
+    for route in sorted(routes, key=lambda r: (-len(r), -problem.route_cost(r))):
+        candidates = [
+            k for k in free
+            if problem.capacity[k] >= len(route)
+            and all(i in problem.compatible[k] for i in route)
+        ]
+        candidates.sort(key=lambda k: (flexibility[k], problem.capacity[k]))
+        chosen = next((k for k in candidates if problem.schedule(k, route) is not None), None)
+        if chosen is None:
+            leftover.extend(route)
+        else:
+            assigned[chosen] = route
+            free.discard(chosen)
+    return assigned, leftover
+
+
+def best_insertion(problem, routes, i):
+    """Meilleure insertion faisable de i : (delta, k, position) ou None.
+
+    Les positions sont évaluées par coût croissant ; l'horaire n'est vérifié
+    que jusqu'à la première position faisable.
+    """
+    D = problem.D
+    Di = D[i]
+    candidates = []
+    for k, route in routes.items():
+        if len(route) >= problem.capacity[k] or i not in problem.compatible[k]:
+            continue
+        prev = 0
+        for pos, nxt in enumerate(route):
+            candidates.append((D[prev][i] + Di[nxt] - D[prev][nxt], k, pos))
+            prev = nxt
+        candidates.append((D[prev][i] + Di[0] - D[prev][0], k, len(route)))
+    candidates.sort()
+    for delta, k, pos in candidates:
+        route = routes[k]
+        if problem.schedule(k, route[:pos] + [i] + route[pos:]) is not None:
+            return delta, k, pos
+    return None
+
+
+def route_insertion(problem, k, route, i):
+    """Meilleure insertion faisable de i dans la route de l'agent k : (delta, position) ou None."""
+    if len(route) >= problem.capacity[k] or i not in problem.compatible[k]:
+        return None
+    D = problem.D
+    Di = D[i]
+    candidates = []
+    prev = 0
+    for pos, nxt in enumerate(route):
+        candidates.append((D[prev][i] + Di[nxt] - D[prev][nxt], pos))
+        prev = nxt
+    candidates.append((D[prev][i] + Di[0] - D[prev][0], len(route)))
+    candidates.sort()
+    for delta, pos in candidates:
+        if problem.schedule(k, route[:pos] + [i] + route[pos:]) is not None:
+            return delta, pos
+    return None
+
+
+def cheapest_insertion(problem, routes, pending):
+    """Insère les patients de ``pending`` au moindre coût ; retourne les non insérés."""
+    remaining = []
+    # Fenêtres les plus serrées d'abord
+    for i in sorted(pending, key=lambda p: (problem.tw_end[p], problem.tw_start[p])):
+        best = best_insertion(problem, routes, i)
+        if best is None:
+            remaining.append(i)
+            continue
+        _, k, pos = best
+        routes[k].insert(pos, i)
+    return remaining
+
+
+def construct_routes(problem, neighbours=DEFAULT_NEIGHBOURS):
+    """Solution initiale complète ``{k: [indices]}`` et liste des patients non servis."""
+    routes, leftover = assign_routes(problem, clarke_wright(problem, neighbours))
+    placed = {i for route in routes.values() for i in route}
+    placed.update(leftover)
+    pending = leftover + [i for i in problem.patient_indices if i not in placed]
+    unserved = cheapest_insertion(problem, routes, pending)
+    return routes, unserved
+
+
+def solve_heuristic(instance, dist=None, neighbours=DEFAULT_NEIGHBOURS):
+    """Résout une VRPInstance sans Gurobi ; même format de résultat que ``solve_instance``."""
+    problem = RoutingProblem(instance, dist=dist)
+    routes, _ = construct_routes(problem, neighbours)
+    return problem.to_result(routes)
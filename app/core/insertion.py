@@ -0,0 +1,196 @@
+"""Insertion en temps réel d'un patient urgent dans des tournées existantes.
+
+Pour chaque route, on garde en cache les heures d'arrivée, la charge et
+l'heure d'arrivée au plus tard (``latest``) à chaque position qui laisse la
+fin de la route faisable (fenêtres et retour avant la fin du shift). Insérer
+i entre deux noeuds se vérifie alors en O(1) : l'arrivée décalée au noeud
+suivant doit rester ``<= latest``. Le meilleur emplacement sur toutes les
+routes compatibles coûte O(routes × longueur) et les autres routes ne sont
+pas modifiées. Sans emplacement faisable, une courte ALNS ne détruit et ne
+répare que les ``LOCAL_ROUTES`` routes les plus proches du patient (dont au
+moins une d'un agent compétent) pour lui faire de la place ; les autres
+routes restent intactes. Une ré-optimisation de toutes les routes n'a lieu
+que sur demande (``global_fallback=True``).
+"""
+
+from .alns import ALNS
+from .routing import RoutingProblem
+from ..models.domain import VRPInstance
+from ..utils.distance import DistanceMatrix
+
+FALLBACK_TIME_LIMIT = 1.0
+LOCAL_ROUTES = 3
+
+
+class _RouteState:
+    """Horaire d'une route (ids de patients, sans dépôt) et marges associées."""
+
+    __slots__ = ("visited", "arrivals", "latest", "feasible")
+
+    def __init__(self, visited, arrivals, latest, feasible):
+        self.visited = visited
+        self.arrivals = arrivals
+        self.latest = latest
+        self.feasible = feasible
+
+
+class InsertionIndex:
+    """Cache des marges par route d'un résultat, pour des insertions successives."""
+
+    def __init__(self, result, instance, dist=None, provider=None):
+        self.instance = instance
+        self.dist = dist if dist is not None else DistanceMatrix.from_instance(instance, provider=provider)
+        self.depot = instance.depot.id
+        self.patients = {p.id: p for p in instance.patients}
+        self.agents = {a.id: a for a in instance.agents}
+        self.result = {}
+        self.states = {}
+        for aid in self.agents:
+            info = result.get(aid)
+            self._set_route(aid, list(info["visited_patients"]) if info else [])
+
+    # ---------------------------------------------------------------- marges
+    def _state(self, agent, visited):
+        d, depot, patients = self.dist, self.depot, self.patients
+        arrivals = []
+        t, last = 0.0, depot
+        for pid in visited:
+            p = patients[pid]
+            t = max(p.time_window[0], t + d[last, pid])
+            arrivals.append(t)
+            t += p.duration
+            last = pid
+
+        # Arrivée au plus tard en chaque position pour que la suite reste faisable
+        latest = [0.0] * len(visited)
+        limit, nxt = float(agent.shift_duration), depot
+        for pos in range(len(visited) - 1, -1, -1):
+            p = patients[visited[pos]]
+            limit = min(p.time_window[1], limit - d[p.id, nxt] - p.duration)
+            latest[pos] = limit
+            nxt = p.id
+        feasible = all(a <= l for a, l in zip(arrivals, latest))
+        return _RouteState(visited, arrivals, latest, feasible)
+
+    def _set_route(self, aid, visited):
+        state = self._state(self.agents[aid], visited)
+        self.states[aid] = state
+        route = [self.depot] + visited + [self.depot]
+        self.result[aid] = {
+            "route": route,
+            "visited_patients": list(visited),
+            "total_distance": self.dist.route_length(route),
+            "arrival_times": dict(zip(visited, state.arrivals)),
+        }
+
+    # ------------------------------------------------------------- insertion
+    def best_slot(self, pid):
+        """Insertion faisable la moins chère de ``pid`` : (delta, agent, position) ou None."""
+        d, depot = self.dist, self.depot
+        p = self.patients[pid]
+        tw_start, tw_end = p.time_window
+        best = None
+        for aid, agent in self.agents.items():
+            state = self.states[aid]
+            visited = state.visited
+            if (not state.feasible or p.required_skill not in agent.skills
+                    or len(visited) >= agent.max_patients):
+                continue
+            prev, departure = depot, 0.0
+            for pos in range(len(visited) + 1):
+                if pos:
+                    prev = visited[pos - 1]
+                    departure = state.arrivals[pos - 1] + self.patients[prev].duration
+                arrival = max(tw_start, departure + d[prev, pid])
+                if arrival > tw_end:
+                    break  # plus loin, on repart encore plus tard (inégalité triangulaire)
+                leave = arrival + p.duration
+                if pos < len(visited):
+                    nxt = visited[pos]
+                    shifted = max(self.patients[nxt].time_window[0], leave + d[pid, nxt])
+                    if shifted > state.latest[pos]:
+                        continue
+                else:
+                    nxt = depot
+                    if leave + d[pid, depot] > agent.shift_duration:
+                        continue
+                delta = d[prev, pid] + d[pid, nxt] - d[prev, nxt]
+                if best is None or delta < best[0]:
+                    best = (delta, aid, pos)
+        return best
+
+    def insert(self, new_patient, time_limit=FALLBACK_TIME_LIMIT, local_routes=LOCAL_ROUTES,
+               global_fallback=False):
+        """Ajoute ``new_patient`` à l'instance et aux tournées ; retourne le nouveau résultat.
+
+        Sans emplacement faisable, une ALNS de ``time_limit`` secondes repart
+        des ``local_routes`` routes les plus proches du patient. Si elle échoue,
+        ``global_fallback=True`` relance l'ALNS sur toutes les routes ; sinon le
+        patient reste non servi.
+        """
+        pid = new_patient.id
+        if pid not in self.patients:
+            self.instance.patients.append(new_patient)
+            self.patients[pid] = new_patient
+        if pid in self.dist:
+            self.dist.update_node(pid, new_patient.get_coords())
+        else:
+            self.dist.add_node(pid, new_patient.get_coords())
+
+        slot = self.best_slot(pid)
+        if slot is not None:
+            _, aid, pos = slot
+            visited = self.states[aid].visited
+            self._set_route(aid, visited[:pos] + [pid] + visited[pos:])
+        elif not self._reoptimize(pid, time_limit, self._nearest_routes(pid, local_routes)) and global_fallback:
+            self._reoptimize(pid, time_limit, list(self.agents))
+        return self.snapshot()
+
+    def _nearest_routes(self, pid, count):
+        """Agents dont la route passe le plus près de ``pid`` ; le plus proche compétent en tête."""
+        d, skill = self.dist, self.patients[pid].required_skill
+
+        def gap(aid):
+            return min(d[pid, node] for node in [self.depot] + self.states[aid].visited)
+
+        order = sorted(self.agents, key=gap)
+        competent = [aid for aid in order if skill in self.agents[aid].skills]
+        if not competent:
+            return []
+        return [competent[0]] + [aid for aid in order if aid != competent[0]][:count - 1]
+
+    def _reoptimize(self, pid, time_limit, agent_ids):
+        """ALNS restreinte aux routes de ``agent_ids`` ; True si ``pid`` est servi."""
+        if not agent_ids:
+            return False
+        agents = [self.agents[aid] for aid in agent_ids]
+        ids = [other for aid in agent_ids for other in self.states[aid].visited] + [pid]
+        sub = VRPInstance(self.instance.depot, agents, [self.patients[other] for other in ids])
+        problem = RoutingProblem(sub, dist=self.dist.subset([self.depot] + ids))
+        routes = problem.from_result(self.result)
+        routes, unserved = ALNS(problem).run(time_limit=time_limit,
+                                             initial=(routes, [problem.dist.index[pid]]))
+        if unserved:
+            return False
+        result = problem.to_result(routes)
+        for aid in agent_ids:
+            self._set_route(aid, result[aid]["visited_patients"])
+        return True
+
+    def snapshot(self):
+        """Copie du résultat courant (format ``solve_instance``)."""
+        return {aid: dict(info, route=list(info["route"]), visited_patients=list(info["visited_patients"]),
+                          arrival_times=dict(info["arrival_times"]))
+                for aid, info in self.result.items()}
+
+
+def insert_patient(result, instance, new_patient, dist=None, provider=None, time_limit=FALLBACK_TIME_LIMIT,
+                   local_routes=LOCAL_ROUTES, global_fallback=False):
+    """Place un patient urgent au moindre coût sans modifier les autres routes.
+
+    ``instance`` est complétée avec ``new_patient`` ; retourne le nouveau dict
+    résultat. Pour plusieurs insertions successives, réutiliser un
+    ``InsertionIndex`` évite de recalculer les marges des routes.
+    """
+    return InsertionIndex(result, instance, dist=dist, provider=provider).insert(
+        new_patient, time_limit, local_routes=local_routes, global_fallback=global_fallback)
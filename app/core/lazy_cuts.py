@@ -0,0 +1,130 @@
+"""Séparation paresseuse des sous-tours pour la formulation ``lazy``.
+
+Sur chaque solution entière (``MIPSOL``) :
+
+* les cycles ne passant pas par le dépôt donnent une coupe de sous-tour
+  ``Σ_k Σ_{i,j∈S} x[i,j,k] <= |S| - 1`` ;
+* la route partant du dépôt est ordonnancée ; si une fenêtre est violée,
+  le chemin fautif est interdit pour cet agent (coupe de chemin infaisable).
+
+Optionnellement, en ``MIPNODE``, les composantes connexes de la relaxation
+(hors dépôt) qui violent la coupe de sous-tour sont coupées (``cbCut``).
+"""
+
+from gurobipy import GRB, quicksum
+
+EPS = 1e-6
+
+
+def _arcs_within(data, nodes):
+    x = data["x"]
+    return [var for (i, j, k), var in x.items() if i in nodes and j in nodes]
+
+
+def _subtour_cut(model, data, nodes, lazy=True):
+    expr = quicksum(_arcs_within(data, nodes))
+    if lazy:
+        model.cbLazy(expr <= len(nodes) - 1)
+    else:
+        model.cbCut(expr <= len(nodes) - 1)
+
+
+def _first_infeasible_prefix(data, k, path):
+    """Plus court préfixe de ``path`` (sans le dépôt) violant une fenêtre, ou None."""
+    d, s, lb, ub = data["d"], data["s"], data["lb"], data["ub"]
+    t, last = 0.0, 0
+    for pos, j in enumerate(path):
+        t = max(lb[j, k], t + s[last] + d[last, j])
+        if t > ub[j, k] + EPS:
+            return path[:pos + 1]
+        last = j
+    return None
+
+
+def _separate_integer(model, data):
+    """Coupe la solution entière courante ; retourne le nombre de coupes ajoutées."""
+    values = model.cbGetSolution(data["x_vars"])
+    successors = {k: {} for k in data["agents"]}
+    starts = {k: [] for k in data["agents"]}
+    for (i, j, k), value in zip(data["x_keys"], values):
+        if value > 0.5:
+            if i == 0:
+                starts[k].append(j)  # plusieurs routes par type d'agents agrégé
+            else:
+                successors[k][i] = j
+
+    x = data["x"]
+    cuts = 0
+    for k, succ in successors.items():
+        # Routes issues du dépôt
+        seen = set()
+        for current in starts[k]:
+            path = []
+            while current is not None and current != 0 and current not in seen:
+                seen.add(current)
+                path.append(current)
+                current = succ.get(current)
+            prefix = _first_infeasible_prefix(data, k, path)
+            if prefix is not None:
+                arcs = list(zip([0] + prefix[:-1], prefix))
+                model.cbLazy(quicksum(x[i, j, k] for i, j in arcs) <= len(arcs) - 1)
+                cuts += 1
+
+        # Cycles détachés du dépôt
+        for start in list(succ):
+            if start in seen:
+                continue
+            cycle, current = [], start
+            while current not in seen and current != 0 and current in succ:
+                seen.add(current)
+                cycle.append(current)
+                current = succ[current]
+            if current == start and len(cycle) >= 2:
+                _subtour_cut(model, data, set(cycle))
+                cuts += 1
+    return cuts
+
+
+def _separate_fractional(model, data):
+    if model.cbGet(GRB.Callback.MIPNODE_STATUS) != GRB.OPTIMAL:
+        return
+    values = model.cbGetNodeRel(data["x_vars"])
+
+    # Union-find sur le graphe support non orienté, dépôt exclu
+    parent = {}
+
+    def find(a):
+        while parent.setdefault(a, a) != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    inside = {}
+    for (i, j, k), value in zip(data["x_keys"], values):
+        if value > EPS and i != 0 and j != 0:
+            parent[find(i)] = find(j)
+    for (i, j, k), value in zip(data["x_keys"], values):
+        if value > EPS and i != 0 and j != 0:
+            root = find(i)
+            inside[root] = inside.get(root, 0.0) + value
+
+    components = {}
+    for node in parent:
+        components.setdefault(find(node), set()).add(node)
+    for root, nodes in components.items():
+        if len(nodes) >= 2 and inside.get(root, 0.0) > len(nodes) - 1 + EPS:
+            _subtour_cut(model, data, nodes, lazy=False)
+
+
+def subtour_callback(model, where):
+    """Callback Gurobi à passer à ``optimize`` pour la formulation ``lazy``.
+
+    Retourne le nombre de coupes paresseuses ajoutées sur une solution entière
+    (0 si elle est acceptée), pour les callbacks qui l'enveloppent.
+    """
+    data = model._vrp
+    if where == GRB.Callback.MIPSOL:
+        return _separate_integer(model, data)
+    if where == GRB.Callback.MIPNODE and data.get("fractional_cuts"):
+        _separate_fractional(model, data)
+    return 0
@@ -0,0 +1,208 @@
+"""Post-optimisation par recherche locale sur listes de voisins granulaires.
+
+Mouvements : 2-opt (intra-route), Or-opt (segments de 2-3 patients),
+relocate, swap et 2-opt* (échange de fins de routes). Chaque patient n'est
+combiné qu'avec ses k plus proches voisins servables par un même agent ; le
+gain d'un mouvement est évalué en O(1) sur la matrice de distances (en
+O(longueur du segment) pour le 2-opt sur une matrice asymétrique, où le
+segment inversé change de coût) grâce à la position de chaque patient dans
+sa route, tenue à jour à chaque mouvement appliqué ; l'horaire n'est vérifié
+que pour les mouvements améliorants.
+"""
+
+import time
+
+import numpy as np
+
+from .routing import RoutingProblem
+
+DEFAULT_NEIGHBOURS = 10
+EPS = 1e-9
+
+
+def neighbour_lists(problem, k=DEFAULT_NEIGHBOURS):
+    """Pour chaque patient, ses k plus proches voisins compatibles (un agent commun)."""
+    M = np.asarray(problem.dist.matrix, dtype=float)
+    n = M.shape[0]
+    lists = [[] for _ in range(n)]
+    if n <= 2:
+        return lists
+    sub = M[1:, 1:].copy()
+    np.fill_diagonal(sub, np.inf)
+    # Marge pour les voisins éliminés par le filtre de compétences
+    width = min(4 * k, n - 2)
+    if width < n - 2:
+        nearest = np.argpartition(sub, width - 1, axis=1)[:, :width]
+    else:
+        nearest = np.tile(np.arange(n - 1), (n - 1, 1))
+    for row in range(n - 1):
+        cand = nearest[row]
+        cand = cand[np.argsort(sub[row, cand], kind="stable")] + 1
+        i = row + 1
+        mask = problem.agent_mask[i]
+        lists[i] = [j for j in cand.tolist() if j != i and problem.agent_mask[j] & mask][:k]
+    return lists
+
+
+class LocalSearch:
+    """Descente (first improvement) sur les voisinages granulaires."""
+
+    def __init__(self, problem, neighbours=DEFAULT_NEIGHBOURS):
+        self.problem = problem
+        self.neighbours = neighbour_lists(problem, neighbours)
+        M = np.asarray(problem.dist.matrix, dtype=float)
+        self.symmetric = bool(np.allclose(M, M.T))
+
+    # ----------------------------------------------------------- utilitaires
+    def _ok(self, k, route):
+        problem = self.problem
+        if len(route) > problem.capacity[k]:
+            return False
+        servable = problem.compatible[k]
+        if any(i not in servable for i in route):
+            return False
+        # Une route déjà hors fenêtres (ex. solution externe) n'est pas rendue plus stricte
+        return not self.strict[k] or problem.schedule(k, route) is not None
+
+    @staticmethod
+    def _around(route, p):
+        prev = route[p - 1] if p > 0 else 0
+        nxt = route[p + 1] if p + 1 < len(route) else 0
+        return prev, nxt
+
+    def _apply(self, changes):
+        where, pos = self.where, self.pos
+        for k, route in changes.items():
+            self.routes[k] = route
+            for p, i in enumerate(route):
+                where[i] = k
+                pos[i] = p
+
+    # ------------------------------------------------------------ mouvements
+    def _relocate(self, i, j, length=1):
+        """Déplace le segment commençant à i (longueur 1..3) juste après j."""
+        D, routes, where, pos = self.problem.D, self.routes, self.where, self.pos
+        ki, kj = where[i], where[j]
+        ri, rj = routes[ki], routes[kj]
+        pi = pos[i]
+        seg = ri[pi:pi + length]
+        if len(seg) < length or j in seg:
+            return False
+        prev = ri[pi - 1] if pi > 0 else 0
+        nxt = ri[pi + length] if pi + length < len(ri) else 0
+        pj = pos[j]
+        nj = rj[pj + 1] if pj + 1 < len(rj) else 0
+        if ki == kj and (nj == seg[0] or j == prev):
+            return False
+        first, last = seg[0], seg[-1]
+        delta = (D[j][first] + D[last][nj] - D[j][nj]) - \
+            (D[prev][first] + D[last][nxt] - D[prev][nxt])
+        if delta > -EPS:
+            return False
+
+        if ki == kj:
+            rest = ri[:pi] + ri[pi + length:]
+            at = (pj - length if pj > pi else pj) + 1  # position de j une fois le segment retiré
+            changes = {ki: rest[:at] + seg + rest[at:]}
+        else:
+            changes = {ki: ri[:pi] + ri[pi + length:], kj: rj[:pj + 1] + seg + rj[pj + 1:]}
+        if all(self._ok(k, r) for k, r in changes.items()):
+            self._apply(changes)
+            return True
+        return False
+
+    def _swap(self, i, j):
+        D, routes, where = self.problem.D, self.routes, self.where
+        ki, kj = where[i], where[j]
+        if ki == kj:
+            return False
+        ri, rj = routes[ki], routes[kj]
+        pi, pj = self.pos[i], self.pos[j]
+        ai, bi = self._around(ri, pi)
+        aj, bj = self._around(rj, pj)
+        delta = (D[ai][j] + D[j][bi] - D[ai][i] - D[i][bi]) + \
+            (D[aj][i] + D[i][bj] - D[aj][j] - D[j][bj])
+        if delta > -EPS:
+            return False
+        changes = {ki: ri[:pi] + [j] + ri[pi + 1:], kj: rj[:pj] + [i] + rj[pj + 1:]}
+        if all(self._ok(k, r) for k, r in changes.items()):
+            self._apply(changes)
+            return True
+        return False
+
+    def _two_opt(self, i, j):
+        """Intra-route : inverse le segment entre les successeurs de i et j."""
+        D, routes, where = self.problem.D, self.routes, self.where
+        k = where[i]
+        if where[j] != k:
+            return False
+        route = routes[k]
+        p, q = self.pos[i], self.pos[j]
+        if p > q:
+            p, q = q, p
+        if q - p < 2:
+            return False
+        a, b = route[p], route[p + 1]
+        c = route[q]
+        d = route[q + 1] if q + 1 < len(route) else 0
+        delta = D[a][c] + D[b][d] - D[a][b] - D[c][d]
+        if not self.symmetric:
+            # Matrice asymétrique (temps routiers) : le segment b..c est parcouru à l'envers
+            seg = route[p + 1:q + 1]
+            delta += sum(D[seg[t + 1]][seg[t]] - D[seg[t]][seg[t + 1]] for t in range(len(seg) - 1))
+        if delta > -EPS:
+            return False
+        new_route = route[:p + 1] + route[p + 1:q + 1][::-1] + route[q + 1:]
+        if self._ok(k, new_route):
+            self._apply({k: new_route})
+            return True
+        return False
+
+    def _two_opt_star(self, i, j):
+        """Inter-routes : échange les fins de routes après i et après j."""
+        D, routes, where = self.problem.D, self.routes, self.where
+        ki, kj = where[i], where[j]
+        if ki == kj:
+            return False
+        ri, rj = routes[ki], routes[kj]
+        pi, pj = self.pos[i], self.pos[j]
+        ni = ri[pi + 1] if pi + 1 < len(ri) else 0
+        nj = rj[pj + 1] if pj + 1 < len(rj) else 0
+        delta = D[i][nj] + D[j][ni] - D[i][ni] - D[j][nj]
+        if delta > -EPS:
+            return False
+        changes = {ki: ri[:pi + 1] + rj[pj + 1:], kj: rj[:pj + 1] + ri[pi + 1:]}
+        if all(self._ok(k, r) for k, r in changes.items()):
+            self._apply(changes)
+            return True
+        return False
+
+    # ----------------------------------------------------------------- boucle
+    def run(self, routes, time_limit=None):
+        """Améliore ``{k: [indices]}`` jusqu'à l'optimum local ou la limite de temps."""
+        start = time.perf_counter()
+        self.routes = {k: list(r) for k, r in routes.items()}
+        self.where = {i: k for k, r in self.routes.items() for i in r}
+        self.pos = {i: p for r in self.routes.values() for p, i in enumerate(r)}
+        self.strict = {k: self.problem.schedule(k, r) is not None for k, r in self.routes.items()}
+
+        improved = True
+        while improved:
+            improved = False
+            for i in list(self.where):
+                if time_limit is not None and time.perf_counter() - start >= time_limit:
+                    return self.routes
+                for j in self.neighbours[i]:
+                    if j not in self.where or i not in self.where:
+                        continue
+                    if (self._two_opt(i, j) or self._relocate(i, j) or self._relocate(i, j, 2)
+                            or self._relocate(i, j, 3) or self._swap(i, j) or self._two_opt_star(i, j)):
+                        improved = True
+        return self.routes
+
+
+def improve_result(result, instance, dist=None, time_limit=None, neighbours=DEFAULT_NEIGHBOURS):
+    """Post-optimise un résultat de ``solve_instance`` ; retourne un nouveau dict résultat."""
+    problem = RoutingProblem(instance, dist=dist)
+    routes = LocalSearch(problem, neighbours).run(problem.from_result(result), time_limit=time_limit)
+    return problem.to_result(routes)
@@ -1,110 +1,286 @@
-from gurobipy import Model, GRB, quicksum
+import numpy as np
+import scipy.sparse as sp
+from gurobipy import Model, GRB
 
+from .gurobi_env import get_env
+from .routing import unserved_penalty
+from ..utils.distance import DistanceMatrix
 
-def build_vrp_model(patients, coords, s, skills_req, agents):
-    m = Model("VRP_Model")
+FORMULATIONS = ("mtz", "lazy")
 
-    # Calculer les distances euclidiennes
-    d = {}
-    for i in patients:
-        for j in patients:
-            if i != j:
-                xi, yi = coords[i]
-                xj, yj = coords[j]
-                d[i, j] = ((xi - xj) ** 2 + (yi - yj) ** 2) ** 0.5
 
-    M = 1000  # Big-M pour contraintes logiques
+def _rows(row, col, val, shape):
+    """Matrice creuse CSR à partir de triplets (ligne, colonne, valeur)."""
+    return sp.csr_matrix((val, (row, col)), shape=shape)
+
+
+def build_vrp_model(patients, coords, s, skills_req, agents, d=None, provider=None, time_windows=None,
+                    formulation="mtz", fractional_cuts=False, aggregate_agents=True, env=None,
+                    threads=None):
+    """Construit le modèle VRP avec l'API matricielle de gurobipy.
+
+    Les arcs, bornes et coefficients sont calculés en NumPy puis ajoutés en
+    bloc (``addMVar`` + contraintes creuses) sur un environnement réutilisé
+    et silencieux (``gurobi_env.get_env``). ``x`` et ``t`` sont retournés sous
+    forme de dicts ``{(i, j, k): Var}`` / ``{(i, k): Var}``.
+
+    ``formulation="mtz"`` élimine les sous-tours par les contraintes MTZ sur t ;
+    ``formulation="lazy"`` omet t et MTZ : sous-tours et chemins hors fenêtres
+    sont coupés à la volée par ``lazy_cuts.subtour_callback`` (t est alors vide),
+    avec en option des coupes fractionnaires aux noeuds (``fractional_cuts``).
+
+    ``aggregate_agents`` regroupe les agents interchangeables (mêmes
+    compétences, capacité et shift, cf. ``agent_types``) en un seul type de
+    multiplicité m : ses variables sont indexées par le premier agent du
+    groupe, jusqu'à m routes partent du dépôt et la capacité de chaque route
+    est portée par une charge cumulée. Les permutations d'agents identiques,
+    qui multiplient l'arbre de branchement, disparaissent ainsi du modèle.
+    ``m._types`` (``{représentant: agents}``) sert à réattribuer les routes.
+
+    ``threads`` limite les threads Gurobi de ce modèle (l'environnement partagé
+    n'est pas modifié).
+    """
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Formulation inconnue: {formulation!r}. Choix: {', '.join(FORMULATIONS)}")
+    m = Model("VRP_Model", env=env if env is not None else get_env())
+    if threads is not None:
+        m.Params.Threads = threads
+
+    # Temps de trajet (matrice NumPy partagée avec l'extraction des routes)
+    if d is None:
+        d = DistanceMatrix(patients, coords, provider=provider)
+
+    if time_windows is None:
+        time_windows = {}
+
+    # Positions : 0 = dépôt, puis les patients dans l'ordre de ``patients``
+    n = len(patients)
+    pos = np.array([d.index[p] for p in patients], dtype=np.intp)
+    D = np.asarray(d.matrix, dtype=float)[np.ix_(pos, pos)]
+    service = np.array([s[p] for p in patients], dtype=float)
+    types = agent_types(agents) if aggregate_agents else {k: [k] for k in agents}
+    agent_ids = list(types)
+    multiplicity = np.array([len(types[k]) for k in agent_ids], dtype=float)
+
+    # ==================== FENÊTRES ET ARCS ÉLIGIBLES ====================
+    # Un agent k ne peut servir que les patients dont il possède la compétence et
+    # qu'il peut atteindre dans leur fenêtre tout en rentrant avant la fin du shift.
+    # lb/ub : bornes resserrées de l'heure d'arrivée de k en chaque noeud.
+    # Un arc i -> j est éliminé si même au plus tôt on arrive après ub_j.
+    arc_i, arc_j, arc_k = [], [], []          # positions des extrémités, agent
+    t_node, t_agent, t_lb, t_ub = [], [], [], []
+    mtz_rows = []                              # (t_i, t_j, arc local, big-M)
+    n_arcs = 0
+    for kpos, k in enumerate(agent_ids):
+        skills = agents[k]["skills"]
+        shift_max = agents[k].get("shift_duration", 300)
+        cand = np.array([j for j in range(1, n) if skills_req[patients[j]] in skills], dtype=np.intp)
+        windows = np.array([time_windows.get(patients[j], (0, shift_max)) for j in cand],
+                           dtype=float).reshape(-1, 2)
+        earliest = np.maximum(windows[:, 0], D[0, cand])
+        latest = np.minimum(windows[:, 1], shift_max - service[cand] - D[cand, 0])
+        keep = earliest <= latest
+
+        nodes = np.concatenate(([0], cand[keep]))
+        lb_k = np.concatenate(([0.0], earliest[keep]))
+        ub_k = np.concatenate(([0.0], latest[keep]))
+        sub = D[np.ix_(nodes, nodes)]
+        ok = lb_k[:, None] + service[nodes][:, None] + sub <= ub_k[None, :]
+        ok[:, 0] = True  # retour au dépôt toujours possible (ub intègre le retour)
+        np.fill_diagonal(ok, False)
+        ii, jj = np.nonzero(ok)
+
+        t_base = len(t_node)
+        t_node.extend(nodes.tolist())
+        t_agent.extend([kpos] * len(nodes))
+        t_lb.extend(lb_k.tolist())
+        t_ub.extend(ub_k.tolist())
+
+        # MTZ avec big-M minimal M_ij = ub_i + s_i + d_ij - lb_j ; la contrainte
+        # est toujours satisfaite si M_ij <= 0 (cas de tous les arcs sortant du dépôt)
+        to_patient = jj != 0
+        big_m = ub_k[ii] + service[nodes[ii]] + sub[ii, jj] - lb_k[jj]
+        for a in np.nonzero(to_patient & (big_m > 0))[0].tolist():
+            mtz_rows.append((t_base + ii[a], t_base + jj[a], n_arcs + a, big_m[a]))
+
+        arc_i.append(nodes[ii])
+        arc_j.append(nodes[jj])
+        arc_k.append(np.full(len(ii), kpos, dtype=np.intp))
+        n_arcs += len(ii)
+
+    arc_i = np.concatenate(arc_i) if arc_i else np.zeros(0, dtype=np.intp)
+    arc_j = np.concatenate(arc_j) if arc_j else np.zeros(0, dtype=np.intp)
+    arc_k = np.concatenate(arc_k) if arc_k else np.zeros(0, dtype=np.intp)
+    t_node = np.array(t_node, dtype=np.intp)
+    t_agent = np.array(t_agent, dtype=np.intp)
+    n_agents = len(agent_ids)
+    arc_ids = np.arange(n_arcs)
+    into_patient = arc_j != 0
+    from_patient = arc_i != 0
 
     # ==================== VARIABLES ====================
-    # x[i,j,k] = 1 si l'agent k va de i à j
-    x = {}
-    for k in agents:
-        for i, j in d:
-            x[i, j, k] = m.addVar(vtype=GRB.BINARY, name=f"x_{i}_{j}_{k}")
-    
-    # t[i,k] = temps d'arrivée de l'agent k au noeud i
-    t = {}
-    for k in agents:
-        for i in patients:
-            t[i, k] = m.addVar(vtype=GRB.CONTINUOUS, lb=0, name=f"t_{i}_{k}")
+    # x[a] = 1 si l'agent arc_k[a] va de arc_i[a] à arc_j[a] (arcs éligibles uniquement)
+    x_mvar = m.addMVar(n_arcs, vtype=GRB.BINARY, name="x")
 
-    m.update()
+    # t = temps d'arrivée de l'agent k au noeud i, borné par sa fenêtre
+    # (formulation "lazy" : pas de t, les horaires sont vérifiés par le callback)
+    if formulation == "mtz":
+        t_mvar = m.addMVar(len(t_node), lb=np.array(t_lb), ub=np.array(t_ub), name="t")
+
+    # u[j] = 1 si le patient j n'est pas servi (flotte insuffisante pour les fenêtres)
+    served_rows = np.full(n, -1, dtype=np.intp)
+    servable = np.unique(arc_j[into_patient])
+    served_rows[servable] = np.arange(len(servable))
+    u_mvar = m.addMVar(len(servable), vtype=GRB.BINARY, name="non_servi")
 
     # ==================== CONTRAINTES ====================
-    
-    # 1. CONTRAINTE D'AFFECTATION : Chaque patient visité exactement 1 fois par un agent compétent
-    for j in patients[1:]:
-        eligible = [k for k in agents if skills_req[j] in agents[k]["skills"]]
-        if eligible:
-            m.addConstr(
-                quicksum(x[i, j, k] for i in patients if i != j for k in eligible) == 1,
-                name=f"visit_patient_{j}"
-            )
+
+    # 1. CONTRAINTE D'AFFECTATION : Chaque patient visité au plus 1 fois par un agent
+    # compétent ; u[j] pénalisé dans l'objectif (plus que le coût de tous les arcs).
+    if len(servable):
+        A = _rows(served_rows[arc_j[into_patient]], arc_ids[into_patient],
+                  np.ones(into_patient.sum()), (len(servable), n_arcs))
+        m.addConstr(A @ x_mvar + u_mvar == 1, name="visit_patient")
 
     # 2. CONSERVATION DE FLUX : Ce qui entre = ce qui sort pour chaque agent et noeud
-    for k in agents:
-        for j in patients[1:]:  # Seulement pour les patients, pas le dépôt
-            m.addConstr(
-                quicksum(x[i, j, k] for i in patients if i != j) == 
-                quicksum(x[j, i, k] for i in patients if i != j),
-                name=f"flow_conservation_{k}_{j}"
-            )
-
-    # 3. DÉPART ET RETOUR AU DÉPÔT : Chaque agent peut partir du dépôt et y retourner
-    for k in agents:
-        # Si on part, on doit revenir
-        m.addConstr(
-            quicksum(x[0, j, k] for j in patients[1:]) == 
-            quicksum(x[j, 0, k] for j in patients[1:]),
-            name=f"depart_retour_{k}"
-        )
-
-    # 4. ÉLIMINATION DE SOUS-TOURS (MTZ - Miller-Tucker-Zemlin)
-    # Si agent k va de i à j, alors t[j,k] >= t[i,k] + s[i] + temps_trajet
-    for k in agents:
-        for i in patients:
-            for j in patients[1:]:  # Seulement vers les patients, pas vers le dépôt
-                if i != j and (i, j) in d:
-                    travel_time = d[i, j]
-                    m.addConstr(
-                        t[j, k] >= t[i, k] + s[i] + travel_time - M * (1 - x[i, j, k]),
-                        name=f"mtz_{k}_{i}_{j}"
-                    )
-
-    # 5. FENÊTRES TEMPORELLES : Respect des time windows des patients
-    # Note: s contient les durées de service, on doit recevoir les fenêtres depuis solver
-    for k in agents:
-        # Dépôt : temps initial = 0
-        m.addConstr(t[0, k] == 0, name=f"depot_time_{k}")
-        
-        # Patients : arrivée dans une fenêtre raisonnable (simplifiée)
-        for j in patients[1:]:
-            # Contrainte souple : on peut arriver jusqu'à 300 unités de temps
-            m.addConstr(t[j, k] <= 300, name=f"time_window_end_{k}_{j}")
+    flow_row = arc_k * n  # une ligne par (agent, position du patient)
+    F = _rows(
+        np.concatenate((flow_row[into_patient] + arc_j[into_patient],
+                        flow_row[from_patient] + arc_i[from_patient])),
+        np.concatenate((arc_ids[into_patient], arc_ids[from_patient])),
+        np.concatenate((np.ones(into_patient.sum()), -np.ones(from_patient.sum()))),
+        (n_agents * n, n_arcs),
+    )
+    used = np.unique(F.nonzero()[0])
+    if len(used):
+        m.addConstr(F[used] @ x_mvar == 0, name="flow_conservation")
+
+    # 3. DÉPART ET RETOUR AU DÉPÔT : Chaque agent part au plus une fois et revient
+    leaves, returns = ~from_patient, ~into_patient
+    if n_arcs:
+        depart = _rows(arc_k[leaves], arc_ids[leaves], np.ones(leaves.sum()), (n_agents, n_arcs))
+        retour = _rows(arc_k[returns], arc_ids[returns], np.ones(returns.sum()), (n_agents, n_arcs))
+        m.addConstr((depart - retour) @ x_mvar == 0, name="depart_retour")
+        m.addConstr(depart @ x_mvar <= multiplicity, name="depart_unique")
+
+    # 4. ÉLIMINATION DE SOUS-TOURS (MTZ) avec big-M minimal par arc
+    # t[j,k] - t[i,k] - M_ij x[i,j,k] >= s_i + d_ij - M_ij
+    if formulation == "mtz" and mtz_rows:
+        ti, tj, arc, big_m = (np.array(col) for col in zip(*mtz_rows))
+        rows = np.arange(len(mtz_rows))
+        T = _rows(np.concatenate((rows, rows)), np.concatenate((tj, ti)),
+                  np.concatenate((np.ones(len(rows)), -np.ones(len(rows)))), (len(rows), len(t_node)))
+        X = _rows(rows, arc, -big_m, (len(rows), n_arcs))
+        rhs = service[arc_i[arc]] + D[arc_i[arc], arc_j[arc]] - big_m
+        mtz = m.addConstr(T @ t_mvar + X @ x_mvar >= rhs, name="mtz")
+
+    # 5. FENÊTRES TEMPORELLES : portées par les bornes de t (dépôt : t = 0)
 
     # 6. CAPACITÉ DES AGENTS : Nombre maximum de patients par agent
-    for k in agents:
-        max_capacity = agents[k].get("max_patients", len(patients))
-        m.addConstr(
-            quicksum(x[i, j, k] for i in patients for j in patients[1:] if i != j) <= max_capacity,
-            name=f"capacity_{k}"
-        )
-
-    # 7. DURÉE MAXIMALE DU SHIFT : Temps total de la tournée
-    for k in agents:
-        shift_max = agents[k].get("shift_duration", 300)
-        # Le temps de retour au dépôt doit respecter le shift max
-        m.addConstr(
-            t[0, k] <= shift_max,
-            name=f"shift_duration_{k}"
-        )
+    # (pour un type agrégé : capacité totale du groupe, chaque route étant
+    # bornée par la charge q[j,k] = rang de j sur sa route, 1 <= q <= capacité)
+    if n_arcs:
+        capacity = np.array([agents[k].get("max_patients", n) for k in agent_ids], dtype=float)
+        C = _rows(arc_k[into_patient], arc_ids[into_patient], np.ones(into_patient.sum()),
+                  (n_agents, n_arcs))
+        m.addConstr(C @ x_mvar <= capacity * multiplicity, name="capacity")
+
+        # q[j,k] - q[i,k] - Q x[i,j,k] >= 1 - Q sur les arcs entre patients, inutile
+        # si le type ne peut de toute façon pas servir plus de Q patients
+        servable_by = np.bincount(t_agent, minlength=n_agents) - 1
+        loaded = (multiplicity > 1) & (servable_by > capacity)
+        load_t = np.nonzero(loaded[t_agent] & (t_node != 0))[0]
+        load_arcs = np.nonzero(loaded[arc_k] & from_patient & into_patient)[0]
+        if len(load_arcs):
+            load_row = np.full(len(t_node), -1, dtype=np.intp)
+            load_row[load_t] = np.arange(len(load_t))
+            q_mvar = m.addMVar(len(load_t), lb=1.0, ub=capacity[t_agent[load_t]], name="charge")
+            # indices t des extrémités de chaque arc (noeud, type)
+            t_index = {(node, k): idx for idx, (node, k) in enumerate(zip(t_node.tolist(), t_agent.tolist()))}
+            qi = load_row[[t_index[i, k] for i, k in zip(arc_i[load_arcs].tolist(), arc_k[load_arcs].tolist())]]
+            qj = load_row[[t_index[j, k] for j, k in zip(arc_j[load_arcs].tolist(), arc_k[load_arcs].tolist())]]
+            rows = np.arange(len(load_arcs))
+            big_q = capacity[arc_k[load_arcs]]
+            Q = _rows(np.concatenate((rows, rows)), np.concatenate((qj, qi)),
+                      np.concatenate((np.ones(len(rows)), -np.ones(len(rows)))), (len(rows), len(load_t)))
+            X = _rows(rows, load_arcs, -big_q, (len(rows), n_arcs))
+            m.addConstr(Q @ q_mvar + X @ x_mvar >= 1 - big_q, name="charge_route")
+
+    # 7. DURÉE MAXIMALE DU SHIFT : intégrée à ub (t[j,k] + s[j] + d[j,0] <= shift),
+    # donc le retour au dépôt est respecté quel que soit le dernier patient visité.
 
     # ==================== FONCTION OBJECTIF ====================
     # Minimiser la distance totale parcourue par tous les agents
-    m.setObjective(
-        quicksum(d[i, j] * x[i, j, k] for i, j in d for k in agents),
-        GRB.MINIMIZE
-    )
+    # (+ pénalité des patients non servis)
+    arc_cost = D[arc_i, arc_j]
+    m.setObjective(arc_cost @ x_mvar + unserved_penalty(arc_cost) * u_mvar.sum(), GRB.MINIMIZE)
+
+    # Vues par clés pour l'extraction, les MIP starts et les callbacks
+    ids = np.array(patients, dtype=object)
+    x_keys = list(zip(ids[arc_i].tolist(), ids[arc_j].tolist(), [agent_ids[k] for k in arc_k.tolist()]))
+    x = dict(zip(x_keys, x_mvar.tolist()))
+    t_keys = list(zip(ids[t_node].tolist(), [agent_ids[k] for k in t_agent.tolist()]))
+    t = dict(zip(t_keys, t_mvar.tolist())) if formulation == "mtz" else {}
+
+    # Lignes modifiables en place par une session incrémentale (``session.SolverSession``)
+    m._u = dict(zip(ids[servable].tolist(), u_mvar.tolist()))
+    m._types = types
+    m._mtz = {}
+    if formulation == "mtz" and mtz_rows:
+        m._mtz = {x_keys[a]: c for a, c in zip(arc.tolist(), mtz.tolist())}
+
+    if formulation == "lazy":
+        # Données lues par le callback de séparation
+        m.Params.LazyConstraints = 1
+        if fractional_cuts:
+            m.Params.PreCrush = 1  # requis pour que les coupes ``cbCut`` passent au modèle présolvé
+        m._vrp = {
+            "x_keys": x_keys,
+            "x_vars": list(x.values()),
+            "x": x,
+            "s": s,
+            "d": d,
+            "lb": dict(zip(t_keys, t_lb)),
+            "ub": dict(zip(t_keys, t_ub)),
+            "agents": agent_ids,
+            "fractional_cuts": fractional_cuts,
+        }
 
     m.update()
     return m, x, t, d
+
+
+def agent_types(agents):
+    """Types d'agents interchangeables ``{représentant: [agents]}``, dans l'ordre de ``agents``.
+
+    Deux agents sont interchangeables s'ils ont les mêmes compétences, la même
+    capacité et la même durée de shift (ils partent tous du dépôt).
+    """
+    types, representative = {}, {}
+    for k, agent in agents.items():
+        key = (tuple(sorted(agent["skills"])), agent.get("max_patients"), agent.get("shift_duration", 300))
+        types.setdefault(representative.setdefault(key, k), []).append(k)
+    return types
+
+
+def set_mip_start(x, t, routes, arrivals, types=None):
+    """Initialise les attributs ``Start`` à partir d'une solution heuristique.
+
+    ``routes`` : {agent: [0, p1, ..., 0]} ; ``arrivals`` : {(noeud, agent): heure}.
+    Avec un modèle agrégé, ``types`` (``m._types``) ramène chaque agent à son
+    représentant. Tous les arcs reçoivent une valeur (1 sur les routes, 0
+    ailleurs) ; les temps des noeuds non visités et les charges restent
+    indéfinis et sont complétés par Gurobi.
+    """
+    type_of = {a: k for k, group in (types or {}).items() for a in group}
+    used, start = set(), {}
+    for a, route in routes.items():
+        k = type_of.get(a, a)
+        for i, j in zip(route, route[1:]):
+            if i != j:
+                used.add((i, j, k))
+        start.update({(i, k): arrivals[i, a] for i in route if (i, a) in arrivals})
+    for key, var in x.items():
+        var.Start = 1.0 if key in used else 0.0
+    for key, var in t.items():
+        var.Start = start.get(key, GRB.UNDEFINED)
@@ -0,0 +1,128 @@
+"""Données de routage denses partagées par les moteurs heuristiques.
+
+Les noeuds sont indexés de façon contiguë (0 = dépôt) comme dans
+``DistanceMatrix`` ; les routes manipulées ici sont des listes d'indices de
+patients, sans le dépôt. Un horaire respecte les règles du modèle Gurobi :
+départ du dépôt à 0, arrivée ``max(tw_start, départ précédent + trajet)``
+qui doit être ``<= tw_end``, retour au dépôt avant ``shift_duration``.
+"""
+
+import numpy as np
+
+from ..utils.distance import DistanceMatrix
+
+
+def unserved_penalty(arc_costs):
+    """Pénalité d'un patient non servi : somme des coûts de tous les arcs + 1.
+
+    Une solution n'emprunte chaque arc qu'une fois, son coût de routage est
+    donc inférieur à cette somme : servir un patient de plus est toujours
+    préférable, quel que soit le détour imposé par la capacité ou les fenêtres
+    (matrices asymétriques ou non métriques comprises).
+    """
+    return float(np.sum(arc_costs)) + 1.0
+
+
+class RoutingProblem:
+    """Vue indexée d'une VRPInstance pour les algorithmes de construction/recherche."""
+
+    def __init__(self, instance, dist=None, provider=None):
+        self.instance = instance
+        self.dist = dist if dist is not None else DistanceMatrix.from_instance(instance, provider=provider)
+        self.ids = list(self.dist.ids)
+        self.depot_id = instance.depot.id
+        # Listes Python : accès scalaire bien plus rapide qu'un ndarray dans les boucles
+        self.D = self.dist.matrix.tolist()
+
+        n = len(self.ids)
+        self.service = [0] * n
+        self.tw_start = [0] * n
+        self.tw_end = [float("inf")] * n
+        self.skill = [None] * n
+        for p in instance.patients:
+            idx = self.dist.index[p.id]
+            self.service[idx] = p.duration
+            self.tw_start[idx], self.tw_end[idx] = p.time_window
+            self.skill[idx] = p.required_skill
+
+        self.agent_ids = [a.id for a in instance.agents]
+        self.capacity = [a.max_patients for a in instance.agents]
+        self.shift = [a.shift_duration for a in instance.agents]
+        by_skill = {}
+        for i in range(1, n):
+            by_skill.setdefault(self.skill[i], []).append(i)
+        self.compatible = [
+            {i for s in a.skills for i in by_skill.get(s, ())} for a in instance.agents
+        ]
+        # Bitmask des agents compétents pour chaque patient
+        self.agent_mask = [0] * n
+        for k, servable in enumerate(self.compatible):
+            for i in servable:
+                self.agent_mask[i] |= 1 << k
+
+    @property
+    def patient_indices(self):
+        return range(1, len(self.ids))
+
+    def route_cost(self, route):
+        """Distance d'une route (indices de patients) avec aller/retour au dépôt."""
+        if not route:
+            return 0.0
+        D = self.D
+        total = D[0][route[0]] + D[route[-1]][0]
+        for a, b in zip(route, route[1:]):
+            total += D[a][b]
+        return total
+
+    def schedule(self, k, route, start=0.0, prev=0):
+        """Heures d'arrivée sur ``route`` pour l'agent k, ou None si infaisable.
+
+        ``start`` et ``prev`` permettent de reprendre un horaire partiel : départ
+        à l'instant ``start`` depuis le noeud ``prev``.
+        """
+        D, tw_start, tw_end, service = self.D, self.tw_start, self.tw_end, self.service
+        t, last = start, prev
+        arrivals = []
+        for i in route:
+            t = max(tw_start[i], t + D[last][i])
+            if t > tw_end[i]:
+                return None
+            arrivals.append(t)
+            t += service[i]
+            last = i
+        if t + D[last][0] > self.shift[k]:
+            return None
+        return arrivals
+
+    def is_feasible(self, k, route):
+        """Compétences, capacité et horaire d'une route pour l'agent k."""
+        if len(route) > self.capacity[k]:
+            return False
+        servable = self.compatible[k]
+        if any(i not in servable for i in route):
+            return False
+        return self.schedule(k, route) is not None
+
+    def to_result(self, routes):
+        """Convertit ``{k: [indices]}`` au format résultat de ``solve_instance``."""
+        ids, depot = self.ids, self.depot_id
+        result = {}
+        for k, aid in enumerate(self.agent_ids):
+            route = routes.get(k, [])
+            visited = [ids[i] for i in route]
+            result[aid] = {
+                "route": [depot] + visited + [depot],
+                "visited_patients": visited,
+                "total_distance": self.route_cost(route),
+                "arrival_times": dict(zip(visited, self.schedule(k, route) or [])),
+            }
+        return result
+
+    def from_result(self, result):
+        """Inverse de ``to_result`` : ``{k: [indices]}`` depuis un dict résultat."""
+        index = self.dist.index
+        routes = {}
+        for k, aid in enumerate(self.agent_ids):
+            info = result.get(aid)
+            routes[k] = [index[pid] for pid in info["visited_patients"]] if info else []
+        return routes
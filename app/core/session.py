@@ -0,0 +1,180 @@
+"""Session de ré-optimisation incrémentale pour l'édition interactive.
+
+Une ``SolverSession`` garde le dernier modèle Gurobi (formulation MTZ) et ses
+variables. Quand un patient est modifié (coordonnées, durée, compétence,
+fenêtre), seuls la ligne/colonne de distances, les coefficients d'objectif,
+les bornes de t, l'éligibilité des arcs et les lignes MTZ touchant ce patient
+sont mis à jour ; la résolution repart de la solution précédente (MIP start).
+Si l'édition change la structure du modèle (un arc ou un agent devient
+éligible alors qu'il n'a pas de variable), le modèle est reconstruit, toujours
+avec la solution précédente comme point de départ.
+
+La session travaille sur sa propre copie de l'instance : les éditions,
+appliquées dans le thread de résolution, ne modifient jamais l'objet lu par
+la GUI (qui reporte elle-même l'édition sur son instance).
+"""
+
+import copy
+
+from .model_builder import build_vrp_model, set_mip_start, unserved_penalty
+from .routing import RoutingProblem
+from .solver import MAX_EXACT_AGENTS, MAX_EXACT_PATIENTS, _build_internal_sets, _optimize
+from ..utils.distance import DistanceMatrix
+
+
+class SolverSession:
+    """Modèle Gurobi persistant pour une VRPInstance éditée au fil de l'eau."""
+
+    def __init__(self, instance, provider=None, time_limit=None, mip_gap=None):
+        if len(instance.patients) > MAX_EXACT_PATIENTS or len(instance.agents) > MAX_EXACT_AGENTS:
+            raise ValueError(f"Instance trop grande: {len(instance.patients)} patients, "
+                             f"{len(instance.agents)} agents. Max: 10 patients, 10 agents")
+        self.instance = copy.deepcopy(instance)
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        (self.patients, self.coords, self.s, self.skills_req,
+         self.agents, self.tw) = _build_internal_sets(instance)
+        self.dist = DistanceMatrix(self.patients, self.coords, provider=provider)
+        self.model = None
+        self.result = {}
+        self.rebuilds = 0
+        self._edited = None
+
+    # ------------------------------------------------------------- résolution
+    def solve(self, control=None):
+        """Résout (ou ré-optimise) ; retourne ``(result, coords)`` comme ``solve_instance``.
+
+        ``control`` (``SolveControl``) permet d'annuler et de suivre les incumbents.
+        """
+        if self.model is None:
+            self._build()
+        if self.result:
+            self._warm_start()
+        self.result = _optimize(self.model, self.x, self.t, self.instance, self.dist, self.agents,
+                                time_limit=self.time_limit, mip_gap=self.mip_gap, control=control)
+        return self.result, dict(self.coords)
+
+    def _build(self):
+        self.model, self.x, self.t, _ = build_vrp_model(
+            self.patients, self.coords, self.s, self.skills_req, self.agents,
+            d=self.dist, time_windows=self.tw)
+        self.nodes = {k: [i for (i, kk) in self.t if kk == k] for k in self.model._types}
+        self.rebuilds += 1
+
+    def _warm_start(self):
+        """MIP start depuis le dernier résultat, rendu faisable pour l'instance éditée."""
+        problem = RoutingProblem(self.instance, dist=self.dist)
+        index, ids, depot = self.dist.index, problem.ids, problem.depot_id
+        routes, arrivals = {}, {}
+        for k, aid in enumerate(problem.agent_ids):
+            info = self.result.get(aid)
+            route = [index[pid] for pid in info["visited_patients"]] if info else []
+            if not problem.is_feasible(k, route):
+                # Le patient édité n'a plus sa place : il est retiré de la route
+                route = [i for i in route if ids[i] != self._edited]
+                if not problem.is_feasible(k, route):
+                    route = []
+            routes[aid] = [depot] + [ids[i] for i in route] + [depot]
+            arrivals[depot, aid] = 0.0
+            for i, arrival in zip(route, problem.schedule(k, route) or []):
+                arrivals[ids[i], aid] = arrival
+        set_mip_start(self.x, self.t, routes, arrivals, types=self.model._types)
+
+    # ---------------------------------------------------------------- édition
+    def update_patient(self, pid, coords=None, duration=None, skill=None, time_window=None):
+        """Applique une édition du patient ``pid`` ; retourne True si le modèle a été patché.
+
+        False signifie que le modèle sera reconstruit au prochain ``solve``.
+        """
+        patient = self.instance.get_patient_by_id(pid)
+        if patient is None:
+            raise ValueError(f"Patient inconnu: {pid}")
+        if coords is not None:
+            patient.set_coords(*coords)
+            self.coords[pid] = tuple(coords)
+            self.dist.update_node(pid, self.coords[pid])
+        if duration is not None:
+            patient.set_duration(duration)
+        if skill is not None:
+            patient.set_skill(skill)
+        if time_window is not None:
+            patient.time_window = list(time_window)
+        self.s[pid] = patient.duration
+        self.skills_req[pid] = patient.required_skill
+        self.tw[pid] = tuple(patient.time_window)
+        self._edited = pid
+
+        if self.model is None:
+            return False
+        if not self._patch(pid):
+            self.model.dispose()
+            self.model = None
+            return False
+        return True
+
+    def _patch(self, pid):
+        """Met à jour en place les éléments du modèle touchant ``pid`` ; False si impossible."""
+        m, x, t, d, s = self.model, self.x, self.t, self.dist, self.s
+        depot = self.patients[0]
+        if pid not in m._u and any(self._window(pid, k) for k in self.agents):
+            return False
+
+        bounds = dict(zip(t, zip(m.getAttr("LB", list(t.values())), m.getAttr("UB", list(t.values())))))
+        changes = []  # (clé d'arc, éligible)
+        for k in m._types:  # un représentant par type d'agents interchangeables
+            window = self._window(pid, k)
+            if (pid, k) not in t:
+                if window:
+                    return False  # nouvel agent possible pour pid : pas de variables
+                continue
+            lb_p, ub_p = window or (0.0, 0.0)
+            bounds[pid, k] = (lb_p, ub_p)
+            for i in self.nodes[k]:
+                if i == pid:
+                    continue
+                lb_i, ub_i = bounds[i, k]
+                changes.append(((i, pid, k), window is not None and lb_i + s[i] + d[i, pid] <= ub_p))
+                changes.append(((pid, i, k), window is not None and (i == depot or lb_p + s[pid] + d[pid, i] <= ub_i)))
+        if any(ok and key not in x for key, ok in changes):
+            return False
+
+        for k in m._types:
+            if (pid, k) in t:
+                var = t[pid, k]
+                var.LB, var.UB = bounds[pid, k]
+        for key, ok in changes:
+            old = m._mtz.pop(key, None)
+            if old is not None:
+                m.remove(old)
+            var = x.get(key)
+            if var is None:
+                continue
+            i, j, k = key
+            var.UB = 1.0 if ok else 0.0
+            var.Obj = d[i, j]
+            if not ok or j == depot:
+                continue
+            # MTZ avec le big-M minimal recalculé (cf. model_builder)
+            big_m = bounds[i, k][1] + s[i] + d[i, j] - bounds[j, k][0]
+            if big_m > 0:
+                m._mtz[key] = m.addConstr(t[j, k] - t[i, k] - big_m * var >= s[i] + d[i, j] - big_m,
+                                          name=f"mtz_{i}_{j}_{k}")
+
+        # Un patient qu'aucun agent ne peut plus servir n'est pas pénalisé (pas de u au build)
+        penalty = unserved_penalty(m.getAttr("Obj", list(x.values())))
+        servable = any(ok for _, ok in changes)
+        for p, var in m._u.items():
+            var.Obj = penalty if p != pid or servable else 0.0
+        m.update()
+        return True
+
+    def _window(self, pid, k):
+        """Bornes (lb, ub) d'arrivée de l'agent k chez pid, ou None s'il ne peut pas le servir."""
+        agent, depot = self.agents[k], self.patients[0]
+        if self.skills_req[pid] not in agent["skills"]:
+            return None
+        shift = agent.get("shift_duration", 300)
+        a, b = self.tw.get(pid, (0, shift))
+        earliest = max(a, self.dist[depot, pid])
+        latest = min(b, shift - self.s[pid] - self.dist[pid, depot])
+        return (earliest, latest) if earliest <= latest else None
@@ -1,8 +1,25 @@
-from gurobipy import GRB
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-from ..gui.data_generator import generate_instance
-from .model_builder import build_vrp_model
+from ..models.generator import generate_instance
+from .alns import DEFAULT_TIME_LIMIT as ALNS_TIME_LIMIT, solve_alns
+from .cache import canonical_key, get_default_cache
+from .clustering import cluster_instance, repair_boundaries
+from .decomposition import merge_results, split_instance
+from .heuristic import construct_routes, solve_heuristic
+from .local_search import LocalSearch, improve_result
+from .routing import RoutingProblem
 from ..models.domain import VRPInstance
+from ..utils.distance import DistanceMatrix
+from ..utils.travel_time import EuclideanProvider
+
+# gurobipy (et scipy via model_builder) ne sont importés qu'à la première
+# résolution exacte : les moteurs heuristiques et le CLI (``app.solve``)
+# démarrent sans payer leur chargement ni la vérification de licence.
+_worker_threads = None  # plafond de threads Gurobi d'un processus de ``solve_many``
+
+logger = logging.getLogger(__name__)
 
 
 def _build_internal_sets(instance: VRPInstance):
@@ -15,11 +32,13 @@ def _build_internal_sets(instance: VRPInstance):
     coords = {depot.id: depot.get_coords()}
     service_times = {depot.id: 0}
     skills_req = {}
+    time_windows = {}
 
     for p in patients_list:
         coords[p.id] = p.get_coords()
         service_times[p.id] = p.duration
         skills_req[p.id] = p.required_skill
+        time_windows[p.id] = tuple(p.time_window)
 
     # Construire le dict agents avec toutes les propriétés
     agents = {}
@@ -30,62 +49,290 @@ def _build_internal_sets(instance: VRPInstance):
             "shift_duration": a.shift_duration
         }
     
-    return patients, coords, service_times, skills_req, agents
+    return patients, coords, service_times, skills_req, agents, time_windows
+
+
+def _extract_routes(m, x, agents, types=None):
+    """Routes depuis une solution Gurobi en un seul ``getAttr`` et en O(|arcs|).
+
+    Retourne ``(routes, subtours)`` : la route issue du dépôt de chaque agent et
+    les cycles éventuels détachés du dépôt (qui ne devraient jamais apparaître).
+    """
+    return _routes_from_values(x, m.getAttr("X", list(x.values())), agents, types)
+
 
+def _routes_from_values(x, values, agents, types=None):
+    """``(routes, subtours)`` depuis les valeurs des variables x, dans l'ordre de ``x``.
+
+    Avec un modèle agrégé (``types`` = ``m._types``), les routes partant du
+    dépôt pour un type sont attribuées dans l'ordre aux agents du groupe.
+    """
+    if types is None:
+        types = {k: [k] for k in agents}
+    successors = {k: {} for k in types}
+    starts = {k: [] for k in types}
+    for (i, j, k), value in zip(x, values):
+        if value > 0.5:
+            if i == 0:
+                starts[k].append(j)
+            else:
+                successors[k][i] = j
 
-def _extract_routes(patients, agents, x, coords):
     routes = {}
-    for k in agents:
-        route = [0]
-        current = 0
-        visited = set()
-
-        while len(visited) < len(patients) - 1:
-            next_node = None
-            for j in patients[1:]:
-                if j == current or j in visited:
-                    continue
-                if x[current, j, k].X > 0.5:
-                    next_node = j
-                    break
-            if next_node is None:
-                break
-            route.append(next_node)
-            visited.add(next_node)
-            current = next_node
-
-        route.append(0)
-        routes[k] = route
-    return routes
-
-
-def _result_with_distance(routes, coords):
+    subtours = []
+    for k, group in types.items():
+        succ = successors[k]
+        for a, current in zip(group, starts[k] + [0] * len(group)):
+            route = [0]
+            while current != 0:
+                route.append(current)
+                current = succ.pop(current, 0)
+            route.append(0)
+            routes[a] = route
+
+        # Arcs restants : sous-tours sans passage par le dépôt
+        while succ:
+            start, current = succ.popitem()
+            cycle = [start]
+            while current in succ:
+                cycle.append(current)
+                current = succ.pop(current)
+            subtours.append((k, cycle))
+    return {a: routes[a] for a in agents}, subtours
+
+
+def _extract_arrivals(m, t, routes=None):
+    """Heures d'arrivée ``{(noeud, agent): heure}`` en un seul ``getAttr``."""
+    if not t:
+        return {}
+    return _agent_arrivals(dict(zip(t, m.getAttr("X", list(t.values())))), routes, getattr(m, "_types", None))
+
+
+def _agent_arrivals(arrivals, routes, types):
+    """Réindexe les heures ``(noeud, type)`` d'un modèle agrégé par agent, selon ``routes``."""
+    if not types or routes is None:
+        return arrivals
+    type_of = {a: k for k, group in types.items() for a in group}
+    return {(i, a): arrivals[i, type_of[a]] for a, route in routes.items() for i in route
+            if (i, type_of[a]) in arrivals}
+
+
+def _result_with_distance(routes, dist, arrivals=None):
+    arrivals = arrivals or {}
     result = {}
     for aid, route in routes.items():
-        total = 0.0
-        for i in range(len(route) - 1):
-            x1, y1 = coords[route[i]]
-            x2, y2 = coords[route[i + 1]]
-            total += ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5
+        visited = [pid for pid in route if pid != 0]
         result[aid] = {
             "route": route,
-            "visited_patients": [pid for pid in route if pid != 0],
-            "total_distance": total,
+            "visited_patients": visited,
+            "total_distance": dist.route_length(route),
+            "arrival_times": {pid: arrivals[pid, aid] for pid in visited if (pid, aid) in arrivals},
         }
     return result
 
 
-def solve_instance(data=None, test_type="Random Small", num_patients=None, num_agents=3, seed=None):
+def unserved_patients(instance, result):
+    """Ids des patients de l'instance absents de toutes les routes de ``result``."""
+    served = {pid for r in result.values() for pid in r["visited_patients"]}
+    return [p.id for p in instance.patients if p.id not in served]
+
+
+def _scheduled_arrivals(instance, dist, routes):
+    """Heures d'arrivée au plus tôt (formulation ``lazy``, sans variables t)."""
+    problem = RoutingProblem(instance, dist=dist)
+    index = dist.index
+    arrivals = {}
+    for k, aid in enumerate(problem.agent_ids):
+        visited = [pid for pid in routes.get(aid, []) if pid != 0]
+        times = problem.schedule(k, [index[pid] for pid in visited]) or []
+        arrivals.update({(pid, aid): time for pid, time in zip(visited, times)})
+    return arrivals
+
+
+MAX_EXACT_PATIENTS = 10  # Limites de la licence Gurobi restreinte
+MAX_EXACT_AGENTS = 10
+
+ENGINES = ("auto", "gurobi", "heuristic", "alns")
+
+
+def _heuristic_start(instance, dist):
+    """Routes et heures d'arrivée heuristiques, au format des variables x/t."""
+    problem = RoutingProblem(instance, dist=dist)
+    routes, _ = construct_routes(problem)
+    routes = LocalSearch(problem).run(routes)
+    ids, depot = problem.ids, problem.depot_id
+    start_routes, arrivals = {}, {}
+    for k, route in routes.items():
+        aid = problem.agent_ids[k]
+        start_routes[aid] = [depot] + [ids[i] for i in route] + [depot]
+        arrivals[depot, aid] = 0.0
+        for i, arrival in zip(route, problem.schedule(k, route) or []):
+            arrivals[ids[i], aid] = arrival
+    return start_routes, arrivals
+
+
+def _incumbent_callback(x, t, instance, dist, agents, control, lazy):
+    """Callback Gurobi : coupes paresseuses, annulation et diffusion des incumbents."""
+    from gurobipy import GRB
+    from .lazy_cuts import subtour_callback
+
+    x_vars, t_vars = list(x.values()), list(t.values())
+
+    def callback(model, where):
+        cuts = subtour_callback(model, where) if lazy else 0
+        if control is None:
+            return
+        if control.cancelled:
+            model.terminate()
+            return
+        # Une solution coupée par le callback paresseux n'est pas un incumbent
+        if where != GRB.Callback.MIPSOL or cuts:
+            return
+        objective = model.cbGet(GRB.Callback.MIPSOL_OBJ)
+        if not control.improves(objective):
+            return
+        routes, subtours = _routes_from_values(x, model.cbGetSolution(x_vars), agents, model._types)
+        if subtours:
+            return
+        if t:
+            arrivals = _agent_arrivals(dict(zip(t, model.cbGetSolution(t_vars))), routes, model._types)
+        else:
+            arrivals = _scheduled_arrivals(instance, dist, routes)
+        control.report(_result_with_distance(routes, dist, arrivals), objective,
+                       model.cbGet(GRB.Callback.MIPSOL_OBJBND))
+
+    return callback
+
+
+def _optimize(m, x, t, instance, dist, agents, lazy=False, time_limit=None, mip_gap=None, control=None):
+    """Lance ``m.optimize`` et retourne la meilleure solution trouvée ({} s'il n'y en a aucune).
+
+    Toute solution réalisable est retournée (limite de temps, écart atteint,
+    annulation), pas seulement un optimum prouvé.
+    """
+    if time_limit is not None:
+        m.Params.TimeLimit = time_limit
+    if mip_gap is not None:
+        m.Params.MIPGap = mip_gap
+    callback = None
+    if lazy or control is not None:
+        callback = _incumbent_callback(x, t, instance, dist, agents, control, lazy)
+
+    if control is None:
+        m.optimize(callback)
+    else:
+        control.attach(m)
+        try:
+            if not control.cancelled:
+                m.optimize(callback)
+        finally:
+            control.detach(m)
+
+    if m.SolCount == 0:
+        return {}
+    routes, subtours = _extract_routes(m, x, agents, m._types)
+    for k, cycle in subtours:
+        logger.warning("Sous-tour ignoré pour l'agent %s: %s", k, cycle)
+    arrivals = _extract_arrivals(m, t, routes) or _scheduled_arrivals(instance, dist, routes)
+    return _result_with_distance(routes, dist, arrivals)
+
+
+def _solve_gurobi(instance, dist, time_limit=None, warm_start=False, formulation="mtz", mip_gap=None,
+                  control=None, fractional_cuts=True, **options):
+    # Valider la taille de l'instance
+    if len(instance.patients) > MAX_EXACT_PATIENTS or len(instance.agents) > MAX_EXACT_AGENTS:
+        raise ValueError(f"Instance trop grande: {len(instance.patients)} patients, {len(instance.agents)} agents. Max: 10 patients, 10 agents")
+
+    from .gurobi_env import get_env
+    from .model_builder import build_vrp_model, set_mip_start
+
+    patients, coords, s, skills_req, agents, tw = _build_internal_sets(instance)
+
+    # Les erreurs (licence, construction du modèle) remontent à l'appelant
+    m, x, t, d = build_vrp_model(patients, coords, s, skills_req, agents, d=dist, time_windows=tw,
+                                 formulation=formulation, fractional_cuts=fractional_cuts,
+                                 env=get_env(), threads=_worker_threads)
+    if warm_start:
+        set_mip_start(x, t, *_heuristic_start(instance, dist), types=m._types)
+    return _optimize(m, x, t, instance, dist, agents, lazy=formulation == "lazy",
+                     time_limit=time_limit, mip_gap=mip_gap, control=control)
+
+
+def _solve_heuristic(instance, dist, **options):
+    return solve_heuristic(instance, dist=dist)
+
+
+def _solve_alns(instance, dist, time_limit=None, control=None, **options):
+    if time_limit is None:
+        time_limit = ALNS_TIME_LIMIT
+    return solve_alns(instance, dist=dist, time_limit=time_limit, control=control)
+
+
+_SOLVERS = {
+    "gurobi": _solve_gurobi,
+    "heuristic": _solve_heuristic,
+    "alns": _solve_alns,
+}
+
+
+def _resolve_engine(engine, instance):
+    if engine not in ENGINES:
+        raise ValueError(f"Moteur inconnu: {engine!r}. Choix: {', '.join(ENGINES)}")
+    if engine == "auto":
+        # Gurobi tant que la licence le permet, heuristique au-delà
+        small = len(instance.patients) <= MAX_EXACT_PATIENTS and len(instance.agents) <= MAX_EXACT_AGENTS
+        return "gurobi" if small else "heuristic"
+    return engine
+
+
+def solve_instance(data=None, test_type="Random Small", num_patients=None, num_agents=3, seed=None,
+                   provider=None, engine="auto", time_limit=None, local_search=False,
+                   warm_start=False, formulation="mtz", cache=None, mip_gap=None, control=None,
+                   decompose=False, workers=None, cluster=None, fractional_cuts=True):
     """Solve VRP instance.
 
     Accepts either a VRPInstance object or will generate one based on size parameters.
+    ``provider`` selects the travel-time source (see ``app.utils.travel_time``);
+    planar Euclidean distance is used by default.
+    ``engine`` is one of ``ENGINES``: ``"gurobi"`` (exact, license-limited),
+    ``"heuristic"`` (Clarke-Wright + insertion, no size limit) or ``"auto"``
+    (Gurobi when the instance fits the license, heuristic otherwise) or
+    ``"alns"`` (anytime metaheuristic, best solution within ``time_limit`` seconds).
+    ``warm_start=True`` gives Gurobi a heuristic incumbent as MIP start.
+    ``formulation`` picks how Gurobi eliminates subtours: ``"mtz"`` rows up
+    front, or ``"lazy"`` cuts separated in a callback. With ``"lazy"``,
+    ``fractional_cuts`` also separates subtour cuts on node relaxations
+    (ignored under ``"mtz"``).
+    ``local_search=True`` post-optimizes the routes with 2-opt, Or-opt,
+    relocate, swap and 2-opt* moves (see ``app.core.local_search``).
+    Gurobi returns its best feasible solution when it stops on ``time_limit``,
+    on the relative ``mip_gap`` target or on ``control.cancel()``
+    (``app.core.control.SolveControl``, which also receives each improving
+    incumbent). ALNS also stops on ``control.cancel()`` and returns its best
+    solution, without reporting incumbents; the heuristic engine ignores
+    ``control`` (a single constructive pass).
+    ``decompose=True`` splits the instance into independent skill components
+    (``app.core.decomposition``), solves them separately with ``workers``
+    processes (see ``solve_many``; each part picks its own engine under
+    ``"auto"``) and merges the routes. ``control`` is not used in that mode.
+    ``cluster`` (``"kmeans"`` or ``"sweep"``) solves large territories cluster
+    first, route second (``app.core.clustering``): geographic clusters with
+    their share of the roster are solved in parallel like components, then
+    boundaries between neighbouring clusters are repaired by local search.
+    ``seed`` also seeds the k-means initialisation, so a given seed gives the
+    same clusters (and, with ``data=None``, the same generated instance).
+    ``cache`` (a ``SolutionCache``, or ``True`` for the shared in-process one)
+    serves repeated solves of the same instance and options from memory/disk.
+    Patients no agent can serve (skills, capacity, time windows) are left out
+    of the routes; ``unserved_patients(instance, result)`` lists them.
     Returns a result dict and coords so GUI/tests stay in sync.
     """
     # Valider les limites avant de générer/résoudre
-    if num_patients is not None and num_patients > 10:
-        raise ValueError("Maximum 10 patients allowed due to license limits")
-    if num_agents is not None and num_agents > 10:
-        raise ValueError("Maximum 10 agents allowed due to license limits")
+    if engine == "gurobi":
+        if num_patients is not None and num_patients > MAX_EXACT_PATIENTS:
+            raise ValueError("Maximum 10 patients allowed due to license limits")
+        if num_agents is not None and num_agents > MAX_EXACT_AGENTS:
+            raise ValueError("Maximum 10 agents allowed due to license limits")
 
     # Si data est un dict (rétrocompatibilité), le convertir en VRPInstance
     if isinstance(data, dict):
@@ -96,24 +343,114 @@ def solve_instance(data=None, test_type="Random Small", num_patients=None, num_a
         instance = generate_instance(test_type, num_patients, num_agents, seed)
     else:
         instance = data
-    
-    # Valider la taille de l'instance
-    if len(instance.patients) > 10 or len(instance.agents) > 10:
-        raise ValueError(f"Instance trop grande: {len(instance.patients)} patients, {len(instance.agents)} agents. Max: 10 patients, 10 agents")
 
-    patients, coords, s, skills_req, agents = _build_internal_sets(instance)
+    requested_engine = engine
+    engine = _resolve_engine(engine, instance)
+    coords = instance.get_all_coords()
 
-    try:
-        m, x, t, d = build_vrp_model(patients, coords, s, skills_req, agents)
-        m.optimize()
+    key = None
+    if cache is True:
+        cache = get_default_cache()
+    if cache is not None:
+        key = canonical_key(instance, engine=engine, time_limit=time_limit, local_search=local_search,
+                            warm_start=warm_start, formulation=formulation, mip_gap=mip_gap,
+                            decompose=decompose, cluster=cluster, fractional_cuts=fractional_cuts,
+                            seed=seed if cluster else None,  # graine du k-means
+                            provider=(provider or EuclideanProvider()).fingerprint(
+                                list(coords), list(coords.values())))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, coords
+
+    if cluster:
+        parts = cluster_instance(instance, method=cluster, seed=seed)
+    else:
+        parts = split_instance(instance) if decompose else []
+    if len(parts) > 1:
+        result = _solve_parts(instance, parts, workers, engine=requested_engine, provider=provider,
+                              time_limit=time_limit, local_search=local_search, warm_start=warm_start,
+                              formulation=formulation, mip_gap=mip_gap, fractional_cuts=fractional_cuts)
+        if cluster and result:
+            result = repair_boundaries(instance, result, parts, provider=provider)
+    else:
+        dist = DistanceMatrix(list(coords), coords, provider=provider)
+        result = _SOLVERS[engine](instance, dist, time_limit=time_limit, warm_start=warm_start,
+                                  formulation=formulation, mip_gap=mip_gap, control=control,
+                                  fractional_cuts=fractional_cuts)
+        if local_search and result:
+            result = improve_result(result, instance, dist=dist)
+    # Ni un échec ({}, erreur possiblement transitoire) ni une résolution annulée
+    if cache is not None and result and not (control is not None and control.cancelled):
+        cache.put(key, result)
+    return result, coords
+
+
+def _solve_parts(instance, parts, workers, **options):
+    """Résout les composantes indépendantes (en parallèle) et fusionne leurs routes.
+
+    Retourne {} si une composante échoue, comme une résolution monolithique.
+    """
+    results = [None] * len(parts)
+    for report in solve_many(parts, workers=workers, **options):
+        if report["status"] == "error":
+            raise ValueError(f"Composante {report['index']}: {report['error']}")
+        results[report["index"]] = report["result"]
+    if not all(results):
+        return {}
+    return merge_results(instance, results)
+
+
+def _init_worker(gurobi_threads):
+    # Threads Gurobi du processus, limités pour ne pas sur-souscrire les coeurs
+    # (appliqués à chaque modèle construit par ``_solve_gurobi``)
+    global _worker_threads
+    _worker_threads = gurobi_threads
 
-        if m.status != GRB.OPTIMAL:
-            return {}, coords
 
-        routes = _extract_routes(patients, agents, x, coords)
-        result = _result_with_distance(routes, coords)
-        return result, coords
+def _solve_one(index, data, options):
+    """Résout une instance du lot et retourne un rapport (jamais d'exception)."""
+    try:
+        result, coords = solve_instance(data=data, **options)
     except Exception as e:
-        print(f"Erreur lors de l'optimisation: {e}")
-        return {}, coords
-    return result, coords
+        return {"index": index, "status": "error", "error": str(e), "result": {}, "coords": {}, "unserved": []}
+
+    instance = VRPInstance.from_dict(data) if isinstance(data, dict) else data
+    unserved = unserved_patients(instance, result)
+    # Aucune solution trouvée, ou des patients qu'aucune tournée ne peut servir
+    return {
+        "index": index,
+        "status": "infeasible" if not result or unserved else "ok",
+        "error": None,
+        "result": result,
+        "coords": coords,
+        "unserved": unserved,
+    }
+
+
+def solve_many(instances, workers=None, engine="auto", **options):
+    """Résout un lot d'instances indépendantes en parallèle (processus).
+
+    Génère un rapport par instance dès qu'il est prêt (ordre de fin, pas
+    d'entrée) : ``{"index", "status", "error", "result", "coords", "unserved"}``
+    avec ``status`` parmi ``"ok"`` (tous les patients servis), ``"infeasible"``
+    (pas de solution, ou patients non servis listés dans ``unserved``) et
+    ``"error"`` (exception du solveur, message dans ``error``). Les threads
+    Gurobi de chaque processus sont plafonnés à ``cpu_count // workers``.
+    Les autres options sont transmises à ``solve_instance``.
+    """
+    instances = list(instances)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(instances) or 1))
+    gurobi_threads = max(1, (os.cpu_count() or 1) // workers)
+    options = dict(options, engine=engine)
+
+    if workers == 1:
+        _init_worker(gurobi_threads)
+        for index, data in enumerate(instances):
+            yield _solve_one(index, data, options)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(gurobi_threads,)) as pool:
+        futures = [pool.submit(_solve_one, index, data, options) for index, data in enumerate(instances)]
+        for future in as_completed(futures):
+            yield future.result()
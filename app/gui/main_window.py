@@ -1,17 +1,37 @@
+import logging
 import sys
+import threading
+import time
 from PyQt5.QtWidgets import (
     QMainWindow, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QLabel, 
-    QSpinBox, QDialog, QFormLayout, QLineEdit, QDialogButtonBox, QGroupBox, QScrollArea
+    QSpinBox, QDialog, QFormLayout, QLineEdit, QDialogButtonBox, QGroupBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QPalette, QColor
-from .plot_widget import PlotWidget
-from ..threads.vrp_thread import VRPThread
-from ..gui.data_generator import generate_instance
+from ..models.generator import generate_instance
+from .panels import AgentsModel, CircuitsModel, PatientsModel, table_view
+
+# Démarrage : seul PyQt5 est chargé avant le premier affichage. La carte
+# (matplotlib + backend Qt5Agg) est créée juste après, dans le thread de la
+# GUI ; le solveur (numpy, scipy, gurobipy) est importé en arrière-plan et
+# à défaut au premier usage (l'import attend alors celui déjà en cours).
+WARM_MODULES = ("app.threads.solve_scheduler", "app.core.session")
+PICK_RADIUS = 8  # tolérance de sélection d'un noeud sur la carte (pixels)
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_imports():
+    for name in WARM_MODULES:
+        __import__(name)
+
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, started=None):
         super().__init__()
+        # Temps de démarrage (secondes depuis ``started``, p. ex. le lancement de main.py)
+        self.started = started if started is not None else time.perf_counter()
+        self.startup_times = {}
         self.setWindowTitle("🏥 VRP Santé - Optimisation des Tournées Infirmiers")
         self.setGeometry(100, 100, 1400, 800)
         
@@ -72,8 +92,12 @@ class MainWindow(QMainWindow):
 
         self.patients_info = {}  # stocke info de chaque patient
         self.coords = {}          # coordonnées utilisées pour le graphe
+        self.spatial = None       # index spatial des noeuds (sélection à la souris)
         self.last_routes = {}     # dernières routes calculées pour le rafraîchissement
         self.current_dataset = None  # dataset actuel pour relancer l'optimisation
+        self.session = None          # modèle gardé entre deux éditions (ré-optimisation incrémentale)
+        self._scheduler = None       # créé au premier usage (importe le solveur)
+        self.plot = None             # carte créée après le premier affichage
 
         # Layout principal avec sidebar et graphe
         main_layout = QHBoxLayout()
@@ -114,14 +138,20 @@ class MainWindow(QMainWindow):
         self.btn_run.clicked.connect(self.run_vrp)
         self.btn_run.setMinimumHeight(50)
         sidebar.addWidget(self.btn_run)
+
+        # Bouton d'arrêt : garde la meilleure solution trouvée
+        self.btn_stop = QPushButton("Arrêter")
+        self.btn_stop.clicked.connect(self.stop_vrp)
+        self.btn_stop.setEnabled(False)
+        sidebar.addWidget(self.btn_stop)
         
         # Groupe Infirmiers
         agents_group = QGroupBox("Équipe d'infirmiers")
         agents_layout = QVBoxLayout()
-        self.label_agents = QLabel("En attente...")
-        self.label_agents.setWordWrap(True)
-        self.label_agents.setStyleSheet("padding: 10px; background-color: #ecf0f1; border-radius: 5px;")
-        agents_layout.addWidget(self.label_agents)
+        self.agents_model = AgentsModel(self)
+        self.agents_view = table_view(self.agents_model)
+        self.agents_view.setStyleSheet("background-color: #ecf0f1; border-radius: 5px;")
+        agents_layout.addWidget(self.agents_view)
         agents_group.setLayout(agents_layout)
         sidebar.addWidget(agents_group)
         
@@ -147,15 +177,10 @@ class MainWindow(QMainWindow):
         patients_group.setMaximumHeight(180)
         patients_layout = QVBoxLayout()
         
-        patients_scroll = QScrollArea()
-        patients_scroll.setWidgetResizable(True)
-        patients_scroll.setStyleSheet("border: none;")
-        
-        self.label_patients = QLabel("En attente...")
-        self.label_patients.setWordWrap(True)
-        self.label_patients.setStyleSheet("padding: 10px; background-color: #e8f4f8; border-radius: 5px; font-size: 11px;")
-        patients_scroll.setWidget(self.label_patients)
-        patients_layout.addWidget(patients_scroll)
+        self.patients_model = PatientsModel(self)
+        self.patients_view = table_view(self.patients_model)
+        self.patients_view.setStyleSheet("background-color: #e8f4f8; border-radius: 5px; font-size: 11px;")
+        patients_layout.addWidget(self.patients_view)
         patients_group.setLayout(patients_layout)
         sidebar.addWidget(patients_group)
         
@@ -163,20 +188,14 @@ class MainWindow(QMainWindow):
         circuits_group = QGroupBox("🗺️ Circuits détaillés")
         circuits_layout = QVBoxLayout()
         
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("border: none;")
-        
-        self.label_circuits = QLabel("Aucun circuit calculé")
-        self.label_circuits.setWordWrap(True)
-        self.label_circuits.setStyleSheet("""
-            padding: 10px;
+        self.circuits_model = CircuitsModel(self)
+        self.circuits_view = table_view(self.circuits_model)
+        self.circuits_view.setStyleSheet("""
             background-color: #fef9e7;
             border-radius: 5px;
             font-size: 12px;
         """)
-        scroll.setWidget(self.label_circuits)
-        circuits_layout.addWidget(scroll)
+        circuits_layout.addWidget(self.circuits_view)
         circuits_group.setLayout(circuits_layout)
         sidebar.addWidget(circuits_group)
         
@@ -196,8 +215,10 @@ class MainWindow(QMainWindow):
         graph_label.setMaximumHeight(15)
         graph_layout.addWidget(graph_label)
         
-        self.plot = PlotWidget()
-        graph_layout.addWidget(self.plot)
+        self.plot_placeholder = QLabel("Chargement de la carte...")
+        self.plot_placeholder.setAlignment(Qt.AlignCenter)
+        graph_layout.addWidget(self.plot_placeholder, stretch=1)
+        self.graph_layout = graph_layout
         
         graph_widget = QWidget()
         graph_widget.setLayout(graph_layout)
@@ -210,8 +231,45 @@ class MainWindow(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
-        # connecter le click sur le graphe
-        self.plot.canvas.mpl_connect("button_press_event", self.on_click)
+    # ------------------------------------------------------------- démarrage
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if "first_paint" not in self.startup_times:
+            self._mark("first_paint")
+            threading.Thread(target=self._warm_solver, daemon=True).start()
+            QTimer.singleShot(0, self.ensure_plot)
+
+    def _mark(self, step):
+        self.startup_times[step] = time.perf_counter() - self.started
+        logger.info("Démarrage : %s en %.3f s", step, self.startup_times[step])
+
+    def _warm_solver(self):
+        _warm_imports()
+        self._mark("solver_ready")
+
+    def ensure_plot(self):
+        """Crée la carte au premier besoin (import de matplotlib) et la retourne."""
+        if self.plot is None:
+            from .plot_widget import PlotWidget
+            self.plot = PlotWidget()
+            self.graph_layout.replaceWidget(self.plot_placeholder, self.plot)
+            self.plot_placeholder.deleteLater()
+            # connecter le click sur le graphe
+            self.plot.canvas.mpl_connect("button_press_event", self.on_click)
+            self._mark("plot_ready")
+        return self.plot
+
+    @property
+    def scheduler(self):
+        # Une seule résolution à la fois, sur le dernier état de l'instance
+        if self._scheduler is None:
+            from ..threads.solve_scheduler import SolveScheduler
+            self._scheduler = SolveScheduler(self)
+            self._scheduler.progress.connect(self.show_progress)
+            self._scheduler.result_ready.connect(self.show_result)
+            self._scheduler.failed.connect(self.show_error)
+            self._scheduler.busy_changed.connect(self.set_busy)
+        return self._scheduler
 
     def run_vrp(self):
         num_patients = self.spin_patients.value()
@@ -244,6 +302,8 @@ class MainWindow(QMainWindow):
         
         # Sauvegarder l'instance pour pouvoir la modifier plus tard
         self.current_dataset = instance
+        from ..core.session import SolverSession
+        self.session = SolverSession(instance)
 
         # Stockage info patients à partir des objets
         self.patients_info = {}
@@ -255,50 +315,51 @@ class MainWindow(QMainWindow):
             }
         
         # Coordonnées à partir des objets
+        from ..utils.spatial import SpatialIndex
         self.coords = instance.get_all_coords()
+        self.spatial = SpatialIndex.from_coords(self.coords)
 
-        # Afficher les infirmiers et leurs compétences avec émojis
-        agents_html = ""
-        skill_emojis = {
-            "Nursing": "💉",
-            "WoundCare": "🩹",
-            "Pediatrics": "👶",
-            "Diabetes": "🍬",
-            "Physio": "🏃"
-        }
-        for agent in instance.agents:
-            skills_with_emoji = [f"{skill_emojis.get(s, '✓')} {s}" for s in agent.skills]
-            agents_html += f"<b>{agent.name}</b><br>"
-            agents_html += f"<span style='color: #7f8c8d; font-size: 11px;'>{', '.join(skills_with_emoji)}</span><br><br>"
-        
-        self.label_agents.setText(agents_html)
-        
-        # Afficher les patients et leurs skills requis
-        patients_html = ""
-        for patient in instance.patients:
-            skill_emoji = skill_emojis.get(patient.required_skill, '✓')
-            patients_html += f"<b style='color: #3498db;'>Patient {patient.id}</b>: "
-            patients_html += f"{skill_emoji} <span style='color: #555;'>{patient.required_skill}</span><br>"
-        
-        self.label_patients.setText(patients_html)
+        # Infirmiers et besoins des patients, lus directement dans l'instance
+        self.agents_model.set_instance(instance)
+        self.patients_model.set_instance(instance)
+        self.circuits_model.set_result({})
+
+        # Lancer la résolution de la nouvelle instance (remplace toute résolution en cours)
+        self.scheduler.start(instance, self.session)
 
+    def set_busy(self, busy):
         # Désactiver le bouton pendant l'optimisation
-        self.btn_run.setEnabled(False)
-        
-        # Lancer thread VRP avec instance fixe
-        self.thread = VRPThread(
-            test_type="Random Small",
-            num_patients=num_patients,
-            num_agents=num_agents,
-            seed=42,
-            data=instance,
-        )
-        self.thread.result_signal.connect(lambda total, routes, coords, ds: self.show_result(total, routes, coords))
-        self.thread.finished.connect(lambda: self.btn_run.setEnabled(True))
-        self.thread.start()
+        self.btn_run.setEnabled(not busy)
+        self.btn_stop.setEnabled(busy)
+
+    def stop_vrp(self):
+        self.scheduler.cancel()
+        self.btn_stop.setEnabled(False)
+
+    def show_progress(self, distance, routes, gap):
+        gap_text = f" (écart {gap:.1%})" if gap != float("inf") else ""
+        self.label_result.setText(f"⏳ Meilleure solution : {distance:.2f} km{gap_text}")
+        formatted_routes = {k: v.get("route", []) for k, v in routes.items()}
+        self.ensure_plot().update_plot(formatted_routes, self.coords, self.patients_info)
+
+    def show_error(self, message):
+        self.label_result.setText(f"Échec de l'optimisation : {message}")
+        self.label_result.setStyleSheet("""
+            padding: 15px;
+            background-color: #fadbd8;
+            border-radius: 5px;
+            font-size: 14px;
+            font-weight: bold;
+            color: #c0392b;
+        """)
 
     def show_result(self, distance, routes, coords):
-        self.label_result.setText(f"Distance totale : {distance:.2f} km")
+        served = {pid for r in routes.values() for pid in r.get("visited_patients", [])}
+        unserved = [pid for pid in self.patients_info if pid not in served]
+        text = f"Distance totale : {distance:.2f} km"
+        if unserved:
+            text += "\nNon servis : " + ", ".join(f"P{pid}" for pid in unserved)
+        self.label_result.setText(text)
         self.label_result.setStyleSheet("""
             padding: 15px;
             background-color: #d5f4e6;
@@ -308,44 +369,38 @@ class MainWindow(QMainWindow):
             color: #27ae60;
         """)
         
+        self._sync_spatial(coords)
         self.coords = coords
         # Sauvegarder les routes pour pouvoir rafraîchir après modification
         self.last_routes = routes
         
-        # Afficher les circuits détaillés
-        circuits_html = ""
-        colors = ["#3498db", "#e74c3c", "#2ecc71", "#f39c12", "#9b59b6", "#1abc9c", "#e67e22", "#34495e", "#16a085", "#d35400"]
-        
-        for idx, (agent_id, route_info) in enumerate(routes.items()):
-            route = route_info.get("route", [])
-            total_dist = route_info.get("total_distance", 0)
-            color = colors[idx % len(colors)]
-            
-            if len(route) > 2:  # A une vraie route (plus que dépôt→dépôt)
-                route_str = " → ".join([f"<b>Dépôt</b>" if node == 0 else f"P{node}" for node in route])
-                circuits_html += f"<div style='margin-bottom: 15px; padding: 10px; background-color: {color}22; border-left: 4px solid {color}; border-radius: 5px;'>"
-                circuits_html += f"<b style='color: {color}; font-size: 14px;'>Infirmier {agent_id}</b><br>"
-                circuits_html += f"<span style='color: #2c3e50; font-size: 12px;'>{route_str}</span><br>"
-                circuits_html += f"<span style='color: #7f8c8d; font-size: 11px;'>📏 Distance: {total_dist:.2f} km</span>"
-                circuits_html += "</div>"
-            else:
-                circuits_html += f"<div style='margin-bottom: 10px; padding: 8px; background-color: #ecf0f1; border-radius: 5px;'>"
-                circuits_html += f"<span style='color: #95a5a6; font-size: 12px;'>Infirmier {agent_id} : Pas de tournée assignée</span>"
-                circuits_html += "</div>"
-        
-        self.label_circuits.setText(circuits_html if circuits_html else "Aucun circuit calculé")
-        
+        # Circuits détaillés : seules les lignes modifiées sont repeintes
+        self.circuits_model.set_result(routes)
+
         # routes arrive now as dict agent -> {route: [...], visited_patients: [...]}
         formatted_routes = {k: v.get("route", []) for k, v in routes.items()}
-        self.plot.update_plot(formatted_routes, coords, self.patients_info)
+        self.ensure_plot().update_plot(formatted_routes, coords, self.patients_info)
+
+    def _sync_spatial(self, coords):
+        """Reporte dans l'index les noeuds déplacés ou ajoutés depuis le dernier affichage."""
+        if self.spatial is None:
+            return
+        for nid, xy in coords.items():
+            if nid not in self.spatial:
+                self.spatial.add(nid, xy)
+            elif self.coords.get(nid) != xy:
+                self.spatial.move(nid, xy)
 
     def on_click(self, event):
-        if event.xdata is None or event.ydata is None:
+        if event.inaxes is None or event.xdata is None or self.spatial is None:
             return
-        for pid, (x, y) in self.coords.items():
-            if abs(event.xdata - x) < 0.5 and abs(event.ydata - y) < 0.5:
-                self.open_info_dialog(pid)
-                break
+        # Tolérance de PICK_RADIUS pixels convertie en unités de données sur chaque axe
+        inverse = event.inaxes.transData.inverted()
+        (x0, y0), (x1, y1) = inverse.transform([(event.x - PICK_RADIUS, event.y - PICK_RADIUS),
+                                                (event.x + PICK_RADIUS, event.y + PICK_RADIUS)])
+        pid = self.spatial.pick(event.xdata, event.ydata, abs(x1 - x0) / 2, abs(y1 - y0) / 2)
+        if pid in self.patients_info:  # le dépôt n'est pas éditable
+            self.open_info_dialog(pid)
 
     def open_info_dialog(self, pid):
         info = self.patients_info[pid]
@@ -410,20 +465,21 @@ class MainWindow(QMainWindow):
             # Mettre à jour les structures locales
             self.patients_info[pid]["coords"] = (new_x, new_y)
             self.coords[pid] = (new_x, new_y)
+            self.spatial.move(pid, (new_x, new_y))
             self.patients_info[pid]["service"] = new_service
             self.patients_info[pid]["skill"] = new_skill
             
-            # Mettre à jour l'instance VRP avec les objets POO
+            # L'instance de la GUI est modifiée ici, dans le thread de la GUI ; la
+            # session applique la même édition à sa propre copie, dans le thread de
+            # résolution, et ne met à jour que les éléments du modèle touchant ce patient
             if self.current_dataset is not None:
-                # Récupérer le patient et le modifier
+                edit = (pid, {"coords": (new_x, new_y), "duration": int(new_service), "skill": new_skill})
                 patient = self.current_dataset.get_patient_by_id(pid)
-                if patient:
-                    patient.set_coords(new_x, new_y)
-                    patient.set_duration(int(new_service))
-                    patient.set_skill(new_skill)
-                
-                # Relancer l'optimisation avec le dataset modifié
-                
+                patient.set_coords(new_x, new_y)
+                patient.set_duration(int(new_service))
+                patient.set_skill(new_skill)
+                self.patients_model.refresh()
+
                 # Relancer l'optimisation avec l'instance modifiée
                 self.label_result.setText("⏳ Ré-optimisation en cours...")
                 self.label_result.setStyleSheet("""
@@ -434,18 +490,8 @@ class MainWindow(QMainWindow):
                     font-weight: bold;
                     color: #856404;
                 """)
-                self.btn_run.setEnabled(False)
-                
-                self.thread = VRPThread(
-                    test_type="Random Small",
-                    num_patients=len(self.current_dataset.patients),
-                    num_agents=len(self.current_dataset.agents),
-                    seed=42,
-                    data=self.current_dataset,
-                )
-                self.thread.result_signal.connect(lambda total, routes, coords, ds: self.show_result(total, routes, coords))
-                self.thread.finished.connect(lambda: self.btn_run.setEnabled(True))
-                self.thread.start()
+                # Les éditions rapprochées sont regroupées en une seule résolution
+                self.scheduler.edit(*edit)
             
             dialog.accept()
 
@@ -0,0 +1,150 @@
+"""Panneaux infirmiers / patients / circuits en modèle-vue Qt.
+
+Chaque panneau est un ``QAbstractTableModel`` affiché dans un ``QTreeView`` à
+lignes de hauteur uniforme : la vue ne peint que les lignes visibles, au
+lieu d'un document HTML entier remis en page à chaque mise à jour. Les
+modèles gardent le texte de chaque ligne ; une mise à jour ne signale
+(``dataChanged``) que les lignes dont le texte a changé, et ne remet le
+modèle à zéro que si l'ensemble des lignes (infirmiers, patients) change.
+"""
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QAbstractItemView, QTreeView
+
+SKILL_EMOJIS = {
+    "Nursing": "💉",
+    "WoundCare": "🩹",
+    "Pediatrics": "👶",
+    "Diabetes": "🍬",
+    "Physio": "🏃"
+}
+ROUTE_COLORS = ["#3498db", "#e74c3c", "#2ecc71", "#f39c12", "#9b59b6", "#1abc9c", "#e67e22", "#34495e", "#16a085", "#d35400"]
+IDLE_COLOR = "#95a5a6"
+
+
+def _skill(skill):
+    return f"{SKILL_EMOJIS.get(skill, '✓')} {skill}"
+
+
+class RowsModel(QAbstractTableModel):
+    """Table en lecture seule de lignes de texte, identifiées par une clé."""
+
+    HEADERS = ()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._keys = []
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self._rows[index.row()][index.column()]
+        return None
+
+    def key(self, row):
+        return self._keys[row]
+
+    def set_rows(self, keys, rows):
+        """Remplace les lignes ; seules celles qui ont changé sont signalées à la vue."""
+        keys, rows = list(keys), [tuple(r) for r in rows]
+        if keys != self._keys:
+            self.beginResetModel()
+            self._keys, self._rows = keys, rows
+            self.endResetModel()
+            return
+        changed = [i for i, (old, new) in enumerate(zip(self._rows, rows)) if old != new]
+        self._rows = rows
+        last = len(self.HEADERS) - 1
+        # Un signal par plage contiguë de lignes modifiées
+        start = None
+        for pos, i in enumerate(changed):
+            if start is None:
+                start = i
+            if pos + 1 == len(changed) or changed[pos + 1] != i + 1:
+                self.dataChanged.emit(self.index(start, 0), self.index(i, last))
+                start = None
+
+
+class AgentsModel(RowsModel):
+    """Infirmiers de l'instance et leurs compétences."""
+
+    HEADERS = ("Infirmier", "Compétences")
+
+    def set_instance(self, instance):
+        self.set_rows((a.id for a in instance.agents),
+                      ((a.name, ", ".join(_skill(s) for s in a.skills)) for a in instance.agents))
+
+
+class PatientsModel(RowsModel):
+    """Patients de l'instance et leur compétence requise ; ``refresh`` relit l'instance.
+
+    L'instance n'est lue et modifiée que dans le thread de la GUI.
+    """
+
+    HEADERS = ("Patient", "Compétence requise")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.instance = None
+
+    def set_instance(self, instance):
+        self.instance = instance
+        self.refresh()
+
+    def refresh(self):
+        patients = self.instance.patients if self.instance is not None else []
+        self.set_rows((p.id for p in patients),
+                      ((f"Patient {p.id}", _skill(p.required_skill)) for p in patients))
+
+
+class CircuitsModel(RowsModel):
+    """Tournée de chaque infirmier d'un résultat ``{agent: {route, total_distance, ...}}``."""
+
+    HEADERS = ("Infirmier", "Distance", "Circuit")
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.ForegroundRole:
+            row = index.row()
+            if not self._rows[row][1]:
+                return QColor(IDLE_COLOR)
+            if index.column() == 0:
+                return QColor(ROUTE_COLORS[row % len(ROUTE_COLORS)])
+        return super().data(index, role)
+
+    def set_result(self, routes):
+        rows = []
+        for agent_id, info in routes.items():
+            route = info.get("route", [])
+            if len(route) > 2:  # une vraie tournée (plus que dépôt -> dépôt)
+                stops = " → ".join("Dépôt" if node == 0 else f"P{node}" for node in route)
+                rows.append((f"Infirmier {agent_id}", f"{info.get('total_distance', 0):.2f} km", stops))
+            else:
+                rows.append((f"Infirmier {agent_id}", "", "Pas de tournée assignée"))
+        self.set_rows(routes, rows)
+
+
+def table_view(model):
+    """Vue à lignes uniformes (rendu limité aux lignes visibles), sans édition."""
+    view = QTreeView()
+    view.setModel(model)
+    view.setRootIsDecorated(False)
+    view.setUniformRowHeights(True)
+    view.setAlternatingRowColors(True)
+    view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    view.setSelectionMode(QAbstractItemView.NoSelection)
+    view.header().setStretchLastSection(True)
+    return view
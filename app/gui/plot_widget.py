@@ -1,7 +1,41 @@
-import matplotlib.pyplot as plt
+"""Carte des tournées, redessinée par blitting.
+
+Les artistes sont créés une fois : une ``PathCollection`` pour tous les
+patients (taille et couleur uniques : Agg les dessine par ``draw_markers``,
+bien plus vite qu'avec des tailles par point), une pour le dépôt, une
+``LineCollection`` pour toutes les routes et des ``Text`` par noeud. Tous
+sont « animés » : un dessin complet du canvas ne contient que le fond (axes,
+grille, graduations), dont on garde une copie. Les étiquettes, lentes à
+rendre (~1 ms chacune), sont dessinées une fois sur ce fond et la couche
+obtenue est elle aussi gardée ; elle n'est refaite que si une étiquette
+change (noeud déplacé, compétence modifiée).
+
+Une mise à jour change seulement les données des artistes, restaure la couche
+des étiquettes, y dessine routes et noeuds et blitte le résultat. Le dessin
+complet n'a lieu que pour une nouvelle instance, si un noeud sort de la vue
+ou au redimensionnement.
+"""
+
+import numpy as np
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
 
+# Emojis pour les skills
+SKILL_EMOJIS = {
+    "Nursing": "💉",
+    "WoundCare": "🩹",
+    "Pediatrics": "👶",
+    "Diabetes": "🍬",
+    "Physio": "🏃"
+}
+ROUTE_COLORS = ["red", "blue", "orange", "purple"]
+LABEL_LIMIT = 100  # au-delà, les étiquettes sont masquées (illisibles et lentes à rendre)
+MARGIN = 0.05      # marge de la vue autour des noeuds (fraction de la plus grande étendue)
+NAME_OFFSET = (4, 4)   # décalage des étiquettes (points), indépendant de l'échelle des données
+SKILL_OFFSET = (0, -6)
+
 
 class PlotWidget(QWidget):
     def __init__(self):
@@ -9,49 +43,127 @@ class PlotWidget(QWidget):
         layout = QVBoxLayout()
         layout.setContentsMargins(5, 5, 5, 5)  # Reduce margins
 
-        self.figure = plt.figure(figsize=(4, 3))  # Reduced from (5, 4)
+        # Figure autonome (sans pyplot : pas de registre global ni d'import de pyplot)
+        self.figure = Figure(figsize=(4, 3))  # Reduced from (5, 4)
         self.canvas = FigureCanvasQTAgg(self.figure)
         layout.addWidget(self.canvas)
 
         self.setLayout(layout)
 
+        self.ax = self.figure.add_subplot(111)
+        self.ax.grid(True, alpha=0.3)
+        self.ax.tick_params(labelsize=8)
+        self.routes = LineCollection([], linewidths=1.5, animated=True)
+        self.ax.add_collection(self.routes)
+        self.nodes = self.ax.scatter(np.zeros(0), np.zeros(0), c="black", s=60, animated=True, zorder=3)
+        self.depot = self.ax.scatter(np.zeros(0), np.zeros(0), c="green", s=150, animated=True, zorder=3)
+        self.labels = {}          # noeud -> (Text numéro, Text compétence)
+        self._label_state = {}    # noeud -> (x, y, emoji) affiché
+        self._ids = None
+        self._background = None   # fond seul (dernier dessin complet)
+        self._label_layer = None  # fond + étiquettes, None si à refaire
+        self.figure.set_layout_engine("tight")  # appliqué aux seuls dessins complets
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    # ---------------------------------------------------------------- dessin
+    def _on_draw(self, event):
+        # Dessin complet (fond seul : les artistes sont animés) -> nouvelles couches
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._label_layer = None
+        self._compose()
+
+    def _compose(self):
+        """Couche des étiquettes (refaite si invalidée), puis routes et noeuds par-dessus."""
+        if self._label_layer is None:
+            self.canvas.restore_region(self._background)
+            for name, skill in self.labels.values():
+                self.ax.draw_artist(name)
+                if skill.get_text():
+                    self.ax.draw_artist(skill)
+            self._label_layer = self.canvas.copy_from_bbox(self.figure.bbox)
+        else:
+            self.canvas.restore_region(self._label_layer)
+        self.ax.draw_artist(self.routes)
+        self.ax.draw_artist(self.nodes)
+        self.ax.draw_artist(self.depot)
+
+    def _blit(self):
+        if self._background is None:
+            self.canvas.draw()  # premier dessin : _on_draw prépare les couches
+            return
+        self._compose()
+        self.canvas.blit(self.figure.bbox)
+
+    # ----------------------------------------------------------- mise à jour
     def update_plot(self, routes, coords, patients_info=None):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
-        # Emojis pour les skills
-        skill_emojis = {
-            "Nursing": "💉",
-            "WoundCare": "🩹",
-            "Pediatrics": "👶",
-            "Diabetes": "🍬",
-            "Physio": "🏃"
-        }
-
-        for i, (x, y) in coords.items():
-            if i == 0:
-                ax.scatter(x, y, c="green", s=150)
-                ax.text(x + 0.1, y + 0.1, "Dépôt", fontsize=8, fontweight='bold')
-            else:
-                ax.scatter(x, y, c="black", s=60)
-                # Afficher le numéro du patient
-                ax.text(x + 0.1, y + 0.1, f"P{i}", fontsize=8)
-                
-                # Afficher le skill requis sous le patient
-                if patients_info and i in patients_info:
-                    skill = patients_info[i].get("skill", "")
-                    emoji = skill_emojis.get(skill, "")
-                    if emoji:
-                        ax.text(x, y - 0.3, emoji, fontsize=10, ha='center')
-
-        colors = ["red", "blue", "orange", "purple"]
-
-        for idx, (agent, route) in enumerate(routes.items()):
-            r_x = [coords[i][0] for i in route]
-            r_y = [coords[i][1] for i in route]
-            ax.plot(r_x, r_y, color=colors[idx % len(colors)], marker="o", markersize=4, linewidth=1.5)
-
-        ax.grid(True, alpha=0.3)
-        ax.tick_params(labelsize=8)
-        self.figure.tight_layout()
-        self.canvas.draw()
+        """Met à jour noeuds, routes et étiquettes ; blit sauf si la vue doit changer.
+
+        ``routes`` : {agent: [noeuds]} ; ``coords`` : {noeud: (x, y)}, dépôt = 0.
+        """
+        ids = list(coords)
+        xy = np.array([coords[i] for i in ids], dtype=float).reshape(-1, 2)
+        depot = np.array([i == 0 for i in ids], dtype=bool)
+        self.nodes.set_offsets(xy[~depot])
+        self.depot.set_offsets(xy[depot])
+
+        segments, colors = [], []
+        for idx, route in enumerate(routes.values()):
+            if len(route) > 1:
+                segments.append([coords[i] for i in route])
+                colors.append(ROUTE_COLORS[idx % len(ROUTE_COLORS)])
+        self.routes.set_segments(segments)
+        self.routes.set_color(colors)
+
+        self._update_labels(ids, coords, patients_info)
+
+        new_instance = ids != self._ids
+        self._ids = ids
+        if self._fit_view(xy, new_instance):
+            self.canvas.draw()  # graduations modifiées : dessin complet
+        else:
+            self._blit()
+
+    def _update_labels(self, ids, coords, patients_info):
+        """Synchronise les ``Text`` en cache ; invalide la couche si l'une a changé."""
+        state = {}
+        for i in ids if len(ids) <= LABEL_LIMIT else []:
+            emoji = ""
+            if i != 0 and patients_info and i in patients_info:
+                emoji = SKILL_EMOJIS.get(patients_info[i].get("skill", ""), "")
+            state[i] = (*coords[i], emoji)
+        if state == self._label_state:
+            return
+        for i in list(self.labels):
+            if i not in state:
+                for text in self.labels.pop(i):
+                    text.remove()
+        for i, (x, y, emoji) in state.items():
+            if self._label_state.get(i) == (x, y, emoji):
+                continue
+            if i not in self.labels:
+                self.labels[i] = (
+                    self.ax.annotate("Dépôt" if i == 0 else f"P{i}", (0, 0), xytext=NAME_OFFSET,
+                                     textcoords="offset points", fontsize=8,
+                                     fontweight="bold" if i == 0 else "normal", animated=True, clip_on=True),
+                    self.ax.annotate("", (0, 0), xytext=SKILL_OFFSET, textcoords="offset points",
+                                     fontsize=10, ha="center", va="top", animated=True, clip_on=True),
+                )
+            name, skill = self.labels[i]
+            name.xy = skill.xy = (x, y)
+            skill.set_text(emoji)
+        self._label_state = state
+        self._label_layer = None
+
+    def _fit_view(self, xy, reset):
+        """Ajuste la vue si ``reset`` ou si un noeud en sort ; True si elle a changé."""
+        if not len(xy):
+            return False
+        low, high = xy.min(axis=0), xy.max(axis=0)
+        (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        if not reset and x0 <= low[0] and high[0] <= x1 and y0 <= low[1] and high[1] <= y1:
+            return False
+        # Marge relative (coordonnées lat/lon comme planes) ; 0.5 pour un seul point
+        pad = MARGIN * float((high - low).max()) or 0.5
+        self.ax.set_xlim(low[0] - pad, high[0] + pad)
+        self.ax.set_ylim(low[1] - pad, high[1] + pad)
+        return True
@@ -1,4 +1,5 @@
 """Models package for VRP domain objects."""
 from .domain import Patient, Agent, Depot, VRPInstance
+from .generator import generate_instance
 
-__all__ = ["Patient", "Agent", "Depot", "VRPInstance"]
+__all__ = ["Patient", "Agent", "Depot", "VRPInstance", "generate_instance"]
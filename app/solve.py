@@ -0,0 +1,115 @@
+"""Résolution en ligne de commande, sans GUI : ``python -m app.solve``.
+
+Lit une ou plusieurs instances JSON (format ``VRPInstance.from_dict``) depuis
+des fichiers ou l'entrée standard, les résout et écrit un rapport JSON par
+instance (``status``, ``error``, ``total_distance``, ``unserved``, ``result``).
+Un fichier (ou l'entrée standard) peut contenir une instance ou une liste
+d'instances ; avec plusieurs instances la sortie est une liste.
+
+    python -m app.solve instance.json --engine alns --time-limit 5 -o result.json
+    cat instance.json | python -m app.solve --engine heuristic
+
+Le solveur (numpy) n'est importé qu'après l'analyse des arguments, et
+gurobipy/scipy seulement si une instance est résolue par Gurobi : ``--help``
+et les moteurs heuristiques démarrent vite (cron, files de tâches). Code de
+sortie : 0 si toutes les instances sont ``ok`` (tous patients servis), 1
+sinon, 2 si l'entrée est invalide (JSON illisible ou instance non conforme
+au format ``VRPInstance.from_dict``).
+"""
+
+import argparse
+import json
+import sys
+
+from .models.domain import VRPInstance  # sans numpy
+
+ENGINES = ("auto", "gurobi", "heuristic", "alns")  # cf. app.core.solver.ENGINES
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog="python -m app.solve", description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="*", metavar="FICHIER",
+                        help="instances JSON ('-' ou rien : entrée standard)")
+    parser.add_argument("-o", "--output", help="fichier de sortie (défaut : sortie standard)")
+    parser.add_argument("--engine", choices=ENGINES, default="auto")
+    parser.add_argument("--time-limit", type=float, help="limite de temps par instance (secondes)")
+    parser.add_argument("--mip-gap", type=float, help="écart relatif visé par Gurobi")
+    parser.add_argument("--formulation", choices=("mtz", "lazy"), default="mtz")
+    parser.add_argument("--warm-start", action="store_true", help="MIP start heuristique pour Gurobi")
+    parser.add_argument("--local-search", action="store_true", help="post-optimisation des routes")
+    parser.add_argument("--decompose", action="store_true", help="composantes de compétences indépendantes")
+    parser.add_argument("--cluster", choices=("kmeans", "sweep"), help="cluster first, route second")
+    parser.add_argument("--workers", type=int, default=1, help="processus de résolution (défaut : 1)")
+    parser.add_argument("--indent", type=int, default=None, help="indentation du JSON produit")
+    return parser
+
+
+def _read_instances(inputs, stdin):
+    """Liste ``[(source, VRPInstance)]`` ; lève ValueError sur un JSON ou une instance invalide."""
+    instances = []
+    for path in inputs or ["-"]:
+        source = "<stdin>" if path == "-" else path
+        try:
+            if path == "-":
+                data = json.load(stdin)
+            else:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"{source}: {e}") from e
+        for item in data if isinstance(data, list) else [data]:
+            if not isinstance(item, dict):
+                raise ValueError(f"{source}: une instance doit être un objet JSON")
+            try:
+                instances.append((source, VRPInstance.from_dict(item)))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"{source}: instance invalide ({type(e).__name__}: {e})") from e
+    return instances
+
+
+def _report(source, report):
+    result = report["result"]
+    return {
+        "source": source,
+        "status": report["status"],
+        "error": report["error"],
+        "total_distance": sum(r["total_distance"] for r in result.values()),
+        "unserved": report["unserved"],
+        "result": result,
+    }
+
+
+def main(argv=None, stdin=None, stdout=None):
+    args = _parser().parse_args(argv)
+    stdin = stdin if stdin is not None else sys.stdin
+    stdout = stdout if stdout is not None else sys.stdout
+    try:
+        instances = _read_instances(args.inputs, stdin)
+    except ValueError as e:
+        print(f"app.solve: {e}", file=sys.stderr)
+        return 2
+
+    from .core.solver import solve_many  # numpy ; gurobipy à la demande
+
+    options = dict(time_limit=args.time_limit, mip_gap=args.mip_gap, formulation=args.formulation,
+                   warm_start=args.warm_start, local_search=args.local_search,
+                   decompose=args.decompose, cluster=args.cluster)
+    reports = [None] * len(instances)
+    for report in solve_many([instance for _, instance in instances], workers=args.workers, engine=args.engine,
+                             **options):
+        index = report["index"]
+        reports[index] = _report(instances[index][0], report)
+
+    output = reports[0] if len(reports) == 1 else reports
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=args.indent)
+            f.write("\n")
+    else:
+        json.dump(output, stdout, indent=args.indent)
+        stdout.write("\n")
+    return 0 if all(r["status"] == "ok" for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
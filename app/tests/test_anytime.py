@@ -0,0 +1,42 @@
+from gurobipy import GRB
+
+from app.core.control import SolveControl
+from app.core.solver import solve_instance
+from app.gui.data_generator import generate_instance
+
+
+def test_improving_incumbents_are_streamed():
+    instance = generate_instance(num_patients=10, num_agents=3, seed=1)
+    incumbents = []
+    control = SolveControl(on_incumbent=lambda result, objective, gap: incumbents.append(objective))
+
+    result, _ = solve_instance(data=instance, engine="gurobi", control=control)
+
+    assert incumbents and incumbents == sorted(incumbents, reverse=True)
+    assert abs(incumbents[-1] - control.best_objective) < 1e-6
+    assert set(result) == {a.id for a in instance.agents}
+
+
+def test_cancel_returns_best_solution_so_far():
+    instance = generate_instance(num_patients=10, num_agents=3, seed=2)
+
+    def stop_on_first_routes(result, objective, gap):
+        if any(r["visited_patients"] for r in result.values()):
+            control.cancel()
+
+    control = SolveControl(on_incumbent=stop_on_first_routes)
+    result, _ = solve_instance(data=instance, engine="gurobi", formulation="lazy", control=control)
+
+    assert control.cancelled
+    assert control.status in (GRB.INTERRUPTED, GRB.OPTIMAL)
+    assert any(r["visited_patients"] for r in result.values())
+
+
+def test_gap_target_stops_early_with_feasible_solution():
+    instance = generate_instance(num_patients=10, num_agents=3, seed=3)
+    control = SolveControl()
+
+    result, _ = solve_instance(data=instance, engine="gurobi", mip_gap=0.5, control=control)
+
+    assert result
+    assert control.gap <= 0.5
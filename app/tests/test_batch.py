@@ -0,0 +1,38 @@
+from app.core.solver import solve_many
+from app.gui.data_generator import generate_instance
+
+
+def test_solve_many_reports_each_instance():
+    instances = [generate_instance(num_patients=6, num_agents=2, seed=seed) for seed in (0, 1, 3)]  # tous servis
+    bad = {"depot": {"id": 0, "lat": 0, "lon": 0}, "agents": [], "patients": [{"id": 1}]}
+
+    reports = list(solve_many(instances + [bad], workers=2, engine="heuristic"))
+
+    assert sorted(r["index"] for r in reports) == [0, 1, 2, 3]
+    by_index = {r["index"]: r for r in reports}
+    for i in range(3):
+        assert by_index[i]["status"] == "ok"
+        assert set(by_index[i]["result"]) == {a.id for a in instances[i].agents}
+    assert by_index[3]["status"] == "error"
+    assert by_index[3]["error"]
+
+
+def test_solve_many_inline_with_gurobi():
+    instances = [generate_instance(num_patients=5, num_agents=2, seed=seed) for seed in (1, 2)]
+
+    reports = list(solve_many(instances, workers=1, engine="gurobi"))
+
+    assert [r["index"] for r in reports] == [0, 1]
+    assert all(r["status"] == "ok" for r in reports)
+
+
+def test_solve_many_reports_solver_errors_and_unserved_patients():
+    too_big = generate_instance(num_patients=11, num_agents=2, seed=1)
+    unservable = generate_instance(num_patients=4, num_agents=2, seed=1)
+    unservable.patients[0].set_skill("Inconnue")
+
+    reports = {r["index"]: r for r in solve_many([too_big, unservable], workers=1, engine="gurobi")}
+
+    assert reports[0]["status"] == "error" and "trop grande" in reports[0]["error"]
+    assert reports[1]["status"] == "infeasible" and reports[1]["error"] is None
+    assert reports[1]["unserved"] == [unservable.patients[0].id]
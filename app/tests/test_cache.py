@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+
+from app.core.cache import SolutionCache, canonical_key
+from app.core.solver import solve_instance
+from app.gui.data_generator import generate_instance
+from app.models.domain import VRPInstance
+from app.utils.travel_time import HaversineProvider, RoadMatrixProvider
+
+
+def test_key_ignores_ordering_but_not_content():
+    instance = generate_instance(num_patients=6, num_agents=2, seed=3)
+    data = instance.to_dict()
+    shuffled = dict(data, patients=data["patients"][::-1], agents=data["agents"][::-1])
+
+    assert canonical_key(instance, engine="heuristic") == \
+        canonical_key(VRPInstance.from_dict(shuffled), engine="heuristic")
+    assert canonical_key(instance, engine="heuristic") != canonical_key(instance, engine="alns")
+
+    instance.patients[0].set_duration(instance.patients[0].duration + 1)
+    assert canonical_key(instance, engine="heuristic") != \
+        canonical_key(VRPInstance.from_dict(shuffled), engine="heuristic")
+
+
+def test_solve_instance_serves_repeated_runs_from_cache():
+    instance = generate_instance(num_patients=40, num_agents=4, seed=1)
+    cache = SolutionCache()
+
+    first, _ = solve_instance(data=instance, engine="heuristic", cache=cache)
+    start = time.perf_counter()
+    second, _ = solve_instance(data=instance, engine="heuristic", cache=cache)
+    elapsed = time.perf_counter() - start
+
+    assert second == first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert elapsed < 0.05
+
+
+def test_cache_key_covers_cluster_seed_and_provider_configuration(tmp_path):
+    instance = generate_instance(num_patients=40, num_agents=6, seed=4)
+    cache = SolutionCache()
+    solve_instance(data=instance, engine="heuristic", cluster="kmeans", seed=1, cache=cache)
+    solve_instance(data=instance, engine="heuristic", cluster="kmeans", seed=2, cache=cache)
+    assert cache.stats()["misses"] == 2 and cache.stats()["hits"] == 0
+
+    coords = instance.get_all_coords()
+    ids, points = list(coords), list(coords.values())
+    slow, fast = HaversineProvider(speed_kmh=20), HaversineProvider(speed_kmh=40)
+    assert slow.fingerprint() != fast.fingerprint()
+    first = RoadMatrixProvider(str(tmp_path / "a"))
+    second = RoadMatrixProvider(str(tmp_path / "b"))
+    assert first.name == second.name and first.fingerprint(ids, points) != second.fingerprint(ids, points)
+
+    # Une matrice importée pour ces noeuds change l'empreinte (et donc la clé)
+    before = first.fingerprint(ids, points)
+    points_array = np.asarray(points)
+    first.import_matrix(ids, points, first.pairwise(points_array, points_array))
+    assert first.fingerprint(ids, points) != before
+
+
+def test_disk_tier_survives_memory_eviction_and_is_bounded(tmp_path):
+    cache = SolutionCache(max_entries=1, directory=str(tmp_path), max_bytes=10_000)
+    cache.put("a", {"route": list(range(100))})
+    cache.put("b", {"route": []})
+
+    assert cache.get("a") == {"route": list(range(100))}
+    assert cache.stats()["disk_hits"] == 1
+
+    for i in range(200):
+        cache.put(f"k{i}", {"route": list(range(50))})
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.pkl")) <= 10_000
+    assert cache.get("missing") is None
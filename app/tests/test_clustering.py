@@ -0,0 +1,52 @@
+import random
+
+from app.core.clustering import cluster_instance
+from app.core.solver import solve_instance
+from app.models.domain import Agent, Depot, Patient, VRPInstance
+
+
+def _territory(n_patients=300, n_agents=30, seed=0):
+    rand = random.Random(seed)
+    skills = ["Nursing", "Physio", "Pediatrics"]
+    agents = [Agent(a, f"Infirmier {a}", [skills[a % 3]] + (["Nursing"] if a % 2 else []), max_patients=12)
+              for a in range(1, n_agents + 1)]
+    patients = [Patient(p, rand.choice(skills), rand.uniform(-40, 40), rand.uniform(-40, 40),
+                        rand.randint(5, 15), [0, 300])
+                for p in range(1, n_patients + 1)]
+    return VRPInstance(Depot(0, 0.0, 0.0), agents, patients)
+
+
+def test_clusters_respect_skills_and_capacity():
+    instance = _territory()
+    for method in ("kmeans", "sweep"):
+        parts = cluster_instance(instance, method=method, cluster_size=60, seed=1)
+
+        assert len(parts) == 5
+        assert sorted(a.id for part in parts for a in part.agents) == [a.id for a in instance.agents]
+        assert sorted(p.id for part in parts for p in part.patients) == [p.id for p in instance.patients]
+        for part in parts:
+            covered = {s for a in part.agents for s in a.skills}
+            assert all(p.required_skill in covered for p in part.patients)
+            assert len(part.patients) <= sum(a.max_patients for a in part.agents)
+
+
+def test_cluster_mode_serves_territory_and_repairs_boundaries():
+    instance = _territory(n_patients=400, n_agents=40, seed=2)
+    result, _ = solve_instance(data=instance, engine="heuristic", cluster="kmeans", seed=3, workers=2)
+
+    assert set(result) == {a.id for a in instance.agents}
+    visited = [pid for r in result.values() for pid in r["visited_patients"]]
+    assert len(visited) == len(set(visited))
+    assert len(visited) >= 0.98 * len(instance.patients)
+
+
+def test_full_clusters_are_not_overfilled():
+    agents = [Agent(1, "Infirmier 1", ["Nursing"], max_patients=2),
+              Agent(2, "Infirmier 2", ["Nursing"], max_patients=2)]
+    west = [Patient(p, "Nursing", -10.0 - p * 0.1, 0.0, 10, [0, 300]) for p in range(1, 5)]
+    east = [Patient(p, "Nursing", 10.0 + p * 0.1, 0.0, 10, [0, 300]) for p in range(5, 9)]
+    instance = VRPInstance(Depot(0, 0.0, 0.0), agents, west + east)
+
+    parts = cluster_instance(instance, n_clusters=2, seed=0)
+    assert [len(part.patients) for part in parts] == [2, 2]
+    assert all(len(part.patients) <= sum(a.max_patients for a in part.agents) for part in parts)
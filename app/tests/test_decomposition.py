@@ -0,0 +1,57 @@
+from app.core.decomposition import skill_components, split_instance
+from app.core.solver import solve_instance
+from app.models.domain import Agent, Depot, Patient, VRPInstance
+
+
+def _specialised_instance(per_group=6):
+    agents = [
+        Agent(1, "A", ["Pediatrics"]), Agent(2, "B", ["Pediatrics", "Diabetes"]),
+        Agent(3, "C", ["Physio"]), Agent(4, "D", ["WoundCare"]),
+    ]
+    skills = ["Pediatrics", "Diabetes", "Physio"]
+    patients = [Patient(pid, skills[pid % 3], pid % 7, (3 * pid) % 10, 10, [0, 300])
+                for pid in range(1, 3 * per_group + 1)]
+    patients.append(Patient(99, "Nursing", 5, 5, 10, [0, 300]))  # aucune compétence disponible
+    return VRPInstance(Depot(0, 0.0, 0.0), agents, patients)
+
+
+def test_components_follow_shared_skills():
+    instance = _specialised_instance()
+    components = sorted(skill_components(instance))
+
+    assert [agents for agents, _ in components] == [[1, 2], [3], [4]]
+    assert {p.id for p in instance.patients if p.required_skill == "Physio"} == set(components[1][1])
+    assert components[2][1] == []
+    assert all(99 not in patients for _, patients in components)
+    assert len(split_instance(instance)) == 2
+
+
+def test_decomposed_solve_matches_monolithic_exact_solve():
+    instance = _specialised_instance(per_group=3)
+    mono, _ = solve_instance(data=instance, engine="gurobi")
+    split, _ = solve_instance(data=instance, engine="gurobi", decompose=True, workers=1)
+
+    assert list(split) == [a.id for a in instance.agents]
+    assert split[4]["visited_patients"] == []
+    total = lambda result: sum(r["total_distance"] for r in result.values())
+    assert abs(total(split) - total(mono)) < 1e-6
+
+
+def test_components_within_license_are_solved_in_parallel():
+    # 16 patients : trop pour la licence en un bloc, mais chaque composante tient (10 + 5)
+    instance = _specialised_instance(per_group=5)
+    result, _ = solve_instance(data=instance, decompose=True, workers=2)
+
+    assert set(result) == {a.id for a in instance.agents}
+    served = [pid for r in result.values() for pid in r["visited_patients"]]
+    assert sorted(served) == sorted(p.id for p in instance.patients if p.id != 99)
+
+    # La fusion est exactement l'union des composantes résolues séparément
+    parts = split_instance(instance)
+    expected = {a.id: {"route": [0, 0], "visited_patients": []} for a in instance.agents}
+    for part in parts:
+        alone, _ = solve_instance(data=part, engine="gurobi")
+        expected.update(alone)
+    for aid, info in expected.items():
+        assert result[aid]["route"] == info["route"]
+        assert abs(result[aid].get("total_distance", 0.0) - info.get("total_distance", 0.0)) < 1e-9
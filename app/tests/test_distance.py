@@ -0,0 +1,42 @@
+import numpy as np
+
+from app.gui.data_generator import generate_instance
+from app.utils.distance import DistanceMatrix, euclidean
+from app.utils.travel_time import HaversineProvider
+
+
+def test_matrix_matches_euclidean():
+    instance = generate_instance(num_patients=10, num_agents=3, seed=5)
+    coords = instance.get_all_coords()
+    dist = DistanceMatrix.from_instance(instance)
+
+    for i in coords:
+        for j in coords:
+            assert abs(dist[i, j] - euclidean(coords[i], coords[j])) < 1e-9
+
+
+def test_update_node_recomputes_row_and_column():
+    coords = {0: (0.0, 0.0), 1: (3.0, 4.0), 2: (1.0, 1.0)}
+    dist = DistanceMatrix(list(coords), coords)
+    assert dist[0, 1] == 5.0
+
+    dist.update_node(1, (6.0, 8.0))
+    assert dist[0, 1] == 10.0
+    assert dist[1, 0] == 10.0
+    assert dist.route_length([0, 1, 0]) == 20.0
+
+
+def test_haversine_cached_matrix_is_memory_mapped(tmp_path):
+    # Deux points de Tunis distants d'environ 1.1 km (0.01° de latitude)
+    coords = {0: (36.80, 10.18), 1: (36.81, 10.18)}
+    provider = HaversineProvider(cache_dir=str(tmp_path))
+    first = DistanceMatrix(list(coords), coords, provider=provider)
+    assert abs(first[0, 1] - 1.112 * 60 / 30) < 0.02  # minutes à 30 km/h par défaut
+    assert abs(HaversineProvider(speed_kmh=60).pairwise(first.points, first.points)[0, 1] - 1.112) < 0.01
+
+    second = DistanceMatrix(list(coords), coords, provider=provider)
+    assert isinstance(second.matrix, np.memmap)
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+    second.update_node(1, (36.82, 10.18))
+    assert abs(second[1, 0] - 2.224 * 2) < 0.02
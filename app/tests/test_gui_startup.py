@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+
+def test_main_window_import_defers_plot_and_solver():
+    code = (
+        "import sys\n"
+        "import app.gui.main_window\n"
+        "print(sorted(m for m in ('matplotlib', 'gurobipy', 'scipy', 'numpy', 'app.core.solver') if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_startup_times_are_logged_not_printed(capsys, caplog):
+    from PyQt5.QtWidgets import QApplication
+
+    from app.gui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    with caplog.at_level("INFO", logger="app.gui.main_window"):
+        window._mark("first_paint")
+    assert "first_paint" in window.startup_times
+    assert "first_paint" in caplog.text
+    assert capsys.readouterr().out == ""
+    window.close()
+    app.processEvents()
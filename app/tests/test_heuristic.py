@@ -0,0 +1,93 @@
+import time
+
+import numpy as np
+
+from app.core.alns import ALNS
+from app.core.control import SolveControl
+from app.core.heuristic import construct_routes, solve_heuristic
+from app.core.routing import RoutingProblem
+from app.core.solver import solve_instance
+from app.gui.data_generator import generate_instance
+from app.models.domain import Agent, Depot, Patient, VRPInstance
+from app.utils.distance import DistanceMatrix
+from app.utils.travel_time import TravelTimeProvider
+
+
+def _assert_feasible(instance, result):
+    problem = RoutingProblem(instance)
+    routes = problem.from_result(result)
+    seen = set()
+    for k, route in routes.items():
+        assert problem.is_feasible(k, route), f"Route infaisable pour l'agent {problem.agent_ids[k]}"
+        assert not seen & set(route), "Patient visité deux fois"
+        seen.update(route)
+
+
+def test_heuristic_routes_are_feasible():
+    instance = generate_instance(num_patients=200, num_agents=40, seed=7)
+    result = solve_heuristic(instance)
+
+    assert set(result) == {a.id for a in instance.agents}
+    assert sum(len(r["visited_patients"]) for r in result.values()) > 100
+    _assert_feasible(instance, result)
+
+
+def test_solve_instance_heuristic_engine_lifts_size_limit():
+    data = generate_instance(num_patients=30, num_agents=12, seed=3)
+    result, coords = solve_instance(data=data, engine="heuristic")
+
+    assert len(coords) == 31
+    for r in result.values():
+        assert r["route"][0] == 0 and r["route"][-1] == 0
+    _assert_feasible(data, result)
+
+
+def test_alns_never_worse_than_construction():
+    instance = generate_instance(num_patients=60, num_agents=15, seed=11)
+    problem = RoutingProblem(instance)
+    alns = ALNS(problem, seed=0)
+    initial = construct_routes(problem)
+    initial_cost = alns.cost(*initial)
+
+    routes, unserved = alns.run(time_limit=None, max_iterations=200, initial=initial)
+
+    assert alns.cost(routes, unserved) <= initial_cost
+    _assert_feasible(instance, problem.to_result(routes))
+
+
+def test_solve_instance_alns_engine():
+    data = generate_instance(num_patients=25, num_agents=8, seed=5)
+    result, _ = solve_instance(data=data, engine="alns", time_limit=0.3)
+
+    assert set(result) == {a.id for a in data.agents}
+    _assert_feasible(data, result)
+
+
+def test_cancelled_alns_returns_its_best_solution_at_once():
+    data = generate_instance(num_patients=25, num_agents=8, seed=5)
+    control = SolveControl()
+    control.cancel()
+    start = time.perf_counter()
+    result, _ = solve_instance(data=data, engine="alns", time_limit=30, control=control)
+
+    assert time.perf_counter() - start < 5
+    assert set(result) == {a.id for a in data.agents}
+    _assert_feasible(data, result)
+
+
+def test_alns_never_trades_a_patient_for_distance_on_road_matrices():
+    class OneWay(TravelTimeProvider):
+        # Retour vers l'ouest 10 fois plus lent : le retour au dépôt domine l'aller
+        def pairwise(self, a, b):
+            dx = b[None, :, 0] - a[:, None, 0]
+            return np.abs(dx) * np.where(dx >= 0, 1.0, 10.0) + np.abs(b[None, :, 1] - a[:, None, 1])
+
+    instance = VRPInstance(Depot(0, 0.0, 0.0), [Agent(1, "A", ["Nursing"], max_patients=2)],
+                           [Patient(1, "Nursing", 5.0, 0.0, 10, [0, 300])])
+    problem = RoutingProblem(instance, dist=DistanceMatrix.from_instance(instance, provider=OneWay()))
+    alns = ALNS(problem, seed=0)
+
+    assert problem.route_cost([1]) > 2 * max(problem.D[0])  # 5 à l'aller, 50 au retour
+    assert alns.cost({0: [1]}, []) < alns.cost({0: []}, [1])
+    routes, unserved = alns.run(time_limit=None, max_iterations=50)
+    assert routes[0] == [1] and unserved == []
@@ -0,0 +1,71 @@
+import copy
+
+from app.core.heuristic import best_insertion
+from app.core.insertion import insert_patient
+from app.core.routing import RoutingProblem
+from app.core.solver import solve_instance
+from app.gui.data_generator import generate_instance
+from app.models.domain import Agent, Depot, Patient, VRPInstance
+
+
+def test_urgent_patient_takes_cheapest_feasible_slot():
+    instance = generate_instance(num_patients=20, num_agents=4, seed=7)
+    result, _ = solve_instance(data=instance, engine="heuristic")
+    # Compétence d'un agent qui a encore de la place : un emplacement existe au moins en fin de route
+    spare = next(a for a in instance.agents if len(result[a.id]["visited_patients"]) < a.max_patients)
+    urgent = Patient(999, spare.skills[0], 5.0, 5.0, 5, [0, 300])
+
+    reference = copy.deepcopy(instance)
+    reference.patients.append(copy.deepcopy(urgent))
+    problem = RoutingProblem(reference)
+    expected = best_insertion(problem, problem.from_result(result), problem.dist.index[999])
+
+    new_result = insert_patient(result, instance, urgent)
+
+    assert instance.get_patient_by_id(999) is urgent
+    changed = [aid for aid in result if new_result[aid]["visited_patients"] != result[aid]["visited_patients"]]
+    assert changed == [problem.agent_ids[expected[1]]]
+    assert 999 in new_result[changed[0]]["visited_patients"]
+    assert abs(new_result[changed[0]]["total_distance"] - result[changed[0]]["total_distance"] - expected[0]) < 1e-9
+
+
+def test_full_routes_fall_back_to_local_reoptimization():
+    instance = VRPInstance(
+        Depot(0, 0.0, 0.0),
+        [Agent(1, "A", ["Nursing", "Physio"], max_patients=1), Agent(2, "B", ["Nursing"], max_patients=1)],
+        [Patient(1, "Nursing", 1.0, 0.0, 10)],
+    )
+    result = {
+        1: {"route": [0, 1, 0], "visited_patients": [1], "total_distance": 2.0, "arrival_times": {1: 1.0}},
+        2: {"route": [0, 0], "visited_patients": [], "total_distance": 0.0, "arrival_times": {}},
+    }
+
+    new_result = insert_patient(result, instance, Patient(2, "Physio", 0.0, 1.0, 10))
+
+    assert new_result[1]["visited_patients"] == [2]
+    assert new_result[2]["visited_patients"] == [1]
+
+
+def test_fallback_only_reworks_nearest_routes():
+    instance = VRPInstance(
+        Depot(0, 0.0, 0.0),
+        [Agent(1, "A", ["Nursing", "Physio"], max_patients=1), Agent(2, "B", ["Nursing"], max_patients=1),
+         Agent(3, "C", ["Nursing"], max_patients=2)],
+        [Patient(1, "Nursing", 1.0, 0.0, 10), Patient(2, "Nursing", 0.0, 1.0, 10),
+         Patient(3, "Nursing", 20.0, 0.0, 10)],
+    )
+    result = {
+        1: {"route": [0, 1, 0], "visited_patients": [1], "total_distance": 2.0, "arrival_times": {1: 1.0}},
+        2: {"route": [0, 2, 0], "visited_patients": [2], "total_distance": 2.0, "arrival_times": {2: 1.0}},
+        3: {"route": [0, 3, 0], "visited_patients": [3], "total_distance": 40.0, "arrival_times": {3: 20.0}},
+    }
+    urgent = Patient(4, "Physio", 1.0, 1.0, 10)
+
+    # Les deux routes les plus proches sont pleines : le patient reste non servi, C n'est pas touchée
+    local = insert_patient(result, copy.deepcopy(instance), urgent, local_routes=2)
+    assert all(4 not in info["visited_patients"] for info in local.values())
+    assert [local[aid]["visited_patients"] for aid in (1, 2, 3)] == [[1], [2], [3]]
+
+    rescued = insert_patient(result, copy.deepcopy(instance), urgent, local_routes=2, global_fallback=True)
+    assert rescued[1]["visited_patients"] == [4]
+    assert len(rescued[3]["visited_patients"]) == 2
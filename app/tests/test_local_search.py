@@ -0,0 +1,96 @@
+from app.core.heuristic import solve_heuristic
+from app.core.local_search import LocalSearch, improve_result
+from app.core.routing import RoutingProblem
+from app.core.solver import solve_instance
+from app.gui.data_generator import generate_instance
+from app.models.domain import Agent, Depot, Patient, VRPInstance
+
+
+def _total(result):
+    return sum(r["total_distance"] for r in result.values())
+
+
+def test_two_opt_removes_crossing():
+    # Carré parcouru en croisant ses diagonales
+    patients = [
+        Patient(id=pid, required_skill="Nursing", lat=lat, lon=lon, duration=1, time_window=[0, 300])
+        for pid, (lat, lon) in enumerate([(0, 1), (1, 1), (1, 0)], start=1)
+    ]
+    instance = VRPInstance(
+        depot=Depot(id=0, lat=0.0, lon=0.0),
+        agents=[Agent(id=1, name="Infirmier 1", skills=["Nursing"])],
+        patients=patients,
+    )
+    crossing = RoutingProblem(instance).to_result({0: [2, 1, 3]})
+
+    improved = improve_result(crossing, instance)
+
+    assert _total(improved) < _total(crossing)
+    assert improved[1]["route"] in ([0, 1, 2, 3, 0], [0, 3, 2, 1, 0])
+
+
+def test_local_search_keeps_routes_feasible():
+    instance = generate_instance(num_patients=150, num_agents=30, seed=9)
+    initial = solve_heuristic(instance)
+
+    improved = improve_result(initial, instance)
+
+    assert _total(improved) <= _total(initial) + 1e-9
+    problem = RoutingProblem(instance)
+    for k, route in problem.from_result(improved).items():
+        assert problem.is_feasible(k, route)
+    before = sorted(p for r in initial.values() for p in r["visited_patients"])
+    after = sorted(p for r in improved.values() for p in r["visited_patients"])
+    assert before == after
+
+
+def test_solve_instance_local_search_option():
+    data = generate_instance(num_patients=40, num_agents=10, seed=2)
+    plain, _ = solve_instance(data=data, engine="heuristic")
+    polished, _ = solve_instance(data=data, engine="heuristic", local_search=True)
+
+    assert _total(polished) <= _total(plain) + 1e-9
+
+
+def test_two_opt_accounts_for_reversed_segment_on_asymmetric_matrix():
+    import numpy as np
+
+    from app.utils.distance import DistanceMatrix
+    from app.utils.travel_time import TravelTimeProvider
+
+    class OneWay(TravelTimeProvider):
+        # Temps routiers : aller dans le sens croissant des x est 10 fois plus rapide
+        def pairwise(self, a, b):
+            dx = b[None, :, 0] - a[:, None, 0]
+            return np.abs(dx) * np.where(dx >= 0, 1.0, 10.0) + np.abs(b[None, :, 1] - a[:, None, 1])
+
+    patients = [
+        Patient(id=pid, required_skill="Nursing", lat=float(pid), lon=float(pid % 2), duration=1, time_window=[0, 10000])
+        for pid in range(1, 8)
+    ]
+    instance = VRPInstance(
+        depot=Depot(id=0, lat=0.0, lon=0.0),
+        agents=[Agent(id=1, name="Infirmier 1", skills=["Nursing"], max_patients=10, shift_duration=10000)],
+        patients=patients,
+    )
+    dist = DistanceMatrix.from_instance(instance, provider=OneWay())
+    initial = RoutingProblem(instance, dist=dist).to_result({0: [1, 2, 3, 4, 5, 6, 7]})
+
+    improved = improve_result(initial, instance, dist=dist)
+
+    assert _total(improved) <= _total(initial) + 1e-9
+    assert improved[1]["total_distance"] == dist.route_length(improved[1]["route"])
+
+
+def test_position_map_tracks_applied_moves():
+    instance = generate_instance(num_patients=120, num_agents=20, seed=4)
+    problem = RoutingProblem(instance)
+    search = LocalSearch(problem)
+    initial = problem.from_result(solve_heuristic(instance))
+
+    routes = search.run(initial)
+
+    assert sum(problem.route_cost(r) for r in routes.values()) <= \
+        sum(problem.route_cost(r) for r in initial.values()) + 1e-9
+    assert search.pos == {i: p for r in routes.values() for p, i in enumerate(r)}
+    assert search.where == {i: k for k, r in routes.items() for i in r}
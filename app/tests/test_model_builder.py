@@ -0,0 +1,185 @@
+import threading
+
+from app.core.gurobi_env import get_env
+from app.core.lazy_cuts import subtour_callback
+from app.core.model_builder import build_vrp_model, set_mip_start
+from app.core.routing import RoutingProblem
+from app.core.solver import _build_internal_sets, _heuristic_start, solve_instance, unserved_patients
+from app.gui.data_generator import generate_instance
+from app.models.domain import VRPInstance
+
+
+def test_arcs_only_for_servable_patients():
+    instance = generate_instance(num_patients=8, num_agents=4, seed=2)
+    patients, coords, s, skills_req, agents, tw = _build_internal_sets(instance)
+    m, x, t, d = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw)
+
+    for (i, j, k) in x:
+        for node in (i, j):
+            if node != 0:
+                assert skills_req[node] in agents[k]["skills"], "Arc créé pour un patient non servable"
+
+    full_size = len(agents) * len(patients) * (len(patients) - 1)
+    assert len(x) < full_size
+
+
+def test_warm_start_matches_cold_solve():
+    instance = generate_instance(num_patients=7, num_agents=3, seed=1)
+    patients, coords, s, skills_req, agents, tw = _build_internal_sets(instance)
+
+    cold, x, t, d = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw)
+    cold.optimize()
+    warm, x, t, d = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw)
+    set_mip_start(x, t, *_heuristic_start(instance, d))
+    warm.optimize()
+
+    assert abs(cold.ObjVal - warm.ObjVal) < 1e-6
+
+
+def test_heuristic_start_covers_route_arcs():
+    instance = generate_instance(num_patients=6, num_agents=3, seed=4)
+    routes, arrivals = _heuristic_start(instance, None)
+
+    for aid, route in routes.items():
+        assert route[0] == 0 and route[-1] == 0
+        assert arrivals[0, aid] == 0.0
+        for pid in route[1:-1]:
+            assert (pid, aid) in arrivals
+
+
+def test_exact_routes_respect_time_windows():
+    instance = generate_instance(num_patients=8, num_agents=3, seed=6)
+    result, _ = solve_instance(data=instance, engine="gurobi")
+
+    problem = RoutingProblem(instance)
+    for k, route in problem.from_result(result).items():
+        assert problem.schedule(k, route) is not None, "Fenêtre horaire ou shift non respecté"
+
+
+def test_incompatible_windows_eliminate_arcs():
+    data = {
+        "depot": {"id": 0, "lat": 0, "lon": 0},
+        "agents": [{"id": 1, "name": "Infirmier 1", "skills": ["Nursing"], "lat": 0, "lon": 0}],
+        "patients": [
+            {"id": 1, "required_skill": "Nursing", "lat": 1, "lon": 0, "duration": 30, "time_window": [100, 150]},
+            {"id": 2, "required_skill": "Nursing", "lat": 2, "lon": 0, "duration": 10, "time_window": [0, 50]},
+        ],
+    }
+    instance = VRPInstance.from_dict(data)
+    patients, coords, s, skills_req, agents, tw = _build_internal_sets(instance)
+    m, x, t, d = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw)
+
+    # Impossible d'arriver chez 2 avant 50 après avoir servi 1 (au plus tôt 100 + 30)
+    assert (1, 2, 1) not in x
+    assert (2, 1, 1) in x
+
+
+def test_costly_detour_still_serves_every_patient():
+    # Fenêtres imposant l'aller-retour 1 -> 2 -> 3 : servir 2 coûte 40, plus qu'un aller-retour dédié
+    data = {
+        "depot": {"id": 0, "lat": 0, "lon": 0},
+        "agents": [{"id": 1, "name": "Infirmier 1", "skills": ["Nursing"], "lat": 0, "lon": 0}],
+        "patients": [
+            {"id": 1, "required_skill": "Nursing", "lat": 10, "lon": 0, "duration": 1, "time_window": [0, 15]},
+            {"id": 2, "required_skill": "Nursing", "lat": -10, "lon": 0, "duration": 1, "time_window": [20, 50]},
+            {"id": 3, "required_skill": "Nursing", "lat": 10.5, "lon": 0, "duration": 1, "time_window": [50, 100]},
+        ],
+    }
+    result, _ = solve_instance(data=data, engine="gurobi")
+    assert result[1]["route"] == [0, 1, 2, 3, 0]
+    assert unserved_patients(VRPInstance.from_dict(data), result) == []
+
+
+def test_lazy_formulation_matches_mtz():
+    instance = generate_instance(num_patients=8, num_agents=3, seed=5)
+    patients, coords, s, skills_req, agents, tw = _build_internal_sets(instance)
+
+    mtz, x, t, d = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw)
+    mtz.optimize()
+    lazy, x, t, d = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw,
+                                    formulation="lazy", fractional_cuts=True)
+    lazy.optimize(subtour_callback)
+
+    assert t == {}
+    assert lazy.NumConstrs < mtz.NumConstrs
+    assert abs(mtz.ObjVal - lazy.ObjVal) < 1e-6
+
+
+def test_lazy_node_cuts_keep_the_optimum():
+    instance = generate_instance(num_patients=8, num_agents=3, seed=5)
+    patients, coords, s, skills_req, agents, tw = _build_internal_sets(instance)
+    objectives = []
+    for fractional_cuts in (False, True):
+        m, x, t, d = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw,
+                                     formulation="lazy", fractional_cuts=fractional_cuts)
+        assert m.Params.PreCrush == int(fractional_cuts)
+        m.optimize(subtour_callback)
+        objectives.append(m.ObjVal)
+    assert abs(objectives[0] - objectives[1]) < 1e-6
+
+    distances = []
+    for fractional_cuts in (False, True):
+        result, _ = solve_instance(data=instance, engine="gurobi", formulation="lazy",
+                                   fractional_cuts=fractional_cuts)
+        distances.append(sum(r["total_distance"] for r in result.values()))
+    assert abs(distances[0] - distances[1]) < 1e-6
+
+
+def test_solve_instance_lazy_routes_are_feasible():
+    instance = generate_instance(num_patients=8, num_agents=3, seed=8)
+    result, _ = solve_instance(data=instance, engine="gurobi", formulation="lazy")
+
+    problem = RoutingProblem(instance)
+    for k, route in problem.from_result(result).items():
+        assert problem.is_feasible(k, route)
+
+
+def test_models_share_quiet_pooled_env():
+    instance = generate_instance(num_patients=5, num_agents=2, seed=3)
+    patients, coords, s, skills_req, agents, tw = _build_internal_sets(instance)
+
+    m1, *_ = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw)
+    m2, *_ = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw)
+
+    assert get_env() is get_env()
+    assert m1.Params.OutputFlag == 0 and m2.Params.OutputFlag == 0
+    assert m1.NumVars == m2.NumVars
+
+    # Un autre thread (une résolution de la GUI) reçoit le même environnement
+    seen = []
+    worker = threading.Thread(target=lambda: seen.append(get_env()))
+    worker.start()
+    worker.join()
+    assert seen == [get_env()]
+
+    capped, *_ = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw, threads=1)
+    assert capped.Params.Threads == 1 and get_env().getParam("Threads") == 0
+
+
+def test_identical_agents_are_aggregated():
+    depot = {"id": 0, "lat": 0, "lon": 0}
+    data = {
+        "depot": depot,
+        "agents": [{"id": a, "name": f"Infirmier {a}", "skills": ["Nursing"], "lat": 0, "lon": 0,
+                    "max_patients": 2} for a in (1, 2, 3)],
+        "patients": [{"id": p, "required_skill": "Nursing", "lat": p, "lon": (-1) ** p * p, "duration": 10,
+                      "time_window": [0, 200]} for p in range(1, 6)],
+    }
+    instance = VRPInstance.from_dict(data)
+    patients, coords, s, skills_req, agents, tw = _build_internal_sets(instance)
+
+    per_agent, *_ = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw,
+                                    aggregate_agents=False)
+    per_agent.optimize()
+    aggregated, x, t, d = build_vrp_model(patients, coords, s, skills_req, agents, time_windows=tw)
+    aggregated.optimize()
+
+    assert aggregated._types == {1: [1, 2, 3]}
+    assert {k for (i, j, k) in x} == {1}
+    assert abs(per_agent.ObjVal - aggregated.ObjVal) < 1e-6
+
+    # Routes réattribuées aux agents individuels, capacité respectée par route
+    result, _ = solve_instance(data=instance, engine="gurobi")
+    assert sorted(result) == [1, 2, 3]
+    assert sorted(pid for r in result.values() for pid in r["visited_patients"]) == [1, 2, 3, 4, 5]
+    assert all(len(r["visited_patients"]) <= 2 for r in result.values())
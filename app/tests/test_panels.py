@@ -0,0 +1,49 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from app.gui.panels import AgentsModel, CircuitsModel, PatientsModel  # noqa: E402
+from app.models.generator import generate_instance  # noqa: E402
+
+
+def _result(routes):
+    return {aid: {"route": route, "total_distance": float(len(route))} for aid, route in routes.items()}
+
+
+def test_circuits_signal_only_changed_rows():
+    model = CircuitsModel()
+    resets, changes = [], []
+    model.modelReset.connect(lambda: resets.append(1))
+    model.dataChanged.connect(lambda top, bottom: changes.append((top.row(), bottom.row())))
+
+    routes = {1: [0, 1, 2, 0], 2: [0, 0], 3: [0, 3, 0], 4: [0, 4, 0]}
+    model.set_result(_result(routes))
+    assert resets == [1] and model.rowCount() == 4
+    assert model.index(0, 2).data() == "Dépôt → P1 → P2 → Dépôt"
+    assert model.index(1, 2).data() == "Pas de tournée assignée"
+
+    routes.update({2: [0, 5, 0], 3: [0, 3, 6, 0]})
+    model.set_result(_result(routes))
+    assert resets == [1] and changes == [(1, 2)]  # une plage contiguë, lignes 1 et 2
+
+    changes.clear()
+    model.set_result(_result(routes))
+    assert changes == []
+
+
+def test_instance_panels_follow_edits():
+    instance = generate_instance(num_patients=6, num_agents=3, seed=5)
+    agents, patients = AgentsModel(), PatientsModel()
+    agents.set_instance(instance)
+    patients.set_instance(instance)
+    assert agents.rowCount() == 3 and patients.rowCount() == 6
+    assert agents.index(0, 0).data() == instance.agents[0].name
+
+    changes = []
+    patients.dataChanged.connect(lambda top, bottom: changes.append((top.row(), bottom.row())))
+    patient = instance.patients[4]
+    patient.set_skill("Physio" if patient.required_skill != "Physio" else "Nursing")
+    patients.refresh()
+    assert changes == [(4, 4)]
+    assert patients.index(4, 1).data().endswith(patient.required_skill)
+    assert patients.key(4) == patient.id
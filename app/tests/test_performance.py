@@ -1,5 +1,6 @@
 import time
 
+from app.core.routing import RoutingProblem
 from app.core.solver import solve_instance
 from app.gui.data_generator import generate_instance
 
@@ -12,3 +13,24 @@ def test_large_instance_under_2_seconds():
     end = time.time()
 
     assert end - start < 2.0, "Le solveur est trop lent (>2s)"
+
+
+def test_heuristic_1000_patients_under_1_second():
+    data = generate_instance(test_type="large", num_patients=1000, num_agents=200, seed=4)
+
+    start = time.time()
+    result, _ = solve_instance(data=data, engine="heuristic")
+    end = time.time()
+
+    assert end - start < 1.0, "L'heuristique est trop lente (>1s)"
+
+    problem = RoutingProblem(data)
+    routes = problem.from_result(result)
+    for k, route in routes.items():
+        assert problem.is_feasible(k, route), f"Route infaisable pour l'agent {problem.agent_ids[k]}"
+    served = [i for route in routes.values() for i in route]
+    assert len(served) == len(set(served)), "Patient visité deux fois"
+    # Servables : au moins un agent compétent peut les visiter seuls (fenêtres, fin de shift)
+    servable = [i for i in problem.patient_indices
+                if any(problem.is_feasible(k, [i]) for k in range(len(problem.agent_ids)))]
+    assert len(served) >= 0.94 * len(servable)  # 947 / 1000 avec cette graine
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt5")
+pytest.importorskip("matplotlib")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from app.gui.plot_widget import PlotWidget  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def test_update_reuses_artists_and_blits(app, monkeypatch):
+    widget = PlotWidget()
+    coords = {0: (5.0, 5.0), 1: (1.0, 2.0), 2: (8.0, 3.0), 3: (4.0, 9.0)}
+    info = {1: {"skill": "Nursing"}, 2: {"skill": "Physio"}, 3: {"skill": "Diabetes"}}
+    widget.update_plot({"A": [0, 1, 2, 0], "B": [0, 3, 0]}, coords, info)
+    artists = (widget.routes, widget.nodes, widget.depot, widget.labels[1][0])
+    assert len(widget.routes.get_segments()) == 2
+    assert widget.labels[2][1].get_text() == "🏃"
+
+    draws = []
+    monkeypatch.setattr(widget.canvas, "draw", lambda: draws.append(1))
+    coords[2] = (7.0, 4.0)  # déplacement dans la vue : pas de dessin complet
+    widget.update_plot({"A": [0, 1, 0], "B": [0, 3, 2, 0]}, coords, info)
+    assert draws == []
+    assert (widget.routes, widget.nodes, widget.depot, widget.labels[1][0]) == artists
+    assert tuple(widget.labels[2][0].xy) == (7.0, 4.0) == tuple(widget.labels[2][1].xy)
+    assert widget.labels[2][0].get_position() == (4, 4)  # décalage en points, quelle que soit l'échelle
+    assert widget.nodes.get_offsets().tolist() == [[1.0, 2.0], [7.0, 4.0], [4.0, 9.0]]
+
+    coords[4] = (30.0, 30.0)  # hors de la vue : nouvelle instance, vue élargie
+    widget.update_plot({}, coords, info)
+    assert draws == [1]
+    assert widget.ax.get_xlim()[1] > 30.0
+    assert 4 in widget.labels and not widget.routes.get_segments()
+
+
+def test_view_margin_scales_with_coordinates(app):
+    widget = PlotWidget()
+    coords = {0: (48.85, 2.35), 1: (48.86, 2.36), 2: (48.87, 2.33)}  # lat/lon d'une ville
+    widget.update_plot({}, coords)
+    (x0, x1), (y0, y1) = widget.ax.get_xlim(), widget.ax.get_ylim()
+    assert x1 - x0 < 0.05 and y1 - y0 < 0.05
+    assert x0 < 48.85 and x1 > 48.87 and y0 < 2.33 and y1 > 2.36
@@ -0,0 +1,66 @@
+import logging
+
+from app.core.solver import _extract_routes, _optimize, solve_instance
+from app.gui.data_generator import generate_instance
+from app.utils.distance import DistanceMatrix
+
+
+class _FixedSolution:
+    """Modèle minimal exposant ``getAttr("X", vars)`` sur des valeurs figées."""
+
+    def __init__(self, values):
+        self.values = values
+
+    def getAttr(self, attr, variables):
+        assert attr == "X"
+        return [self.values[v] for v in variables]
+
+
+class _SolvedModel(_FixedSolution):
+    """Modèle « déjà résolu » pour ``_optimize``."""
+
+    SolCount = 1
+    _types = None
+
+    def optimize(self, callback=None):
+        pass
+
+
+def test_extract_routes_follows_successors_and_reports_subtours():
+    arcs = {
+        (0, 2, 1): 1.0, (2, 1, 1): 1.0, (1, 0, 1): 1.0,
+        (3, 4, 1): 1.0, (4, 3, 1): 1.0,
+        (0, 3, 2): 0.0, (3, 0, 2): 0.0,
+    }
+    x = {key: key for key in arcs}
+    routes, subtours = _extract_routes(_FixedSolution(arcs), x, {1: {}, 2: {}})
+
+    assert routes == {1: [0, 2, 1, 0], 2: [0, 0]}
+    assert len(subtours) == 1
+    assert subtours[0][0] == 1 and sorted(subtours[0][1]) == [3, 4]
+
+
+def test_ignored_subtours_are_logged_not_printed(capsys, caplog):
+    instance = generate_instance(num_patients=4, num_agents=2, seed=1)
+    arcs = {(0, 2, 1): 1.0, (2, 1, 1): 1.0, (1, 0, 1): 1.0, (3, 4, 1): 1.0, (4, 3, 1): 1.0}
+    agents = {a.id: {} for a in instance.agents}
+    dist = DistanceMatrix.from_instance(instance)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.solver"):
+        result = _optimize(_SolvedModel(arcs), {key: key for key in arcs}, {}, instance, dist, agents)
+
+    assert result[1]["route"] == [0, 2, 1, 0]
+    assert "Sous-tour ignoré pour l'agent 1" in caplog.text
+    assert capsys.readouterr().out == ""
+
+
+def test_result_contains_arrival_times():
+    instance = generate_instance(num_patients=6, num_agents=2, seed=3)
+    for formulation in ("mtz", "lazy"):
+        result, _ = solve_instance(data=instance, engine="gurobi", formulation=formulation)
+        for aid, r in result.items():
+            times = [r["arrival_times"][pid] for pid in r["visited_patients"]]
+            assert times == sorted(times)
+            for pid, arrival in r["arrival_times"].items():
+                start, end = instance.get_patient_by_id(pid).time_window
+                assert start - 1e-6 <= arrival <= end + 1e-6
@@ -0,0 +1,57 @@
+import copy
+
+from app.core.session import SolverSession
+from app.gui.data_generator import generate_instance
+
+
+def _cold_objective(instance):
+    session = SolverSession(copy.deepcopy(instance))
+    session.solve()
+    return session.model.ObjVal
+
+
+def test_coordinate_edit_patches_model_in_place():
+    instance = generate_instance(num_patients=8, num_agents=3, seed=2)
+    session = SolverSession(instance)
+    session.solve()
+    model = session.model
+
+    patient = session.instance.patients[0]
+    assert session.update_patient(patient.id, coords=(patient.lat + 3, patient.lon - 2), duration=patient.duration + 5)
+    result, coords = session.solve()
+
+    assert session.model is model and session.rebuilds == 1
+    assert coords[patient.id] == (patient.lat, patient.lon)
+    assert abs(session.model.ObjVal - _cold_objective(session.instance)) < 1e-6
+    assert set(result) == {a.id for a in instance.agents}
+    assert instance.patients[0].get_coords() != coords[patient.id]  # instance de l'appelant intacte
+
+
+def test_unservable_edit_matches_cold_solve():
+    instance = generate_instance(num_patients=8, num_agents=3, seed=4)
+    session = SolverSession(instance)
+    session.solve()
+
+    # Une compétence qu'aucun agent ne possède : le patient devient non servi
+    patient = session.instance.patients[1]
+    assert session.update_patient(patient.id, skill="Unknown")
+    result, _ = session.solve()
+
+    assert all(patient.id not in r["visited_patients"] for r in result.values())
+    assert abs(session.model.ObjVal - _cold_objective(session.instance)) < 1e-6
+
+
+def test_new_eligible_agent_rebuilds_from_previous_solution():
+    instance = generate_instance(num_patients=8, num_agents=3, seed=4)
+    session = SolverSession(instance)
+    session.solve()
+
+    patient = session.instance.patients[2]
+    before = {a.id for a in instance.agents if patient.required_skill in a.skills}
+    skill = next(s for a in instance.agents for s in a.skills
+                 if not {b.id for b in instance.agents if s in b.skills} <= before)
+    assert not session.update_patient(patient.id, skill=skill)
+    session.solve()
+
+    assert session.rebuilds == 2
+    assert abs(session.model.ObjVal - _cold_objective(session.instance)) < 1e-6
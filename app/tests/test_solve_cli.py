@@ -0,0 +1,55 @@
+import io
+import json
+import subprocess
+import sys
+
+from app.core.solver import ENGINES
+from app.models.generator import generate_instance
+from app.solve import ENGINES as CLI_ENGINES, main
+
+
+def test_cli_solves_files_and_stdin(tmp_path):
+    data = generate_instance(num_patients=12, num_agents=3, seed=2).to_dict()  # tous servis
+    path = tmp_path / "instance.json"
+    path.write_text(json.dumps(data))
+
+    out = io.StringIO()
+    assert main([str(path), "--engine", "heuristic"], stdout=out) == 0
+    report = json.loads(out.getvalue())
+    assert report["status"] == "ok" and report["source"] == str(path)
+    served = [pid for r in report["result"].values() for pid in r["visited_patients"]]
+    assert sorted(served + report["unserved"]) == sorted(p["id"] for p in data["patients"])
+
+    out = io.StringIO()
+    assert main(["--engine", "heuristic"], stdin=io.StringIO(json.dumps([data, data])), stdout=out) == 0
+    reports = json.loads(out.getvalue())
+    assert [r["source"] for r in reports] == ["<stdin>", "<stdin>"]
+    assert reports[0]["total_distance"] == reports[1]["total_distance"] == report["total_distance"]
+
+    # Patients non servis : instance non réalisable, code de sortie 1
+    data = generate_instance(num_patients=12, num_agents=3, seed=4).to_dict()
+    out = io.StringIO()
+    assert main(["--engine", "heuristic"], stdin=io.StringIO(json.dumps(data)), stdout=out) == 1
+    report = json.loads(out.getvalue())
+    assert report["status"] == "infeasible" and report["unserved"] and report["error"] is None
+
+
+def test_cli_rejects_invalid_json():
+    assert main([], stdin=io.StringIO("{pas du json"), stdout=io.StringIO()) == 2
+    assert main([], stdin=io.StringIO('{"foo": 1}'), stdout=io.StringIO()) == 2
+    assert main([], stdin=io.StringIO('{"depot": {}, "agents": [{"bad": 1}], "patients": []}'),
+                stdout=io.StringIO()) == 2
+    assert CLI_ENGINES == ENGINES
+
+
+def test_heuristic_cli_does_not_import_gui_or_gurobi(tmp_path):
+    path = tmp_path / "instance.json"
+    path.write_text(json.dumps(generate_instance(num_patients=5, num_agents=2, seed=1).to_dict()))
+    code = (
+        "import io, sys\n"
+        "from app.solve import main\n"
+        f"main([{str(path)!r}, '--engine', 'heuristic'], stdout=io.StringIO())\n"
+        "print(sorted(m for m in ('gurobipy', 'scipy', 'matplotlib', 'PyQt5', 'app.gui') if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,81 @@
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from app.core.session import SolverSession  # noqa: E402
+from app.gui.data_generator import generate_instance  # noqa: E402
+from app.threads.solve_scheduler import SolveScheduler  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def _wait_idle(app, scheduler, timeout_ms=20000):
+    loop = QtCore.QEventLoop()
+    scheduler.busy_changed.connect(lambda busy: loop.quit() if not busy else None)
+    QtCore.QTimer.singleShot(timeout_ms, loop.quit)
+    if scheduler.busy:
+        loop.exec_()
+
+
+def test_burst_of_edits_is_coalesced_into_one_solve(app):
+    instance = generate_instance(num_patients=8, num_agents=3, seed=1)
+    session = SolverSession(instance)
+    scheduler = SolveScheduler(debounce_ms=50)
+    results = []
+    scheduler.result_ready.connect(lambda total, routes, coords: results.append(coords))
+
+    scheduler.start(instance, session)
+    _wait_idle(app, scheduler)
+    assert len(results) == 1
+
+    patient = instance.patients[0]
+    for step in range(1, 4):
+        scheduler.edit(patient.id, {"coords": (patient.lat + step, patient.lon)})
+    generation = scheduler.generation
+    _wait_idle(app, scheduler)
+
+    assert scheduler.generation == generation + 1
+    assert len(results) == 2
+    assert results[-1][patient.id] == (patient.lat + 3, patient.lon)  # dernière édition
+
+
+def test_cancel_drops_pending_debounced_solve(app):
+    instance = generate_instance(num_patients=8, num_agents=3, seed=1)
+    session = SolverSession(instance)
+    scheduler = SolveScheduler(debounce_ms=50)
+    results = []
+    scheduler.result_ready.connect(lambda total, routes, coords: results.append(coords))
+    scheduler.start(instance, session)
+    _wait_idle(app, scheduler)
+
+    patient = instance.patients[0]
+    scheduler.edit(patient.id, {"coords": (patient.lat + 1, patient.lon)})
+    scheduler.cancel()
+    assert not scheduler.busy
+    QtCore.QTimer.singleShot(200, app.quit)
+    app.exec_()
+    assert len(results) == 1 and scheduler.thread is None
+
+    # L'édition en attente part avec la résolution suivante
+    scheduler.edit(patient.id, {"coords": (patient.lat + 2, patient.lon + 1)})
+    _wait_idle(app, scheduler)
+    assert results[-1][patient.id] == (patient.lat + 2, patient.lon + 1)
+    assert session.instance.patients[0].get_coords() == (patient.lat + 2, patient.lon + 1)
+
+
+def test_superseded_solve_results_are_dropped(app):
+    first = generate_instance(num_patients=8, num_agents=3, seed=2)
+    second = generate_instance(num_patients=6, num_agents=2, seed=3)
+    scheduler = SolveScheduler(debounce_ms=50)
+    results = []
+    scheduler.result_ready.connect(lambda total, routes, coords: results.append(routes))
+
+    scheduler.start(first, SolverSession(first))
+    scheduler.start(second, SolverSession(second))
+    _wait_idle(app, scheduler)
+
+    assert len(results) == 1
+    assert set(results[0]) == {a.id for a in second.agents}
@@ -0,0 +1,49 @@
+import numpy as np
+
+from app.models.generator import generate_instance
+from app.utils.spatial import SpatialIndex
+
+
+def _brute_nearest(points, x, y, k):
+    d = np.hypot(points[:, 0] - x, points[:, 1] - y)
+    return np.sort(d)[:k]
+
+
+def test_k_nearest_matches_brute_force_after_moves():
+    rng = np.random.default_rng(3)
+    points = rng.random((500, 2)) * 0.05  # échelle lat/lon d'une ville
+    points[:50] *= 0.01                   # amas dense
+    ids = list(range(1, 501))
+    index = SpatialIndex(ids, points)
+    for _ in range(50):
+        nid = int(rng.integers(1, 501))
+        points[nid - 1] = rng.random(2) * 0.06
+        index.move(nid, points[nid - 1])
+    for x, y in rng.random((50, 2)) * 0.05:
+        got = index.k_nearest(x, y, 8)
+        d = np.hypot(points[np.array(got) - 1, 0] - x, points[np.array(got) - 1, 1] - y)
+        assert np.allclose(d, _brute_nearest(points, x, y, 8))
+    assert index.k_nearest(0.0, 0.0, 3, exclude=ids[:-2]) == sorted(
+        ids[-2:], key=lambda i: np.hypot(*points[i - 1]))
+
+
+def test_pick_uses_per_axis_tolerance():
+    index = SpatialIndex.from_coords({0: (0.0, 0.0), 1: (1.0, 0.0), 2: (0.0, 0.02)})
+    assert index.pick(0.95, 0.0, 0.1) == 1
+    assert index.pick(0.0, 0.015, 0.1, 0.01) == 2  # le plus proche à l'échelle de chaque axe
+    assert index.pick(0.5, 0.5, 0.1) is None
+    index.move(1, (5.0, 5.0))
+    assert index.pick(0.95, 0.0, 0.1) is None and index.pick(5.0, 5.0, 0.1) == 1
+
+
+def test_add_and_remove_keep_index_consistent():
+    instance = generate_instance(num_patients=30, num_agents=3, seed=2)
+    index = SpatialIndex.from_instance(instance)
+    assert len(index) == 31 and 0 in index
+    index.remove(instance.patients[0].id)
+    index.add(99, (100.0, 100.0))
+    assert instance.patients[0].id not in index and len(index) == 31
+    assert index.k_nearest(100.0, 100.0, 1) == [99]
+    coords = instance.get_all_coords()
+    for nid in list(coords)[2:]:
+        assert coords[index.pick(*coords[nid], 1e-9)] == coords[nid]  # coordonnées entières : doublons
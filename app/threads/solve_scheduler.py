@@ -0,0 +1,114 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from .vrp_thread import VRPThread
+
+DEBOUNCE_MS = 300
+
+
+class SolveScheduler(QObject):
+    """Planifie les résolutions de la GUI : une seule à la fois, sur le dernier état.
+
+    Les éditions rapprochées sont regroupées (debounce) en une seule
+    résolution ; une résolution en cours devenue obsolète est annulée et la
+    suivante démarre dès qu'elle rend la main (la session Gurobi est partagée).
+    Chaque résolution porte un numéro de génération : les résultats et
+    incumbents d'une génération dépassée sont ignorés.
+    """
+
+    result_ready = pyqtSignal(float, dict, dict)  # distance, routes, coords
+    progress = pyqtSignal(float, dict, float)     # distance, routes, écart
+    failed = pyqtSignal(str)                      # message d'erreur du solveur
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, debounce_ms=DEBOUNCE_MS):
+        super().__init__(parent)
+        self.generation = 0
+        self.thread = None
+        self._instance = None
+        self._session = None
+        self._edits = []
+        self._restart = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._supersede)
+
+    @property
+    def busy(self):
+        return self.thread is not None or self._timer.isActive() or self._restart
+
+    # ------------------------------------------------------------------ API
+    def start(self, instance, session):
+        """Nouvelle instance : remplace immédiatement tout travail en cours."""
+        self._instance, self._session = instance, session
+        self._edits = []
+        self._timer.stop()
+        self._supersede()
+
+    def edit(self, pid, changes):
+        """Édition d'un patient ; la résolution part après ``debounce_ms`` sans nouvelle édition."""
+        self._edits.append((pid, changes))
+        self._timer.start()  # redémarre le délai à chaque édition
+        self.busy_changed.emit(True)
+
+    def cancel(self):
+        """Arrête la résolution en cours ; sa meilleure solution reste affichée.
+
+        Aucune résolution ne repart ensuite (délai en cours et relance prévue
+        abandonnés) ; les éditions en attente partiront avec la prochaine.
+        """
+        self._timer.stop()
+        self._restart = False
+        if self.thread is not None:
+            self.thread.cancel()
+        self.busy_changed.emit(self.busy)
+
+    # ------------------------------------------------------------ internes
+    def _supersede(self):
+        self.generation += 1
+        if self.thread is not None:
+            # La suivante démarrera à la fin de celle-ci (session partagée)
+            self._restart = True
+            self.thread.cancel()
+        else:
+            self._launch()
+        self.busy_changed.emit(True)
+
+    def _launch(self):
+        self._restart = False
+        edits, self._edits = self._edits, []
+        generation = self.generation
+        thread = VRPThread(
+            num_patients=len(self._instance.patients),
+            num_agents=len(self._instance.agents),
+            data=self._instance,
+            session=self._session,
+            edits=edits,
+        )
+        thread.progress_signal.connect(
+            lambda total, routes, gap: self._forward_progress(generation, total, routes, gap))
+        thread.result_signal.connect(
+            lambda total, routes, coords, ds: self._forward_result(generation, total, routes, coords))
+        thread.error_signal.connect(lambda message: self._forward_error(generation, message))
+        thread.finished.connect(self._on_finished)
+        self.thread = thread
+        thread.start()
+
+    def _forward_progress(self, generation, total, routes, gap):
+        if generation == self.generation:
+            self.progress.emit(total, routes, gap)
+
+    def _forward_result(self, generation, total, routes, coords):
+        if generation == self.generation:
+            self.result_ready.emit(total, routes, coords)
+
+    def _forward_error(self, generation, message):
+        if generation == self.generation:
+            self.failed.emit(message)
+
+    def _on_finished(self):
+        self.thread.wait()  # le thread rend la main juste après avoir émis ``finished``
+        self.thread = None
+        if self._restart:
+            self._launch()
+        self.busy_changed.emit(self.busy)
@@ -1,28 +1,66 @@
 from PyQt5.QtCore import QThread, pyqtSignal
 
+from ..core.control import SolveControl
 from ..core.solver import solve_instance
 from ..models.domain import VRPInstance
 
 
+def _total_distance(result):
+    return sum(r.get("total_distance", 0.0) for r in result.values())
+
+
 class VRPThread(QThread):
     result_signal = pyqtSignal(float, dict, dict, object)  # Changed last param to object
+    progress_signal = pyqtSignal(float, dict, float)  # distance, routes et écart de chaque incumbent
+    error_signal = pyqtSignal(str)  # échec de la résolution (licence, modèle, instance invalide)
 
-    def __init__(self, test_type="Random Small", num_patients=5, num_agents=3, seed=None, data=None):
+    def __init__(self, test_type="Random Small", num_patients=5, num_agents=3, seed=None, data=None,
+                 session=None, edit=None, time_limit=None, mip_gap=None, edits=None):
         super().__init__()
         self.test_type = test_type
         self.num_patients = num_patients
         self.num_agents = num_agents
         self.seed = seed
         self.data = data
+        # Session incrémentale (SolverSession) et éditions à appliquer, dans l'ordre :
+        # [(pid, {champ: valeur}), ...] ; ``edit`` est le raccourci pour une seule édition
+        self.session = session
+        self.edits = list(edits or []) + ([edit] if edit is not None else [])
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        # Émis depuis le callback Gurobi ; Qt achemine le signal vers le thread de la GUI
+        self.control = SolveControl(
+            on_incumbent=lambda result, objective, gap: self.progress_signal.emit(
+                _total_distance(result), result, gap))
+
+    def cancel(self):
+        """Arrête la résolution (appelable depuis la GUI) ; la meilleure solution est émise."""
+        self.control.cancel()
 
     def run(self):
-        result, coords = solve_instance(
+        try:
+            result, coords = self._solve()
+        except Exception as e:
+            self.error_signal.emit(str(e))
+            return
+        self.result_signal.emit(_total_distance(result), result, coords, self.data)
+
+    def _solve(self):
+        if self.session is not None:
+            for pid, changes in self.edits:
+                self.session.update_patient(pid, **changes)
+            if self.time_limit is not None:
+                self.session.time_limit = self.time_limit
+            if self.mip_gap is not None:
+                self.session.mip_gap = self.mip_gap
+            return self.session.solve(control=self.control)
+        return solve_instance(
             data=self.data,
             test_type=self.test_type,
             num_patients=self.num_patients,
             num_agents=self.num_agents,
             seed=self.seed,
+            time_limit=self.time_limit,
+            mip_gap=self.mip_gap,
+            control=self.control,
         )
-
-        total = sum(r.get("total_distance", 0.0) for r in result.values())
-        self.result_signal.emit(total, result, coords, self.data)
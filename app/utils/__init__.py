@@ -0,0 +1,21 @@
+"""Utilities shared by the solver engines and the GUI."""
+from .distance import DistanceMatrix, euclidean
+from .spatial import SpatialIndex
+from .travel_time import (
+    EuclideanProvider,
+    HaversineProvider,
+    MatrixCache,
+    RoadMatrixProvider,
+    TravelTimeProvider,
+)
+
+__all__ = [
+    "DistanceMatrix",
+    "euclidean",
+    "SpatialIndex",
+    "TravelTimeProvider",
+    "EuclideanProvider",
+    "HaversineProvider",
+    "RoadMatrixProvider",
+    "MatrixCache",
+]
@@ -1,5 +1,89 @@
 import math
 
+import numpy as np
+
+from .travel_time import EuclideanProvider
+
 
 def euclidean(a, b):
     return math.sqrt((a[0] - b[0])**2 + (a[1] - b[1])**2)
+
+
+class DistanceMatrix:
+    """Matrice de distances dense calculée en une seule passe NumPy.
+
+    Les identifiants de noeuds (dépôt + patients) sont associés à des indices
+    contigus, ce qui permet des accès en O(1) via ``dist[i, j]``.
+    Le calcul est délégué à un fournisseur (euclidien par défaut, voir
+    ``app.utils.travel_time``).
+    """
+
+    def __init__(self, ids, coords, provider=None):
+        self.ids = list(ids)
+        self.index = {nid: idx for idx, nid in enumerate(self.ids)}
+        self.provider = provider or EuclideanProvider()
+        self.points = np.array([coords[nid] for nid in self.ids], dtype=float).reshape(-1, 2)
+        self.matrix = self.provider.matrix(self.ids, self.points)
+
+    @classmethod
+    def from_instance(cls, instance, provider=None):
+        """Construit la matrice à partir d'une VRPInstance (dépôt en premier)."""
+        coords = instance.get_all_coords()
+        return cls(list(coords), coords, provider=provider)
+
+    def __getitem__(self, key):
+        i, j = key
+        return float(self.matrix[self.index[i], self.index[j]])
+
+    def __contains__(self, nid):
+        return nid in self.index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def distance(self, i, j):
+        """Distance entre deux noeuds identifiés par leur id."""
+        return self[i, j]
+
+    def route_length(self, route):
+        """Longueur totale d'une route donnée comme liste d'ids."""
+        if len(route) < 2:
+            return 0.0
+        idx = np.fromiter((self.index[nid] for nid in route), dtype=np.intp, count=len(route))
+        return float(self.matrix[idx[:-1], idx[1:]].sum())
+
+    def subset(self, ids):
+        """Sous-matrice restreinte aux noeuds ``ids`` (dépôt en premier), sans recalcul."""
+        sub = object.__new__(type(self))
+        sub.ids = list(ids)
+        sub.index = {nid: idx for idx, nid in enumerate(sub.ids)}
+        sub.provider = self.provider
+        idx = np.fromiter((self.index[nid] for nid in sub.ids), dtype=np.intp, count=len(sub.ids))
+        sub.points = self.points[idx]
+        sub.matrix = self.matrix[np.ix_(idx, idx)]
+        return sub
+
+    def update_node(self, nid, coords):
+        """Met à jour la ligne et la colonne d'un noeud déplacé (O(n))."""
+        idx = self.index[nid]
+        if not self.matrix.flags.writeable:
+            # Matrice mappée depuis le cache disque : copie avant modification
+            self.matrix = np.array(self.matrix)
+        self.points[idx] = coords
+        point = self.points[idx:idx + 1]
+        self.matrix[idx, :] = self.provider.pairwise(point, self.points)[0]
+        self.matrix[:, idx] = self.provider.pairwise(self.points, point)[:, 0]
+
+    def add_node(self, nid, coords):
+        """Ajoute un noeud en fin de matrice (nouvelle ligne et colonne, O(n))."""
+        point = np.asarray(coords, dtype=float).reshape(1, 2)
+        points = np.vstack((self.points, point))
+        n = len(self.ids)
+        matrix = np.empty((n + 1, n + 1), dtype=float)
+        matrix[:n, :n] = self.matrix
+        matrix[n, :] = self.provider.pairwise(point, points)[0]
+        matrix[:, n] = self.provider.pairwise(points, point)[:, 0]
+        self.ids.append(nid)
+        self.index[nid] = n
+        self.points = points
+        self.matrix = matrix
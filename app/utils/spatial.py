@@ -0,0 +1,189 @@
+"""Index spatial en grille uniforme sur les noeuds d'une instance.
+
+Les noeuds sont rangés dans des cellules carrées (dictionnaire
+``(cx, cy) -> [emplacements]``) dont le côté vise quelques noeuds par
+cellule. Une requête ne parcourt que les cellules voisines du point :
+
+- ``pick`` : noeud le plus proche dans une tolérance anisotrope (``rx``,
+  ``ry``), ce qui permet une tolérance exprimée en pixels quel que soit
+  l'ordre de grandeur des coordonnées (lat/lon, kilomètres...) ;
+- ``k_nearest`` : k plus proches voisins, par anneaux de cellules.
+
+Un noeud déplacé ne change que deux listes de cellules (``move``), sans
+reconstruction. Les distances sont euclidiennes dans le plan des
+coordonnées.
+"""
+
+import math
+
+import numpy as np
+
+PER_CELL = 2  # noeuds visés par cellule
+
+
+class SpatialIndex:
+    """Grille uniforme ``id -> (x, y)`` avec mises à jour incrémentales."""
+
+    def __init__(self, ids, points, cell=None):
+        self.ids = list(ids)
+        self.slot = {nid: s for s, nid in enumerate(self.ids)}
+        self.points = np.array(points, dtype=float).reshape(-1, 2)
+        self._build(cell)
+
+    @classmethod
+    def from_coords(cls, coords, cell=None):
+        """Index d'un dictionnaire ``{id: (x, y)}``."""
+        return cls(list(coords), [coords[nid] for nid in coords], cell=cell)
+
+    @classmethod
+    def from_instance(cls, instance, cell=None):
+        """Index du dépôt et des patients d'une VRPInstance."""
+        return cls.from_coords(instance.get_all_coords(), cell=cell)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, nid):
+        return nid in self.slot
+
+    # ------------------------------------------------------------ grille
+    def _build(self, cell=None):
+        n = len(self.ids)
+        if cell is None:
+            cell = 1.0
+            if n > 1:
+                span = self.points.max(axis=0) - self.points.min(axis=0)
+                area = float(span[0] * span[1]) or float(max(span)) ** 2
+                if area > 0:
+                    cell = math.sqrt(area * PER_CELL / n)
+        self.cell = cell
+        self._built = max(n, 1)
+        self.cells = {}
+        for s, key in enumerate(map(tuple, np.floor(self.points / cell).astype(np.int64).tolist())):
+            self.cells.setdefault(key, []).append(s)
+        self._bounds()
+
+    def _bounds(self):
+        keys = np.array(list(self.cells), dtype=np.int64).reshape(-1, 2)
+        self.low = keys.min(axis=0) if len(keys) else np.zeros(2, dtype=np.int64)
+        self.high = keys.max(axis=0) if len(keys) else np.zeros(2, dtype=np.int64)
+
+    def _key(self, x, y):
+        return (math.floor(x / self.cell), math.floor(y / self.cell))
+
+    # ---------------------------------------------------- mises à jour
+    def move(self, nid, coords):
+        """Déplace un noeud (O(taille de cellule))."""
+        s = self.slot[nid]
+        old = self._key(*self.points[s])
+        self.points[s] = coords
+        new = self._key(*self.points[s])
+        if new != old:
+            self._detach(old, s)
+            self._attach(new, s)
+
+    def add(self, nid, coords):
+        """Ajoute un noeud ; la grille est refaite si sa taille a quadruplé."""
+        s = len(self.ids)
+        self.ids.append(nid)
+        self.slot[nid] = s
+        self.points = np.vstack((self.points, np.asarray(coords, dtype=float).reshape(1, 2)))
+        if len(self.ids) > 4 * self._built:
+            self._build()
+        else:
+            self._attach(self._key(*self.points[s]), s)
+
+    def remove(self, nid):
+        """Retire un noeud (le dernier emplacement prend sa place)."""
+        s = self.slot.pop(nid)
+        last = len(self.ids) - 1
+        self._detach(self._key(*self.points[s]), s)
+        if s != last:
+            moved = self.ids[last]
+            key = self._key(*self.points[last])
+            members = self.cells[key]
+            members[members.index(last)] = s
+            self.ids[s] = moved
+            self.slot[moved] = s
+            self.points[s] = self.points[last]
+        self.ids.pop()
+        self.points = self.points[:last]
+
+    def _attach(self, key, s):
+        self.cells.setdefault(key, []).append(s)
+        self.low = np.minimum(self.low, key)
+        self.high = np.maximum(self.high, key)
+
+    def _detach(self, key, s):
+        members = self.cells[key]
+        members.remove(s)
+        if not members:
+            del self.cells[key]
+
+    def _slots(self, cx0, cx1, cy0, cy1):
+        """Emplacements des cellules du rectangle ``[cx0, cx1] x [cy0, cy1]``."""
+        cx0, cy0 = max(cx0, int(self.low[0])), max(cy0, int(self.low[1]))
+        cx1, cy1 = min(cx1, int(self.high[0])), min(cy1, int(self.high[1]))
+        if cx0 > cx1 or cy0 > cy1:
+            return []
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            # Rectangle plus grand que la grille occupée : parcours des cellules
+            return [s for (cx, cy), members in self.cells.items()
+                    if cx0 <= cx <= cx1 and cy0 <= cy <= cy1 for s in members]
+        slots = []
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                slots.extend(self.cells.get((cx, cy), ()))
+        return slots
+
+    # ---------------------------------------------------------- requêtes
+    def pick(self, x, y, rx, ry=None):
+        """Noeud le plus proche de ``(x, y)`` dans l'ellipse de demi-axes ``rx``, ``ry``, ou None.
+
+        La distance est normalisée par la tolérance de chaque axe : avec
+        ``rx``/``ry`` = quelques pixels convertis en unités de données, le
+        noeud retenu est le plus proche à l'écran.
+        """
+        ry = rx if ry is None else ry
+        if not self.ids or rx <= 0 or ry <= 0:
+            return None
+        cx0, cy0 = self._key(x - rx, y - ry)
+        cx1, cy1 = self._key(x + rx, y + ry)
+        slots = self._slots(cx0, cx1, cy0, cy1)
+        if not slots:
+            return None
+        pts = self.points[slots]
+        d2 = ((pts[:, 0] - x) / rx) ** 2 + ((pts[:, 1] - y) / ry) ** 2
+        best = int(d2.argmin())
+        return self.ids[slots[best]] if d2[best] <= 1.0 else None
+
+    def k_nearest(self, x, y, k, exclude=()):
+        """Ids des ``k`` noeuds les plus proches de ``(x, y)``, du plus proche au plus lointain."""
+        k = min(k, len(self.ids) - len([nid for nid in exclude if nid in self.slot]))
+        if k <= 0:
+            return []
+        skip = {self.slot[nid] for nid in exclude if nid in self.slot}
+        cx, cy = self._key(x, y)
+        found = []
+        r = 0
+        reach = int(max(abs(cx - self.low[0]), abs(self.high[0] - cx),
+                        abs(cy - self.low[1]), abs(self.high[1] - cy)))
+        while True:
+            # Anneau de rayon r (les cellules intérieures ont déjà été vues)
+            if r == 0:
+                ring = self._slots(cx, cx, cy, cy)
+            else:
+                ring = (self._slots(cx - r, cx + r, cy - r, cy - r) + self._slots(cx - r, cx + r, cy + r, cy + r)
+                        + self._slots(cx - r, cx - r, cy - r + 1, cy + r - 1)
+                        + self._slots(cx + r, cx + r, cy - r + 1, cy + r - 1))
+            found.extend(s for s in ring if s not in skip)
+            if len(found) >= k:
+                d = np.hypot(self.points[found, 0] - x, self.points[found, 1] - y)
+                kth = np.partition(d, k - 1)[k - 1]
+                # Tout noeud hors du carré exploré est à plus de r cellules
+                if kth <= r * self.cell or r >= reach:
+                    order = np.argsort(d, kind="stable")[:k]
+                    return [self.ids[found[i]] for i in order.tolist()]
+            elif r >= reach:
+                return [self.ids[s] for s in found]
+            r += 1
@@ -0,0 +1,170 @@
+"""Fournisseurs de temps/distances de trajet pour les modèles VRP.
+
+Chaque fournisseur expose ``pairwise(a, b)`` (matrice entre deux tableaux de
+points ``(lat, lon)``) et ``matrix(ids, points)`` (matrice complète d'un
+ensemble de noeuds). Les matrices coûteuses peuvent être conservées sur disque
+au format ``.npy`` et rechargées en mémoire mappée (sans copie).
+"""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_SPEED_KMH = 30.0  # vitesse moyenne en ville pour les temps haversine
+
+
+class MatrixCache:
+    """Cache disque de matrices ``.npy`` indexées par l'empreinte des noeuds."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(namespace, ids, points):
+        """Empreinte stable d'un ensemble de noeuds (ids + coordonnées)."""
+        h = hashlib.sha1(namespace.encode("utf-8"))
+        h.update(np.asarray(ids, dtype=np.int64).tobytes())
+        h.update(np.ascontiguousarray(points, dtype=np.float64).tobytes())
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def load(self, key):
+        """Retourne la matrice en mémoire mappée (lecture seule) ou None."""
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def store(self, key, matrix):
+        """Écrit la matrice de façon atomique puis la recharge en mémoire mappée."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".npy.tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.asarray(matrix, dtype=np.float64))
+        os.replace(tmp, self.path(key))
+        return self.load(key)
+
+
+class TravelTimeProvider:
+    """Base des fournisseurs : calcule une matrice dense, éventuellement cachée."""
+
+    name = "base"
+
+    def __init__(self, cache_dir=None):
+        self.cache = MatrixCache(cache_dir) if cache_dir else None
+
+    def pairwise(self, a, b):
+        raise NotImplementedError
+
+    def fingerprint(self, ids=None, points=None):
+        """Identifie le fournisseur et ses paramètres (clé du cache de solutions).
+
+        Deux fournisseurs de même empreinte donnent la même matrice pour les
+        mêmes noeuds ``ids``/``points`` (utilisés par les matrices stockées).
+        """
+        return f"{type(self).__module__}.{type(self).__qualname__}:{self.name}"
+
+    def matrix(self, ids, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if self.cache is None:
+            return self.pairwise(points, points)
+        key = MatrixCache.key(self.name, ids, points)
+        cached = self.cache.load(key)
+        if cached is not None:
+            return cached
+        return self.cache.store(key, self.pairwise(points, points))
+
+
+class EuclideanProvider(TravelTimeProvider):
+    """Distance euclidienne plane (comportement historique du modèle)."""
+
+    name = "euclidean"
+
+    def pairwise(self, a, b):
+        diff = a[:, None, :] - b[None, :, :]
+        return np.sqrt((diff ** 2).sum(axis=-1))
+
+
+class HaversineProvider(TravelTimeProvider):
+    """Temps de trajet (minutes) à vitesse constante sur la distance orthodromique.
+
+    Les coordonnées sont des (lat, lon) en degrés. Le modèle compare ``d_ij``
+    aux fenêtres horaires et à la durée de service, en minutes : la distance
+    (km) est donc toujours convertie avec ``speed_kmh``, par défaut
+    ``DEFAULT_SPEED_KMH`` (vitesse moyenne en ville).
+    """
+
+    name = "haversine"
+
+    def __init__(self, speed_kmh=None, cache_dir=None):
+        super().__init__(cache_dir)
+        self.speed_kmh = DEFAULT_SPEED_KMH if speed_kmh is None else speed_kmh
+        if self.speed_kmh <= 0:
+            raise ValueError(f"Vitesse invalide: {self.speed_kmh!r} km/h")
+        self.name = f"haversine@{self.speed_kmh}"
+
+    @staticmethod
+    def kilometres(a, b):
+        """Distances orthodromiques (km) entre deux tableaux de points."""
+        lat1, lon1 = np.radians(a[:, 0])[:, None], np.radians(a[:, 1])[:, None]
+        lat2, lon2 = np.radians(b[:, 0])[None, :], np.radians(b[:, 1])[None, :]
+        h = (np.sin((lat2 - lat1) / 2.0) ** 2
+             + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2)
+        return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+    def pairwise(self, a, b):
+        return self.kilometres(a, b) / self.speed_kmh * 60.0
+
+
+class RoadMatrixProvider(TravelTimeProvider):
+    """Temps de trajet routiers précalculés, stockés dans le cache disque.
+
+    ``fetch(ids, points)`` (par ex. un appel OSRM) n'est invoqué qu'en cas de
+    défaut de cache ; sans ``fetch``, on retombe sur ``fallback``.
+    Les mises à jour ponctuelles d'un noeud utilisent aussi ``fallback``.
+    """
+
+    name = "road"
+
+    def __init__(self, cache_dir, fetch=None, fallback=None):
+        super().__init__(cache_dir)
+        self.fetch = fetch
+        self.fallback = fallback or HaversineProvider()
+
+    def pairwise(self, a, b):
+        return self.fallback.pairwise(a, b)
+
+    def fingerprint(self, ids=None, points=None):
+        """Répertoire, ``fetch`` et repli, plus la version de la matrice stockée pour ces noeuds."""
+        fetch = None
+        if self.fetch is not None:
+            fetch = f"{getattr(self.fetch, '__module__', '')}.{getattr(self.fetch, '__qualname__', repr(self.fetch))}"
+        parts = [super().fingerprint(), os.path.realpath(self.cache.directory), str(fetch),
+                 self.fallback.fingerprint()]
+        if ids is not None:
+            points = np.asarray(points, dtype=float).reshape(-1, 2)
+            path = self.cache.path(MatrixCache.key(self.name, ids, points))
+            if os.path.exists(path):
+                stat = os.stat(path)
+                parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+        return "|".join(parts)
+
+    def matrix(self, ids, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        key = MatrixCache.key(self.name, ids, points)
+        cached = self.cache.load(key)
+        if cached is not None:
+            return cached
+        if self.fetch is None:
+            return self.fallback.pairwise(points, points)
+        return self.cache.store(key, self.fetch(list(ids), points))
+
+    def import_matrix(self, ids, points, matrix):
+        """Enregistre une matrice routière calculée ailleurs pour ces noeuds."""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        return self.cache.store(MatrixCache.key(self.name, ids, points), matrix)
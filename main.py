@@ -1,8 +1,17 @@
+import time
+
+STARTED = time.perf_counter()  # origine des temps de démarrage (MainWindow.startup_times)
+
+import logging
 import sys
 from PyQt5.QtWidgets import QApplication
 from app.gui.main_window import MainWindow
 
+if "--timings" in sys.argv:  # temps de démarrage (logs INFO de MainWindow)
+    sys.argv.remove("--timings")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
 app = QApplication(sys.argv)
-window = MainWindow()
+window = MainWindow(started=STARTED)
 window.show()
 sys.exit(app.exec_())